@@ -1,4 +1,5 @@
-from contextlib import asynccontextmanager
+import asyncio
+from contextlib import asynccontextmanager, suppress
 from pathlib import Path
 from typing import AsyncGenerator
 
@@ -10,19 +11,32 @@ from currency_checker import APP_NAME, __version__
 from currency_checker.api.routes.courses import router as courses_router
 from currency_checker.api.routes.docs import router as docs_router
 from currency_checker.api.routes.system import router as system_router
-from currency_checker.domain.services.binance import BinanceService
-from currency_checker.domain.services.coingeko import CoingekoService
-from currency_checker.domain.storages.currency import RedisCurrencyStorage
+from currency_checker.api.streaming import CoursesUpdatesHub
+from currency_checker.domain.adapters import get_enabled_adapters
+from currency_checker.domain.services.base import AbstractCurrencyService
+from currency_checker.domain.storages.currency import (
+    AbstractCurrencyStorage,
+    LocalCacheCurrencyStorage,
+    RedisCurrencyStorage,
+    RedisKeyspaceInvalidator,
+)
+from currency_checker.domain.storages.symbols import PostgresSymbolStorage, SymbolTableReloader
+from currency_checker.domain.symbols import SymbolTable
 from currency_checker.infrastructure.logging import configure_logging
 from currency_checker.infrastructure.metrics import start_metric_server
+from currency_checker.infrastructure.redis import close_redis_pools, get_redis
 from currency_checker.infrastructure.settings import Settings
 
 
 class AppState(BaseModel):
     settings: Settings
-    coingeko: CoingekoService
-    binance: BinanceService
+    # exchangers of enabled adapters
+    services: dict[str, AbstractCurrencyService]
+    # Redis storages of the same exchangers, rates of several exchangers are read from them in one round trip
+    storages: dict[str, RedisCurrencyStorage]
     metric_server: MetricsHTTPServer | None = None
+    courses_hub: CoursesUpdatesHub
+    background_tasks: list[asyncio.Task] = []
 
     class Config:
         arbitrary_types_allowed = True
@@ -38,18 +52,71 @@ async def lifespan(application: FastAPI) -> AsyncGenerator:
             port=settings.api_metrics_port
         )
 
+    adapters = get_enabled_adapters(settings)
+    redis = get_redis(settings.redis)
+    redis_storages = {adapter.name: adapter.create_storage() for adapter in adapters}
+    storages: dict[str, AbstractCurrencyStorage] = dict(redis_storages)
+
+    background_tasks = []
+    if settings.local_cache.enabled:
+        caches = {
+            key_prefix: LocalCacheCurrencyStorage(
+                storage,
+                max_size=settings.local_cache.max_size,
+                ttl=settings.local_cache.ttl,
+            )
+            for key_prefix, storage in redis_storages.items()
+        }
+        storages.update(caches)
+        invalidator = RedisKeyspaceInvalidator(
+            redis=redis,
+            database=settings.redis.database,
+            caches=list(caches.values()),
+            configure_notifications=settings.local_cache.configure_notifications,
+        )
+        background_tasks.append(asyncio.create_task(invalidator.run()))
+
+    services_by_source = {adapter.name: adapter.create_service(storages[adapter.name]) for adapter in adapters}
+    services = {adapter.exchanger: services_by_source[adapter.name] for adapter in adapters}
+    symbol_storage = None
+    if settings.symbols.load_from_database:
+        def on_symbols_change(source: str, table: SymbolTable | None) -> None:
+            if source in services_by_source:
+                service = services_by_source[source]
+                service.set_symbol_table(table or service.default_symbol_table())
+
+        # built-in mappings are used until mappings are loaded, so startup does not depend on database
+        symbol_storage = PostgresSymbolStorage(settings.postgres)
+        reloader = SymbolTableReloader(symbol_storage, settings.symbols.reload_interval, on_symbols_change)
+        background_tasks.append(asyncio.create_task(reloader.run()))
+
+    courses_hub = CoursesUpdatesHub(
+        redis=redis,
+        channels={redis_storages[adapter.name].updates_channel: adapter.exchanger for adapter in adapters},
+        buffer_size=settings.api_stream_buffer_size,
+    )
+    background_tasks.append(asyncio.create_task(courses_hub.run()))
+
     app_state = AppState(
         settings=settings,
-        coingeko=CoingekoService(RedisCurrencyStorage(settings=settings.redis, key_prefix='coingeko')),
-        binance=BinanceService(RedisCurrencyStorage(settings=settings.redis, key_prefix='binance')),
+        services=services,
+        storages={adapter.exchanger: redis_storages[adapter.name] for adapter in adapters},
         metric_server=metric_server,
+        courses_hub=courses_hub,
+        background_tasks=background_tasks,
     )
 
     application.state = app_state  # type: ignore
 
     yield
 
-    ...
+    for task in app_state.background_tasks:
+        task.cancel()
+        with suppress(asyncio.CancelledError):
+            await task
+    if symbol_storage is not None:
+        await symbol_storage.close()
+    await close_redis_pools()
 
 
 def get_app() -> FastAPI:
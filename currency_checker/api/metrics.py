@@ -0,0 +1,12 @@
+from prometheus_client import Counter, Gauge
+
+
+STREAM_CLIENTS = Gauge(
+    name='currency_checker_stream_clients',
+    documentation='Clients connected to live courses stream',
+    multiprocess_mode='livesum',
+)
+STREAM_EVICTIONS = Counter(
+    name='currency_checker_stream_evictions',
+    documentation='Stream clients disconnected because they did not read updates fast enough',
+)
@@ -15,3 +15,29 @@ class Course(BaseModel):
 class CoursesResponse(BaseModel):
     exchanger: str = Field(..., example="binance")
     courses: list[Course]
+
+
+class AggregatedCourse(BaseModel):
+    direction: str = Field(..., example="BTC-RUB")
+    values: dict[str, float] = Field(..., example={"binance": 6000000.0, "coinbase": 6000600.0})
+    median: float
+    min: float
+    max: float
+    spread: float = Field(..., description="Difference between max and min values")
+
+
+class AggregatedCoursesResponse(BaseModel):
+    exchangers: list[str] = Field(..., example=["binance", "coinbase"])
+    courses: list[AggregatedCourse]
+
+
+class CourseHistoryResponse(BaseModel):
+    exchanger: str = Field(..., example="binance")
+    direction: str = Field(..., example="BTC-RUB")
+    interval: str = Field(..., example="1m")
+    timestamps: list[int] = Field(..., description="Unix time in milliseconds (start of bucket for OHLC)")
+    values: list[float] | None = Field(default=None, description="Only for raw interval")
+    open: list[float] | None = None
+    high: list[float] | None = None
+    low: list[float] | None = None
+    close: list[float] | None = None
@@ -1,8 +1,25 @@
-from fastapi import APIRouter, Query, Request
+import asyncio
+import time
+from collections.abc import AsyncGenerator
+from datetime import datetime
 
-from currency_checker.api.models import Course, CoursesResponse
-from currency_checker.domain.models import Direction, Exchanger
-from currency_checker.domain.services import BinanceService, CoingekoService
+import numpy as np
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from fastapi.responses import ORJSONResponse, StreamingResponse
+
+from currency_checker.api.models import (
+    AggregatedCoursesResponse,
+    Course,
+    CourseHistoryResponse,
+    CoursesResponse,
+)
+from currency_checker.api.streaming import CoursesUpdatesHub, render_event
+from currency_checker.domain.conversion import ConversionPlan
+from currency_checker.domain.exceptions import ConversionPathNotFound, CurrencyRateNotFound
+from currency_checker.domain.history import downsample_ohlc
+from currency_checker.domain.models import Direction, Exchanger, HistoryInterval
+from currency_checker.domain.services import AbstractCurrencyService
+from currency_checker.domain.storages.currency import RedisCurrencyStorage
 
 
 router = APIRouter(prefix='/courses', tags=['Currency courses'])
@@ -14,26 +31,55 @@ router = APIRouter(prefix='/courses', tags=['Currency courses'])
 )
 async def courses_handler(
     request: Request,
-    exchanger: Exchanger = Query(default=Exchanger.BINANCE),
+    exchanger: str = Query(default=Exchanger.BINANCE, description='Name of enabled exchanger'),
     directions: list[Direction] | None = Query(
         default=None,
         example=[Direction.BTC_RUB, Direction.BTC_USD],
     ),
-) -> CoursesResponse:
+) -> CoursesResponse | Response:
+    service = _get_service(request, exchanger)
+
+    max_age: int = request.app.state.settings.api_courses_max_age
+    cache_control = f'max-age={max_age}' if max_age else 'no-cache'
+
+    # client already has current courses: answer after one version lookup
+    if_none_match = request.headers.get('if-none-match')
+    if if_none_match:
+        version = await service.get_snapshot_version()
+        if version is not None and _etag_matches(if_none_match, _etag(exchanger, version)):
+            return Response(
+                status_code=304,
+                headers={'ETag': _etag(exchanger, version), 'Cache-Control': cache_control},
+            )
+
+    # fast path: document pre-rendered by ingestion jobs
+    snapshot = await service.get_snapshot(directions)
+    if snapshot is not None:
+        return Response(
+            content=snapshot.document,
+            media_type='application/json',
+            headers={'ETag': _etag(exchanger, snapshot.version), 'Cache-Control': cache_control},
+        )
+
     if not directions:
         directions = [direction for direction in Direction]
 
-    service: BinanceService | CoingekoService
-    match exchanger:
-        case Exchanger.BINANCE:
-            service = request.app.state.binance
-        case _:
-            service = request.app.state.coingeko
+    # same answers as aggregate endpoint gives for unmapped directions and rates which are not ingested yet
+    try:
+        result = await service.get_course_values(directions)
+    except ConversionPathNotFound:
+        raise HTTPException(status_code=404, detail=f'Directions are not available on exchanger {exchanger}') from None
+    except CurrencyRateNotFound:
+        raise HTTPException(status_code=503, detail='Courses are not available yet') from None
 
-    result = {
-        direction: await service.get_course_value(direction)
-        for direction in directions
-    }
+    if request.app.state.settings.api_fast_response:
+        return ORJSONResponse({
+            'exchanger': exchanger,
+            'courses': [
+                {'direction': direction, 'value': float(result[direction])}
+                for direction in directions
+            ],
+        })
 
     return CoursesResponse(
         exchanger=exchanger,
@@ -44,3 +90,175 @@ async def courses_handler(
             ) for direction in directions
         ]
     )
+
+
+def _get_service(request: Request, exchanger: str) -> AbstractCurrencyService:
+    # exchangers are known only from enabled adapters, so unknown and disabled ones are not told apart
+    services: dict[str, AbstractCurrencyService] = request.app.state.services
+    if exchanger not in services:
+        raise HTTPException(status_code=404, detail=f'Exchanger {exchanger} is not available')
+    return services[exchanger]
+
+
+def _etag(exchanger: str, version: str) -> str:
+    return f'"{exchanger}-{version}"'
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    # weak comparison, as required for If-None-Match
+    return if_none_match.strip() == '*' or etag in (tag.strip().removeprefix('W/') for tag in if_none_match.split(','))
+
+
+@router.get(
+    '/stream',
+    response_class=StreamingResponse,
+    responses={200: {'content': {'text/event-stream': {}}}},
+)
+async def courses_stream_handler(
+    request: Request,
+    exchanger: list[str] | None = Query(default=None, description='Default - all exchangers'),
+    directions: list[Direction] | None = Query(
+        default=None,
+        example=[Direction.BTC_RUB, Direction.BTC_USD],
+    ),
+) -> StreamingResponse:
+    """
+    Server-Sent Events stream of courses.
+
+    Every event has the same document as `/v1/courses` returns and is sent when workers save new rates.
+    Current courses are sent right after connection.
+    """
+    services = {current: _get_service(request, current) for current in exchanger or request.app.state.services}
+    exchangers = list(services)
+    hub: CoursesUpdatesHub = request.app.state.courses_hub
+    keepalive_interval: float = request.app.state.settings.api_stream_keepalive_interval
+
+    async def events() -> AsyncGenerator[bytes, None]:
+        subscriber = hub.subscribe(exchangers, directions)
+        try:
+            for current in exchangers:
+                snapshot = await services[current].get_snapshot(directions)
+                if snapshot is not None:
+                    yield render_event(snapshot.document)
+            while True:
+                try:
+                    event = await asyncio.wait_for(subscriber.queue.get(), keepalive_interval)
+                except TimeoutError:
+                    yield b': keep-alive\n\n'
+                    continue
+                if event is None:  # client was evicted
+                    break
+                yield event
+        finally:
+            hub.unsubscribe(subscriber)
+
+    return StreamingResponse(
+        events(),
+        media_type='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'},
+    )
+
+
+@router.get(
+    '/aggregate',
+    response_model=AggregatedCoursesResponse,
+)
+async def courses_aggregate_handler(
+    request: Request,
+    exchanger: list[str] | None = Query(default=None, description='Default - all exchangers'),
+    directions: list[Direction] | None = Query(
+        default=None,
+        example=[Direction.BTC_RUB, Direction.BTC_USD],
+    ),
+) -> Response:
+    """
+    Courses of several exchangers with median, min, max and spread per direction.
+
+    Rates of all exchangers are read in one round trip. Exchanger without some of requested directions or rates
+    is left out of the result.
+    """
+    services = {current: _get_service(request, current) for current in exchanger or request.app.state.services}
+    storages: dict[str, RedisCurrencyStorage] = request.app.state.storages
+    if not directions:
+        directions = [direction for direction in Direction]
+
+    plans: dict[str, ConversionPlan] = {}
+    for current, service in services.items():
+        try:
+            plans[current] = service.plan_course_values(directions)
+        except ConversionPathNotFound:
+            continue
+    if not plans:
+        raise HTTPException(status_code=404, detail='Directions are not available on requested exchangers')
+
+    rates = await RedisCurrencyStorage.get_keys_of(
+        [(storages[current], plan.symbols) for current, plan in plans.items()]
+    )
+    available: dict[str, dict[Direction, float]] = {
+        current: services[current].evaluate_course_values(directions, plan, current_rates)  # type: ignore[arg-type]
+        for (current, plan), current_rates in zip(plans.items(), rates)
+        if None not in current_rates
+    }
+    if not available:
+        raise HTTPException(status_code=503, detail='Courses are not available yet')
+
+    # rows - exchangers, columns - directions
+    values = np.array([[result[direction] for direction in directions] for result in available.values()])
+    minimum, maximum = values.min(axis=0), values.max(axis=0)
+    return ORJSONResponse({
+        'exchangers': list(available),
+        'courses': [
+            {
+                'direction': direction,
+                'values': {current: float(result[direction]) for current, result in available.items()},
+                'median': median,
+                'min': low,
+                'max': high,
+                'spread': high - low,
+            }
+            for direction, median, low, high in zip(
+                directions,
+                np.median(values, axis=0).tolist(),
+                minimum.tolist(),
+                maximum.tolist(),
+            )
+        ],
+    })
+
+
+@router.get(
+    '/history',
+    response_model=CourseHistoryResponse,
+)
+async def courses_history_handler(
+    request: Request,
+    direction: Direction,
+    exchanger: str = Query(default=Exchanger.BINANCE, description='Name of enabled exchanger'),
+    start: datetime | None = Query(default=None, description='Default - one hour before end'),
+    end: datetime | None = Query(default=None, description='Default - now'),
+    interval: HistoryInterval = Query(default=HistoryInterval.MINUTE),
+) -> Response:
+    service = _get_service(request, exchanger)
+
+    now_ms = int(time.time() * 1000)
+    requested_end_ms = int(end.timestamp() * 1000) if end else now_ms
+    # history newer than now or older than retention does not exist, range is clamped to keep reads bounded
+    end_ms = min(requested_end_ms, now_ms)
+    start_ms = int(start.timestamp() * 1000) if start else end_ms - HistoryInterval.HOUR.milliseconds
+    if start_ms > requested_end_ms:
+        raise HTTPException(status_code=422, detail='Start of history is after its end')
+    start_ms = max(start_ms, now_ms - request.app.state.settings.history.retention * 1000)
+    try:
+        series = await service.get_course_history(direction, start_ms, end_ms)
+    except ConversionPathNotFound:
+        raise HTTPException(status_code=404, detail=f'Direction is not available on exchanger {exchanger}') from None
+    except ValueError as exc:
+        raise HTTPException(status_code=422, detail=str(exc)) from None
+
+    # history might have tens of thousands of points, numpy arrays are serialized by orjson as is
+    content: dict = {'exchanger': exchanger, 'direction': direction, 'interval': interval}
+    if interval == HistoryInterval.RAW:
+        content.update(timestamps=series.timestamps, values=series.values)
+    else:
+        content.update(downsample_ohlc(series, interval.milliseconds)._asdict())
+    return ORJSONResponse(content)
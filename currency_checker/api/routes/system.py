@@ -1,6 +1,7 @@
 import socket
 
-from fastapi import APIRouter, Request
+from fastapi import APIRouter, Request, Response
+from fastapi.responses import ORJSONResponse
 
 from currency_checker import APP_NAME
 from currency_checker.api.models import PingResponse
@@ -13,7 +14,13 @@ router = APIRouter(tags=['System'])
     '/ping',
     response_model=PingResponse,
 )
-async def health_check_handler(request: Request) -> PingResponse:
+async def health_check_handler(request: Request) -> PingResponse | Response:
+    if request.app.state.settings.api_fast_response:
+        return ORJSONResponse({
+            'service': APP_NAME,
+            'version': request.app.version,
+            'hostname': socket.gethostname(),
+        })
     return PingResponse(
         service=APP_NAME,
         version=request.app.version,
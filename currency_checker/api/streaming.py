@@ -0,0 +1,116 @@
+import asyncio
+from collections.abc import Collection
+from logging import getLogger
+
+import orjson
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+from currency_checker.api.metrics import STREAM_CLIENTS, STREAM_EVICTIONS
+from currency_checker.domain.models import Direction
+
+
+logger = getLogger(__name__)
+
+
+def render_event(document: bytes) -> bytes:
+    return b'event: courses\ndata: ' + document + b'\n\n'
+
+
+class CoursesSubscriber:
+    __slots__ = ('exchangers', 'directions', 'queue')
+
+    def __init__(self, exchangers: frozenset[str], directions: frozenset[Direction] | None, buffer_size: int):
+        self.exchangers = exchangers
+        self.directions = directions  # None - all directions
+        self.queue: asyncio.Queue[bytes | None] = asyncio.Queue(maxsize=buffer_size)
+
+
+class CoursesUpdatesHub:
+    """
+    Fan-out of courses updates published by ingestion jobs.
+
+    Holds one Redis pub/sub subscription per process and pushes rendered SSE events
+    into bounded per-client queues. Client whose queue is full is evicted,
+    so slow consumer never delays the others.
+    """
+
+    def __init__(
+        self,
+        redis: Redis,
+        channels: dict[str, str],
+        buffer_size: int = 16,
+        reconnect_interval: float = 1.0,
+    ) -> None:
+        self.redis = redis
+        self._channels = channels
+        self._buffer_size = buffer_size
+        self._reconnect_interval = reconnect_interval
+        self._subscribers: set[CoursesSubscriber] = set()
+
+    def subscribe(
+        self,
+        exchangers: Collection[str] | None = None,
+        directions: Collection[Direction] | None = None,
+    ) -> CoursesSubscriber:
+        subscriber = CoursesSubscriber(
+            exchangers=frozenset(exchangers or self._channels.values()),
+            directions=frozenset(directions) if directions else None,
+            buffer_size=self._buffer_size,
+        )
+        self._subscribers.add(subscriber)
+        STREAM_CLIENTS.inc()
+        return subscriber
+
+    def unsubscribe(self, subscriber: CoursesSubscriber) -> None:
+        if subscriber in self._subscribers:
+            self._subscribers.remove(subscriber)
+            STREAM_CLIENTS.dec()
+
+    async def run(self) -> None:
+        while True:
+            try:
+                await self._listen()
+            except RedisError as exc:
+                logger.warning('Courses updates subscription lost: %s', exc)
+            await asyncio.sleep(self._reconnect_interval)
+
+    async def _listen(self) -> None:
+        async with self.redis.pubsub(ignore_subscribe_messages=True) as pubsub:
+            await pubsub.subscribe(*self._channels)
+            async for message in pubsub.listen():
+                exchanger = self._channels.get(message['channel'].decode())
+                if exchanger is not None:
+                    self.publish(exchanger, message['data'])
+
+    def publish(self, exchanger: str, document: bytes) -> None:
+        # same event is shared between clients with the same filter
+        events: dict[frozenset[Direction] | None, bytes] = {}
+        courses: list[dict] | None = None
+        for subscriber in list(self._subscribers):
+            if exchanger not in subscriber.exchangers:
+                continue
+            event = events.get(subscriber.directions)
+            if event is None:
+                if subscriber.directions is None:
+                    event = render_event(document)
+                else:
+                    if courses is None:
+                        courses = orjson.loads(document)['courses']
+                    event = render_event(orjson.dumps({
+                        'exchanger': exchanger,
+                        'courses': [course for course in courses if course['direction'] in subscriber.directions],
+                    }))
+                events[subscriber.directions] = event
+            try:
+                subscriber.queue.put_nowait(event)
+            except asyncio.QueueFull:
+                self._evict(subscriber)
+
+    def _evict(self, subscriber: CoursesSubscriber) -> None:
+        logger.info('Evict slow stream client')
+        STREAM_EVICTIONS.inc()
+        self.unsubscribe(subscriber)
+        while not subscriber.queue.empty():
+            subscriber.queue.get_nowait()
+        subscriber.queue.put_nowait(None)  # tells the client stream to stop
@@ -0,0 +1,15 @@
+from .base import AbstractExchangeAdapter, IngestionMode
+from .binance import BinanceAdapter
+from .coingeko import CoingekoAdapter
+from .registry import get_adapter, get_enabled_adapters, register_adapter
+
+
+__all__ = [
+    'AbstractExchangeAdapter',
+    'BinanceAdapter',
+    'CoingekoAdapter',
+    'IngestionMode',
+    'get_adapter',
+    'get_enabled_adapters',
+    'register_adapter',
+]
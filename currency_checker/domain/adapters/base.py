@@ -0,0 +1,59 @@
+from abc import ABC, abstractmethod
+from enum import StrEnum
+
+from currency_checker.domain.services import AbstractCurrencyService
+from currency_checker.domain.storages.currency import AbstractCurrencyStorage, RedisCurrencyStorage
+from currency_checker.domain.symbols import SymbolTable, get_symbol_table
+from currency_checker.infrastructure.settings import AdapterSettings, Settings
+
+
+class IngestionMode(StrEnum):
+    POLL = 'poll'  # scheduler sends job every `interval` seconds
+    STREAM = 'stream'  # long-running job saves rates as exchange pushes them
+
+
+class AbstractExchangeAdapter(ABC):
+    """
+    Everything exchange specific: client, ingested symbols (declared by service) and ingestion modes.
+
+    Scheduler, workers and API know exchanges only through registered adapters,
+    so new exchange is one adapter module with its client and service.
+    """
+
+    name: str  # key of `adapters` settings and prefix of storage keys
+    exchanger: str  # name of exchange in API, unique among adapters
+    service_class: type[AbstractCurrencyService]
+    modes: tuple[IngestionMode, ...] = (IngestionMode.POLL,)  # the first one is used by default
+
+    def __init__(self, settings: Settings) -> None:
+        self.settings = settings
+        self.config = settings.adapters.get(self.name, AdapterSettings())
+
+    @property
+    def mode(self) -> IngestionMode:
+        mode = IngestionMode(self.config.mode) if self.config.mode else self.modes[0]
+        if mode not in self.modes:
+            raise ValueError(f'Exchange adapter {self.name} does not support {mode} mode')
+        return mode
+
+    def create_storage(self) -> RedisCurrencyStorage:
+        return RedisCurrencyStorage(self.settings.redis, self.name, self.settings.history)
+
+    def symbol_table(self) -> SymbolTable:
+        """Mappings loaded from database or built-in ones of service."""
+        return get_symbol_table(self.name) or self.service_class.default_symbol_table()
+
+    def create_service(self, storage: AbstractCurrencyStorage) -> AbstractCurrencyService:
+        return self.service_class(storage, self.symbol_table())
+
+    async def prepare(self) -> None:
+        """Called by scheduler on startup, before jobs of adapter are scheduled."""
+
+    @abstractmethod
+    async def poll(self, service: AbstractCurrencyService) -> None:
+        """Fetch current rates once and save them, snapshot is saved by job."""
+        ...
+
+    async def stream(self, service: AbstractCurrencyService) -> None:
+        """Save rates as they are pushed by exchange until stream ends, snapshot is saved after storage flush."""
+        raise NotImplementedError(f'Exchange adapter {self.name} does not support stream mode')
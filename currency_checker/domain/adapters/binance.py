@@ -0,0 +1,36 @@
+from currency_checker.domain.adapters.base import AbstractExchangeAdapter, IngestionMode
+from currency_checker.domain.adapters.registry import register_adapter
+from currency_checker.domain.exchange_clients import BinanceClient, BinanceWebsocketClient, get_binance_client
+from currency_checker.domain.models import Exchanger
+from currency_checker.domain.services import AbstractCurrencyService, BinanceService
+from currency_checker.infrastructure.redis import get_redis
+from currency_checker.infrastructure.settings import Settings
+
+
+@register_adapter
+class BinanceAdapter(AbstractExchangeAdapter):
+    name = 'binance'
+    exchanger = Exchanger.BINANCE
+    service_class = BinanceService
+    modes = (IngestionMode.STREAM, IngestionMode.POLL)
+
+    def __init__(self, settings: Settings) -> None:
+        super().__init__(settings)
+        self._websocket_client: BinanceWebsocketClient | None = None
+
+    async def poll(self, service: AbstractCurrencyService) -> None:
+        currency_rates = await self._client().get_price(directions=service.conversion.symbols)
+        await service.save_course_values(currency_rates)
+
+    async def stream(self, service: AbstractCurrencyService) -> None:
+        # connection is restored inside of client, REST API fills the gaps while it was lost;
+        # client is kept for restarts of stream, so it knows when connection was lost
+        if self._websocket_client is None:
+            self._websocket_client = BinanceWebsocketClient(rest_client=self._client())
+        client = self._websocket_client
+        async for currency_rate in client.get_price(directions=service.conversion.symbols):
+            # storage buffers writes, so it does not wait for Redis
+            await service.save_course_values([currency_rate])
+
+    def _client(self) -> BinanceClient:
+        return get_binance_client(self.settings.exchange_client, get_redis(self.settings.redis))
@@ -0,0 +1,65 @@
+from logging import getLogger
+
+from currency_checker.domain.adapters.base import AbstractExchangeAdapter
+from currency_checker.domain.adapters.registry import register_adapter
+from currency_checker.domain.exceptions import AccountsNotFound, IngestionSkipped
+from currency_checker.domain.exchange_clients import get_coingeko_client
+from currency_checker.domain.models import Exchanger
+from currency_checker.domain.services import AbstractCurrencyService, CoingekoService
+from currency_checker.domain.storages.api_keys import RedisApiKeyPool
+from currency_checker.infrastructure.base_api_client.exceptions import ApiClientResponseError
+from currency_checker.infrastructure.redis import get_redis
+
+
+logger = getLogger(__name__)
+
+
+@register_adapter
+class CoingekoAdapter(AbstractExchangeAdapter):
+    name = 'coingeko'
+    exchanger = Exchanger.COINBASE
+    service_class = CoingekoService
+
+    def key_pool(self) -> RedisApiKeyPool:
+        return RedisApiKeyPool(
+            get_redis(self.settings.redis),
+            key_prefix='coingeko:api_keys',
+            requests_per_minute=self.settings.coingeko_api_keys.requests_per_minute,
+            burst=self.settings.coingeko_api_keys.burst,
+        )
+
+    async def prepare(self) -> None:
+        # API keys are shared by workers through key pool, accounts are read only by scheduler
+        from currency_checker.domain.storages.accounts import PostgresAccountStorage
+
+        account_storage = PostgresAccountStorage(self.settings.postgres)
+        await account_storage.cache_all_active_accounts('coingeko')
+        accounts = account_storage.get_active_accounts('coingeko')
+        if not accounts:
+            logger.error('No active CoinGecko accounts, rates of %s are not ingested', self.name)
+        await self.key_pool().set_keys([account.token for account in accounts])
+
+    async def poll(self, service: AbstractCurrencyService) -> None:
+        settings = self.settings.coingeko_api_keys
+        key_pool = self.key_pool()
+        try:
+            api_key = await key_pool.acquire(timeout=settings.acquire_timeout)
+        except AccountsNotFound:
+            raise IngestionSkipped('no CoinGecko API keys configured') from None
+        if api_key is None:
+            raise IngestionSkipped('quota of all CoinGecko API keys is exhausted')
+
+        client = get_coingeko_client(self.settings.exchange_client, api_key)
+        try:
+            course_values = await client.get_price(
+                currencies=service.symbol_table.base_codes,
+                vs_currencies=service.symbol_table.quote_codes,
+            )
+        except ApiClientResponseError as exc:
+            status = int(exc.status or 0)
+            if status == 429:
+                await key_pool.cool_down(api_key, settings.rate_limit_cooldown)
+            elif status >= 500:
+                await key_pool.cool_down(api_key, settings.error_cooldown)
+            raise
+        await service.save_course_values(course_values)
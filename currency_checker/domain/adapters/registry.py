@@ -0,0 +1,34 @@
+from importlib import import_module
+
+from currency_checker.domain.adapters.base import AbstractExchangeAdapter
+from currency_checker.infrastructure.settings import Settings
+
+
+_adapters: dict[str, type[AbstractExchangeAdapter]] = {}
+
+
+def register_adapter(adapter_class: type[AbstractExchangeAdapter]) -> type[AbstractExchangeAdapter]:
+    """Class decorator, which makes exchange adapter known to scheduler, workers and API."""
+    if adapter_class.name in _adapters:
+        raise ValueError(f'Exchange adapter {adapter_class.name} is already registered')
+    if any(registered.exchanger == adapter_class.exchanger for registered in _adapters.values()):
+        raise ValueError(f'Exchanger {adapter_class.exchanger} is already served by another adapter')
+    _adapters[adapter_class.name] = adapter_class
+    return adapter_class
+
+
+def get_adapter(name: str, settings: Settings) -> AbstractExchangeAdapter:
+    _import_adapter_modules(settings)
+    return _adapters[name](settings)
+
+
+def get_enabled_adapters(settings: Settings) -> list[AbstractExchangeAdapter]:
+    _import_adapter_modules(settings)
+    adapters = [adapter_class(settings) for adapter_class in _adapters.values()]
+    return [adapter for adapter in adapters if adapter.config.enabled]
+
+
+def _import_adapter_modules(settings: Settings) -> None:
+    # modules register their adapters on import, already imported modules are cached by Python
+    for module in settings.adapter_modules:
+        import_module(module)
@@ -0,0 +1,97 @@
+from collections import deque
+from collections.abc import Mapping, Sequence
+from functools import lru_cache
+from typing import NamedTuple
+
+import numpy as np
+import numpy.typing as npt
+
+from currency_checker.domain.exceptions import ConversionPathNotFound
+
+
+Pair = tuple[str, str]  # (base asset, quote asset)
+Path = tuple[tuple[int, int], ...]  # (symbol index, exponent) for every hop
+
+
+class ConversionPlan(NamedTuple):
+    """
+    Compiled conversion of several pairs.
+
+    `indices` and `exponents` have shape (pairs, longest path), `indices` point into `symbols` of the plan,
+    shorter paths are padded with index `len(symbols)`, which is evaluated as 1.
+    """
+    symbols: tuple[str, ...]
+    indices: npt.NDArray[np.intp]
+    exponents: npt.NDArray[np.float64]
+
+
+class ConversionGraph:
+    """
+    Conversion paths between all assets of one exchanger.
+
+    Symbols (storage keys) are edges: `base -> quote` with rate and `quote -> base` with inverse rate.
+    Shortest path (by number of hops) is precomputed for every pair of assets when graph is built,
+    so new graph should be built whenever set of ingested symbols changes.
+    """
+
+    def __init__(self, symbols: Mapping[str, Pair], aliases: Mapping[str, str] | None = None) -> None:
+        """
+        :param symbols: storage key -> (base, quote) assets
+        :param aliases: asset name used in directions -> asset name used in symbols (e.g. USDTERC -> USDT)
+        """
+        self.symbols = tuple(symbols)
+        self.aliases = dict(aliases or {})
+        self._paths = self._build_paths(list(symbols.values()))
+        self.plan = lru_cache(maxsize=256)(self._plan)
+
+    def path(self, pair: Pair) -> Path:
+        base, quote = (self.aliases.get(asset, asset) for asset in pair)
+        if base == quote:
+            return ()
+        try:
+            return self._paths[base, quote]
+        except KeyError:
+            raise ConversionPathNotFound(pair) from None
+
+    def path_symbols(self, pair: Pair) -> list[tuple[str, int]]:
+        return [(self.symbols[index], exponent) for index, exponent in self.path(pair)]
+
+    def _plan(self, pairs: tuple[Pair, ...]) -> ConversionPlan:
+        paths = [self.path(pair) for pair in pairs]
+        used = sorted({index for path in paths for index, _ in path})
+        position = {index: number for number, index in enumerate(used)}
+        width = max((len(path) for path in paths), default=0)
+
+        indices = np.full((len(paths), width), len(used), dtype=np.intp)
+        exponents = np.ones((len(paths), width), dtype=np.float64)
+        for row, path in enumerate(paths):
+            for column, (index, exponent) in enumerate(path):
+                indices[row, column] = position[index]
+                exponents[row, column] = exponent
+        return ConversionPlan(tuple(self.symbols[index] for index in used), indices, exponents)
+
+    @staticmethod
+    def evaluate(plan: ConversionPlan, rates: Sequence[float]) -> npt.NDArray[np.float64]:
+        """Values of all pairs of the plan, `rates` are values of `plan.symbols`."""
+        extended = np.append(np.asarray(rates, dtype=np.float64), 1.0)
+        return np.prod(extended[plan.indices] ** plan.exponents, axis=1)
+
+    @staticmethod
+    def _build_paths(edges: list[Pair]) -> dict[Pair, Path]:
+        adjacency: dict[str, list[tuple[str, int, int]]] = {}
+        for index, (base, quote) in enumerate(edges):
+            adjacency.setdefault(base, []).append((quote, index, 1))
+            adjacency.setdefault(quote, []).append((base, index, -1))
+
+        paths: dict[Pair, Path] = {}
+        for source in adjacency:
+            visited: dict[str, Path] = {source: ()}
+            queue = deque([source])
+            while queue:
+                asset = queue.popleft()
+                for neighbour, index, exponent in adjacency[asset]:
+                    if neighbour not in visited:
+                        visited[neighbour] = (*visited[asset], (index, exponent))
+                        queue.append(neighbour)
+            paths.update({(source, target): path for target, path in visited.items() if target != source})
+        return paths
@@ -1,2 +1,14 @@
 class AccountsNotFound(Exception):
     pass
+
+
+class CurrencyRateNotFound(Exception):
+    pass
+
+
+class ConversionPathNotFound(Exception):
+    pass
+
+
+class IngestionSkipped(Exception):
+    """Rates were not fetched this time, e.g. quota is exhausted, job should not be retried."""
@@ -1,6 +1,7 @@
 from .base import AbstractExchangeClient
 from .binance import BinanceClient, BinanceWebsocketClient
 from .coingeko import CoingekoClient
+from .registry import close_exchange_clients, get_binance_client, get_coingeko_client
 
 
 __all__ = [
@@ -8,4 +9,7 @@ __all__ = [
     'BinanceClient',
     'BinanceWebsocketClient',
     'CoingekoClient',
+    'close_exchange_clients',
+    'get_binance_client',
+    'get_coingeko_client',
 ]
@@ -1,98 +1,283 @@
-import json
+import asyncio
+import random
+import time
+from collections.abc import Sequence
 from logging import getLogger
 from typing import AsyncGenerator
 
-from aiohttp import ClientSession, WSMsgType
-from starlette import status
+import msgspec
+from aiohttp import ClientError, ClientSession, WSMsgType
 
 from currency_checker.domain.exchange_clients.base import AbstractExchangeClient
-from currency_checker.domain.models import CurrencyRateBinance, DirectionBinance
+from currency_checker.domain.exchange_clients.metrics import WEBSOCKET_GAP_SECONDS, WEBSOCKET_RECONNECTS
+from currency_checker.domain.models import (
+    BinanceAveragePrice,
+    BinanceStreamMessage,
+    CurrencyRateBinance,
+)
 from currency_checker.infrastructure.base_api_client.base_client import BaseClient, BaseSession
-from currency_checker.infrastructure.base_api_client.exceptions import ApiClientResponseError
+from currency_checker.infrastructure.base_api_client.base_throttler import BaseThrottler
+from currency_checker.infrastructure.base_api_client.circuit_breaker import CircuitBreaker
+from currency_checker.infrastructure.base_api_client.hedging import HedgingPolicy
+from currency_checker.infrastructure.base_api_client.responses import Response
+from currency_checker.infrastructure.base_api_client.retries import RetryPolicy
+from currency_checker.infrastructure.base_api_client.throttlers import MeasuredThrottler
+from currency_checker.infrastructure.base_api_client.timeouts import RequestTimeout
 
 
 logger = getLogger(__name__)
 
 
-class BinanceClient(AbstractExchangeClient, BaseClient):
+class BinanceWeightThrottler(MeasuredThrottler):
+    """
+    Keeps request weight used by our IP within Binance per-minute budget.
+
+    Binance reports weight used by IP in the current minute in `X-MBX-USED-WEIGHT-1M` header,
+    so it accounts requests of all processes on the host. Until the next response arrives,
+    weight of sent requests is added locally. Above `slowdown_ratio` of budget requests are spread
+    over the rest of the minute, at `limit_ratio` they wait for the next minute.
+    After 429/418 responses requests wait as long as `Retry-After` says.
+    """
+
+    USED_WEIGHT_HEADER = 'X-MBX-USED-WEIGHT-1M'
+
+    def __init__(
+        self,
+        weight_limit: int = 6000,
+        request_weight: int = 4,  # weight of `ticker/price` with `symbols`
+        slowdown_ratio: float = 0.7,
+        limit_ratio: float = 0.9,
+        name: str = 'binance_weight',
+    ) -> None:
+        super().__init__(name)
+        self._request_weight = request_weight
+        self._slowdown_weight = weight_limit * slowdown_ratio
+        self._max_weight = weight_limit * limit_ratio
+        self._used_weight = 0
+        self._minute = self._current_minute()
+        self._banned_until = 0.0
+        self._lock = asyncio.Lock()
+
+    async def _acquire(self) -> None:
+        async with self._lock:
+            retry_after = self._banned_until - time.time()
+            if retry_after > 0:
+                logger.warning('Binance requests are suspended for %.1f seconds', retry_after)
+                await asyncio.sleep(retry_after)
+
+            self._reset_on_new_minute()
+            if self._used_weight + self._request_weight > self._max_weight:
+                await asyncio.sleep(self._seconds_to_next_minute())
+                self._reset_on_new_minute()
+            elif self._used_weight + self._request_weight > self._slowdown_weight:
+                left_requests = (self._max_weight - self._used_weight) / self._request_weight
+                await asyncio.sleep(self._seconds_to_next_minute() / max(left_requests, 1))
+                self._reset_on_new_minute()
+            self._used_weight += self._request_weight
+
+    def update(self, response: Response) -> None:
+        used_weight = response.headers.get(self.USED_WEIGHT_HEADER)
+        if used_weight is not None and used_weight.isdigit():
+            self._reset_on_new_minute()
+            # header does not count requests which are still in flight, so it only raises local count
+            self._used_weight = max(self._used_weight, int(used_weight))
+        if response.status in (418, 429):
+            retry_after = response.headers.get('Retry-After', '')
+            # without header wait till the end of minute, when weight is reset
+            delay = int(retry_after) if retry_after.isdigit() else self._seconds_to_next_minute()
+            self._banned_until = max(self._banned_until, time.time() + delay)
+            logger.warning('Binance responded with %s, requests are suspended for %s seconds', response.status, delay)
+
+    def _reset_on_new_minute(self) -> None:
+        minute = self._current_minute()
+        if minute != self._minute:
+            self._minute = minute
+            self._used_weight = 0
+
+    @staticmethod
+    def _current_minute() -> int:
+        return int(time.time() // 60)
+
+    @staticmethod
+    def _seconds_to_next_minute() -> float:
+        return 60 - time.time() % 60
+
+
+class BinanceClient(BaseClient, AbstractExchangeClient):
     session_class = BaseSession
     _api_service_name: str = 'binance'
 
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        keepalive_timeout: float = 15.0,
+        dns_cache_ttl: int | None = 10,
+        throttler: BaseThrottler | None = None,
+        retry_policy: RetryPolicy | None = None,
+        circuit_breaker: CircuitBreaker | None = None,
+        timeout: RequestTimeout | None = None,
+        hedging: HedgingPolicy | None = None,
+        trace_body_sample_rate: float = 0.0,
+    ) -> None:
         super().__init__(
             base_uri='https://api.binance.com/api/v3/',
+            throttler=throttler,
+            retry_policy=retry_policy,
+            circuit_breaker=circuit_breaker,
+            timeout=timeout,
+            hedging=hedging,
+            keepalive_timeout=keepalive_timeout,
+            dns_cache_ttl=dns_cache_ttl,
             enable_metrics=True,
             client_name='currency_checker',
+            trace_body_sample_rate=trace_body_sample_rate,
         )
         self.session = self.get_session()
 
     async def get_price(
         self,
-        directions: list[DirectionBinance]
+        directions: Sequence[str]
     ) -> list[CurrencyRateBinance]:
         directions_str = '","'.join(directions) if len(directions) > 1 else f'"{directions[0]}"'
-        response = await self.session.request(
+        # Binance sends prices as strings, they are converted while decoding
+        return await self.session.request_model(
+            list[CurrencyRateBinance],
             method='get',
             path_template='ticker/price',
             params={
                 'symbols': f'["{directions_str}"]'
             },
+            strict=False,
         )
 
-        if response.status != status.HTTP_200_OK:
-            raise ApiClientResponseError(
-                request_info=response.request_info,
-                status=response.status,
-                message=response.data,
-            )
-        raw_response = json.loads(response.data)
-        return [
-            CurrencyRateBinance(
-                symbol=item['symbol'],
-                price=item['price'],
-            ) for item in raw_response
-        ]
-
 
 class BinanceWebsocketClient(AbstractExchangeClient):
-    def __init__(self, base_url: str = 'wss://stream.binance.com:9443') -> None:
+    """
+    Stream of average prices, which survives connection loss.
+
+    Dead connection is detected by ping/pong heartbeat or by absence of messages for `receive_timeout` seconds.
+    After that client reconnects with jittered exponential backoff, subscribes again and, if `rest_client` is set,
+    fetches current prices through REST API to fill the gap. Time of disconnection is kept by client,
+    so the gap is measured and filled also when stream is started again after failure.
+    """
+
+    exchanger = 'binance'
+
+    def __init__(
+        self,
+        base_url: str = 'wss://stream.binance.com:9443',
+        rest_client: BinanceClient | None = None,
+        heartbeat: float = 20.0,
+        receive_timeout: float = 30.0,
+        reconnect_min_delay: float = 0.5,
+        reconnect_max_delay: float = 30.0,
+        max_reconnects: int | None = None,
+    ) -> None:
         self.base_uri = base_url
+        self.rest_client = rest_client
+        self.heartbeat = heartbeat
+        self.receive_timeout = receive_timeout
+        self.reconnect_min_delay = reconnect_min_delay
+        self.reconnect_max_delay = reconnect_max_delay
+        self.max_reconnects = max_reconnects  # None - reconnect forever
+        self.disconnected_at: float | None = None  # monotonic time, None - stream is live or was never started
 
-    @staticmethod
-    def _parse_price(raw_price_response: str) -> CurrencyRateBinance:
-        price_response = json.loads(raw_price_response)
-        return CurrencyRateBinance(
-            symbol=price_response['data']['s'],
-            price=float(price_response['data']['w'])
-        )
+    # reads only used fields of message straight into struct, without intermediate dict and validation
+    _decoder = msgspec.json.Decoder(BinanceStreamMessage, strict=False)
+
+    @classmethod
+    def _parse_price(cls, raw_price_response: str | bytes) -> BinanceAveragePrice:
+        return cls._decoder.decode(raw_price_response).data
 
     async def get_price(  # type: ignore
-        self, directions: list[DirectionBinance]
-    ) -> AsyncGenerator[CurrencyRateBinance, None]:
+        self, directions: Sequence[str]
+    ) -> AsyncGenerator[CurrencyRateBinance | BinanceAveragePrice, None]:
+        # one session for all reconnections, so connector is reused
         async with ClientSession(base_url=self.base_uri) as session:
-            async with session.ws_connect('/stream') as websocket_connection:
-                subscribe_message = {
-                    "method": "SUBSCRIBE",
-                    "params": [
-                        f"{direction.lower()}@avgPrice" for direction in directions
-                    ],
-                    "id": None,
-                }
-                await websocket_connection.send_json(subscribe_message)
-
-                first_message = True
-
-                async for msg in websocket_connection:
-                    if first_message:  # skip first message about successful subscription
-                        first_message = False
-                        continue
-
-                    match msg.type:
-                        case WSMsgType.TEXT:
-                            yield self._parse_price(msg.data)
-                        case WSMsgType.CLOSED:
-                            logger.info('Websocket connection closed')
-                            break
-                        case WSMsgType.ERROR:
-                            logger.error('Received websocket connection error: %s', msg.data)
-                            break
+            attempt = 0
+            try:
+                while True:
+                    try:
+                        stream = self._stream(session, directions, backfill=self.disconnected_at is not None)
+                        async for currency_rate, live in stream:
+                            if live and self.disconnected_at is not None:
+                                gap = time.monotonic() - self.disconnected_at
+                                WEBSOCKET_GAP_SECONDS.labels(self.exchanger).observe(gap)
+                                self.disconnected_at = None
+                                attempt = 0
+                            yield currency_rate
+                    except (ClientError, TimeoutError) as exc:
+                        logger.warning('Websocket connection lost: %r', exc)
+
+                    self._mark_disconnected()
+                    if self.max_reconnects is not None and attempt >= self.max_reconnects:
+                        logger.error('Websocket connection was not restored after %s attempts', attempt)
+                        return
+                    await asyncio.sleep(self._backoff(attempt))
+                    attempt += 1
+                    WEBSOCKET_RECONNECTS.labels(self.exchanger).inc()
+            finally:
+                # stream failed or was stopped, the next one fills the gap
+                self._mark_disconnected()
+
+    async def _stream(
+        self,
+        session: ClientSession,
+        directions: Sequence[str],
+        backfill: bool,
+    ) -> AsyncGenerator[tuple[CurrencyRateBinance | BinanceAveragePrice, bool], None]:
+        """Rates with flag if they were received from stream (not from REST API)."""
+        async with session.ws_connect('/stream', heartbeat=self.heartbeat) as websocket_connection:
+            subscribe_message = {
+                "method": "SUBSCRIBE",
+                "params": [
+                    f"{direction.lower()}@avgPrice" for direction in directions
+                ],
+                "id": None,
+            }
+            await websocket_connection.send_json(subscribe_message)
+
+            if backfill:
+                # stream is subscribed already, so nothing is missed between REST response and first message
+                for currency_rate in await self._backfill(directions):
+                    yield currency_rate, False
+
+            first_message = True
+
+            while True:
+                msg = await asyncio.wait_for(websocket_connection.receive(), self.receive_timeout)
+                if first_message:  # skip first message about successful subscription
+                    first_message = False
+                    continue
+
+                match msg.type:
+                    case WSMsgType.TEXT:
+                        # unexpected frame (e.g. error of request) is skipped, it does not break the stream
+                        try:
+                            average_price = self._parse_price(msg.data)
+                        except msgspec.DecodeError as exc:
+                            logger.warning('Unexpected websocket message %.200s: %s', msg.data, exc)
+                            continue
+                        yield average_price, True
+                    case WSMsgType.CLOSE | WSMsgType.CLOSING | WSMsgType.CLOSED:
+                        logger.info('Websocket connection closed')
+                        break
+                    case WSMsgType.ERROR:
+                        logger.error('Received websocket connection error: %s', msg.data)
+                        break
+
+    async def _backfill(self, directions: Sequence[str]) -> list[CurrencyRateBinance]:
+        if self.rest_client is None:
+            return []
+        try:
+            return await self.rest_client.get_price(directions)
+        except Exception as exc:
+            logger.warning('Could not fill websocket gap through REST API: %r', exc)
+            return []
+
+    def _backoff(self, attempt: int) -> float:
+        # full jitter, so workers do not reconnect all at once
+        return random.uniform(0, min(self.reconnect_max_delay, self.reconnect_min_delay * 2 ** attempt))
+
+    def _mark_disconnected(self) -> None:
+        if self.disconnected_at is None:
+            self.disconnected_at = time.monotonic()
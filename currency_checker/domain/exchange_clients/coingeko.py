@@ -1,19 +1,39 @@
-import json
+from collections.abc import Sequence
 
 from currency_checker.domain.exchange_clients.base import AbstractExchangeClient
 from currency_checker.infrastructure.base_api_client.base_client import BaseClient, BaseSession
-from currency_checker.infrastructure.base_api_client.exceptions import ApiClientResponseError
+from currency_checker.infrastructure.base_api_client.circuit_breaker import CircuitBreaker
+from currency_checker.infrastructure.base_api_client.hedging import HedgingPolicy
+from currency_checker.infrastructure.base_api_client.retries import RetryPolicy
+from currency_checker.infrastructure.base_api_client.timeouts import RequestTimeout
 
 
-class CoingekoClient(AbstractExchangeClient, BaseClient):
+class CoingekoClient(BaseClient, AbstractExchangeClient):
     session_class = BaseSession
     _api_service_name: str = 'coin_geko'
 
-    def __init__(self, api_key: str) -> None:
+    def __init__(
+        self,
+        api_key: str,
+        keepalive_timeout: float = 15.0,
+        dns_cache_ttl: int | None = 10,
+        retry_policy: RetryPolicy | None = None,
+        circuit_breaker: CircuitBreaker | None = None,
+        timeout: RequestTimeout | None = None,
+        hedging: HedgingPolicy | None = None,
+        trace_body_sample_rate: float = 0.0,
+    ) -> None:
         super().__init__(
             base_uri='https://api.coingecko.com/api/v3/simple/',
+            retry_policy=retry_policy,
+            circuit_breaker=circuit_breaker,
+            timeout=timeout,
+            hedging=hedging,
+            keepalive_timeout=keepalive_timeout,
+            dns_cache_ttl=dns_cache_ttl,
             enable_metrics=True,
             client_name='currency_checker',
+            trace_body_sample_rate=trace_body_sample_rate,
 
         )
         self.api_key = api_key
@@ -21,10 +41,11 @@ class CoingekoClient(AbstractExchangeClient, BaseClient):
 
     async def get_price(
         self,
-        currencies: list[str],
-        vs_currencies: list[str],
+        currencies: Sequence[str],
+        vs_currencies: Sequence[str],
     ) -> dict[str, dict[str, float]]:
-        response = await self.session.request(
+        return await self.session.request_model(
+            dict[str, dict[str, float]],
             method='get',
             path_template='price',
             params={
@@ -33,11 +54,3 @@ class CoingekoClient(AbstractExchangeClient, BaseClient):
                 'x_cg_demo_api_key': self.api_key,
             }
         )
-
-        if response.status != 200:
-            raise ApiClientResponseError(
-                request_info=response.request_info,
-                status=response.status,
-                message=response.data,
-            )
-        return json.loads(response.data)
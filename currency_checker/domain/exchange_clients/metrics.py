@@ -0,0 +1,14 @@
+from prometheus_client import Counter, Histogram
+
+
+WEBSOCKET_RECONNECTS = Counter(
+    name='currency_checker_websocket_reconnects',
+    documentation='Reconnections of exchanger websocket streams',
+    labelnames=('exchanger',),
+)
+WEBSOCKET_GAP_SECONDS = Histogram(
+    name='currency_checker_websocket_gap_seconds',
+    documentation='Time between loss of exchanger websocket stream and its restoration',
+    labelnames=('exchanger',),
+    buckets=(0.5, 1, 2.5, 5, 10, 30, 60, 120, 300),
+)
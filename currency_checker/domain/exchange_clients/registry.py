@@ -0,0 +1,101 @@
+from collections.abc import Callable
+from typing import TypeVar
+
+from redis.asyncio import Redis
+
+from currency_checker.domain.exchange_clients.base import AbstractExchangeClient
+from currency_checker.domain.exchange_clients.binance import BinanceClient, BinanceWeightThrottler
+from currency_checker.domain.exchange_clients.coingeko import CoingekoClient
+from currency_checker.infrastructure.base_api_client.base_throttler import BaseThrottler
+from currency_checker.infrastructure.base_api_client.circuit_breaker import CircuitBreaker
+from currency_checker.infrastructure.base_api_client.hedging import HedgingPolicy
+from currency_checker.infrastructure.base_api_client.retries import RetryPolicy
+from currency_checker.infrastructure.base_api_client.throttlers import ChainThrottler, RedisThrottler
+from currency_checker.infrastructure.base_api_client.timeouts import RequestTimeout
+from currency_checker.infrastructure.settings import ExchangeClientSettings
+
+
+ClientT = TypeVar('ClientT', bound=AbstractExchangeClient)
+
+_clients: dict[tuple, AbstractExchangeClient] = {}
+_circuit_breakers: dict[str, CircuitBreaker] = {}  # one per upstream, shared by clients with different keys
+
+
+def get_binance_client(settings: ExchangeClientSettings, redis: Redis) -> BinanceClient:
+    """
+    Process-wide client, its connections are kept alive between job runs.
+
+    Clients should be closed with `close_exchange_clients` on process shutdown.
+    """
+    def create() -> BinanceClient:
+        throttler: BaseThrottler = BinanceWeightThrottler(weight_limit=settings.binance_weight_limit)
+        if settings.binance_requests_per_minute:
+            throttler = ChainThrottler(
+                RedisThrottler(redis, 'binance:throttler', settings.binance_requests_per_minute, period=60),
+                throttler,
+            )
+        return BinanceClient(
+            keepalive_timeout=settings.keepalive_timeout,
+            dns_cache_ttl=settings.dns_cache_ttl,
+            throttler=throttler,
+            retry_policy=_retry_policy(settings),
+            circuit_breaker=_get_circuit_breaker('binance', settings),
+            timeout=_request_timeout(settings),
+            hedging=_hedging_policy(settings),
+            trace_body_sample_rate=settings.trace_body_sample_rate,
+        )
+
+    return _get_client(('binance', settings), create)
+
+
+def get_coingeko_client(settings: ExchangeClientSettings, api_key: str) -> CoingekoClient:
+    """Process-wide client for every API key, see `get_binance_client`."""
+    return _get_client(
+        ('coingeko', settings, api_key),
+        lambda: CoingekoClient(
+            api_key,
+            keepalive_timeout=settings.keepalive_timeout,
+            dns_cache_ttl=settings.dns_cache_ttl,
+            retry_policy=_retry_policy(settings),
+            circuit_breaker=_get_circuit_breaker('coingeko', settings),
+            timeout=_request_timeout(settings),
+            hedging=_hedging_policy(settings),
+            trace_body_sample_rate=settings.trace_body_sample_rate,
+        ),
+    )
+
+
+async def close_exchange_clients() -> None:
+    while _clients:
+        _, client = _clients.popitem()
+        await client.close()
+
+
+def _get_client(key: tuple, factory: Callable[[], ClientT]) -> ClientT:
+    if key not in _clients:
+        _clients[key] = factory()
+    return _clients[key]  # type: ignore[return-value]
+
+
+def _retry_policy(settings: ExchangeClientSettings) -> RetryPolicy:
+    return RetryPolicy(attempts=settings.retry_attempts, deadline=settings.retry_deadline)
+
+
+def _request_timeout(settings: ExchangeClientSettings) -> RequestTimeout:
+    return RequestTimeout(connect=settings.connect_timeout, ttfb=settings.ttfb_timeout, total=settings.request_timeout)
+
+
+def _hedging_policy(settings: ExchangeClientSettings) -> HedgingPolicy | None:
+    if not settings.hedging_budget:
+        return None
+    return HedgingPolicy(quantile=settings.hedging_quantile, budget=settings.hedging_budget)
+
+
+def _get_circuit_breaker(name: str, settings: ExchangeClientSettings) -> CircuitBreaker:
+    if name not in _circuit_breakers:
+        _circuit_breakers[name] = CircuitBreaker(
+            name,
+            failure_threshold=settings.circuit_failure_threshold,
+            recovery_timeout=settings.circuit_recovery_timeout,
+        )
+    return _circuit_breakers[name]
@@ -0,0 +1,71 @@
+"""
+Vectorized operations over rate history.
+
+Series are pairs of numpy arrays: timestamps in milliseconds (int64, ascending) and values (float64).
+"""
+from collections.abc import Sequence
+from typing import NamedTuple
+
+import numpy as np
+import numpy.typing as npt
+
+
+Timestamps = npt.NDArray[np.int64]
+Values = npt.NDArray[np.float64]
+
+
+class Series(NamedTuple):
+    timestamps: Timestamps
+    values: Values
+
+
+class OHLC(NamedTuple):
+    timestamps: Timestamps  # start of bucket
+    open: Values
+    high: Values
+    low: Values
+    close: Values
+
+
+def empty_series() -> Series:
+    return Series(np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float64))
+
+
+def multiply_series(series: list[Series], exponents: Sequence[int] | None = None) -> Series:
+    """
+    Product of several series (e.g. legs of cross rate) on the union of their timestamps.
+
+    Every series is taken "as of" timestamp (last known value), points before all series have a value are dropped.
+    `exponents` allow to use inverse rate of a leg (-1).
+    """
+    exponents = exponents or [1] * len(series)
+    if len(series) == 1 and exponents[0] == 1:
+        return series[0]
+    # inputs are sorted, so stable sort is a merge of runs (much faster than np.unique)
+    timestamps = np.sort(np.concatenate([item.timestamps for item in series]), kind='stable')
+    if not len(timestamps):
+        return empty_series()
+    timestamps = timestamps[np.concatenate(([True], timestamps[1:] != timestamps[:-1]))]
+    values = np.ones(len(timestamps), dtype=np.float64)
+    known = np.ones(len(timestamps), dtype=bool)
+    for item, exponent in zip(series, exponents):
+        positions = np.searchsorted(item.timestamps, timestamps, side='right') - 1
+        known &= positions >= 0
+        values *= item.values[np.maximum(positions, 0)] ** exponent if len(item.values) else np.nan
+    return Series(timestamps[known], values[known])
+
+
+def downsample_ohlc(series: Series, interval_ms: int) -> OHLC:
+    if not len(series.timestamps):
+        empty = np.empty(0, dtype=np.float64)
+        return OHLC(series.timestamps, empty, empty, empty, empty)
+    buckets = series.timestamps // interval_ms
+    starts = np.concatenate(([0], np.flatnonzero(np.diff(buckets)) + 1))
+    ends = np.concatenate((starts[1:], [len(buckets)])) - 1
+    return OHLC(
+        timestamps=buckets[starts] * interval_ms,
+        open=series.values[starts],
+        high=np.maximum.reduceat(series.values, starts),
+        low=np.minimum.reduceat(series.values, starts),
+        close=series.values[ends],
+    )
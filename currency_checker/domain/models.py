@@ -1,15 +1,20 @@
+from dataclasses import dataclass
 from enum import StrEnum
+from typing import Any
 
-from pydantic import BaseModel
+import msgspec
 
 
-class Account(BaseModel):
+@dataclass(frozen=True, slots=True)
+class Account:
     token: str
 
-    class Config:
-        orm_mode = True
+    @classmethod
+    def from_orm(cls, obj: Any) -> 'Account':
+        return cls(token=obj.token)
 
 
+# exchangers of built-in adapters, adapters of other exchanges use any unique name
 class Exchanger(StrEnum):
     BINANCE = "binance"
     COINBASE = "coinbase"
@@ -25,6 +30,27 @@ class Direction(StrEnum):
     USDTERC_RUB = 'USDTERC-RUB'
     USDTERC_USD = 'USDTERC-USD'
 
+    @property
+    def assets(self) -> tuple[str, str]:
+        base, quote = self.split('-')
+        return base, quote
+
+
+class HistoryInterval(StrEnum):
+    RAW = 'raw'
+    SECOND = '1s'
+    MINUTE = '1m'
+    HOUR = '1h'
+
+    @property
+    def milliseconds(self) -> int:
+        return {
+            HistoryInterval.RAW: 0,
+            HistoryInterval.SECOND: 1000,
+            HistoryInterval.MINUTE: 60_000,
+            HistoryInterval.HOUR: 3_600_000,
+        }[self]
+
 
 class CurrenciesCoinbase(StrEnum):
     TRON = 'tron'
@@ -44,6 +70,19 @@ class DirectionBinance(StrEnum):
     USDT_RUB = 'USDTRUB'
 
 
-class CurrencyRateBinance(BaseModel):
-    symbol: DirectionBinance
+@dataclass(slots=True)
+class CurrencyRateBinance:
+    symbol: str
     price: float
+
+
+class BinanceAveragePrice(msgspec.Struct, gc=False):
+    """Rate from `<symbol>@avgPrice` stream, decoded without validation of symbol."""
+
+    symbol: str = msgspec.field(name='s')
+    price: float = msgspec.field(name='w')  # sent as string, converted by non-strict decoder
+    event_time: int = msgspec.field(name='E')  # milliseconds
+
+
+class BinanceStreamMessage(msgspec.Struct, gc=False):
+    data: BinanceAveragePrice
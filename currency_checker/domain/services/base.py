@@ -1,14 +1,154 @@
+import json
 from abc import ABC, abstractmethod
-from typing import Any
+from collections.abc import Mapping, Sequence
+from logging import getLogger
+from typing import Any, ClassVar, NamedTuple
 
+from currency_checker.domain.conversion import ConversionGraph, ConversionPlan
+from currency_checker.domain.exceptions import ConversionPathNotFound, CurrencyRateNotFound
+from currency_checker.domain.history import Series, multiply_series
 from currency_checker.domain.models import Direction
+from currency_checker.domain.storages.currency import SNAPSHOT_VERSION_FIELD, AbstractCurrencyStorage
+from currency_checker.domain.symbols import SymbolMapping, SymbolTable
+
+
+logger = getLogger(__name__)
+
+FULL_SNAPSHOT_FIELD = '*'
+
+_reported_unmapped: set[tuple[str, tuple[Direction, ...]]] = set()
+
+
+class Snapshot(NamedTuple):
+    version: str
+    document: bytes
 
 
 class AbstractCurrencyService(ABC):
-    @abstractmethod
+    exchanger: str  # name of exchange in API
+    # built-in mappings, used until mappings are loaded from database
+    mappings: Sequence[SymbolMapping]
+    # asset names used in directions, but absent on exchanger, e.g. USDTTRC -> TRX
+    aliases: Mapping[str, str] = {}
+    _default_symbol_table: ClassVar[SymbolTable]
+
+    def __init__(self, storage: AbstractCurrencyStorage, symbol_table: SymbolTable | None = None) -> None:
+        self.storage = storage
+        self.set_symbol_table(symbol_table or self.default_symbol_table())
+
+    @classmethod
+    def default_symbol_table(cls) -> SymbolTable:
+        # tables are immutable, so built-in one is compiled once per class
+        if '_default_symbol_table' not in cls.__dict__:
+            cls._default_symbol_table = SymbolTable(cls.mappings, cls.aliases)
+        return cls._default_symbol_table
+
+    def set_symbol_table(self, symbol_table: SymbolTable) -> None:
+        """Switch to new mappings, e.g. after they were changed in database."""
+        self.symbol_table = symbol_table
+        self.conversion = symbol_table.conversion
+        self.snapshot_directions = self._get_mapped_directions()
+
+    def _get_mapped_directions(self) -> list[Direction]:
+        """Directions which have conversion path, unmapped ones are left out of snapshot."""
+        mapped, unmapped = [], []
+        for direction in Direction:
+            try:
+                self.conversion.path(direction.assets)
+            except ConversionPathNotFound:
+                unmapped.append(direction)
+            else:
+                mapped.append(direction)
+        # services are created by every job, so the same gap is reported once per process
+        if unmapped and (self.exchanger, tuple(unmapped)) not in _reported_unmapped:
+            _reported_unmapped.add((self.exchanger, tuple(unmapped)))
+            logger.warning(
+                'Symbols of %s do not cover directions %s, they are left out of snapshot',
+                self.exchanger,
+                ', '.join(unmapped),
+            )
+        return mapped
+
     async def get_course_value(self, direction: Direction) -> float:
-        ...
+        return (await self.get_course_values([direction]))[direction]
+
+    async def get_course_values(self, directions: list[Direction]) -> dict[Direction, float]:
+        plan = self.plan_course_values(directions)
+        return self.evaluate_course_values(directions, plan, await self.storage.get_keys(plan.symbols))
+
+    def plan_course_values(self, directions: list[Direction]) -> ConversionPlan:
+        """Conversion of `directions`, its `symbols` are storage keys to read."""
+        return self.conversion.plan(tuple(direction.assets for direction in directions))
+
+    @staticmethod
+    def evaluate_course_values(
+        directions: list[Direction], plan: ConversionPlan, rates: Sequence[float]
+    ) -> dict[Direction, float]:
+        """Courses of `directions` planned by `plan_course_values`, `rates` are values of `plan.symbols`."""
+        return dict(zip(directions, ConversionGraph.evaluate(plan, rates).tolist()))
 
     @abstractmethod
     async def save_course_values(self, course_values: Any) -> None:
         ...
+
+    async def get_course_history(self, direction: Direction, start: int, end: int) -> Series:
+        """
+        Course history between `start` and `end` (milliseconds), cross rates are computed point by point.
+
+        :raises ValueError: if assets of direction are the same on exchanger, its course has no history.
+        """
+        path = self.conversion.path_symbols(direction.assets)
+        if not path:
+            raise ValueError(f'Course of {direction.value} is always 1 on exchanger {self.exchanger}')
+        keys, exponents = zip(*path)
+        return multiply_series(await self.storage.get_histories(keys, start, end), exponents)
+
+    async def save_snapshot(self) -> None:
+        """
+        Pre-render response documents for API after new rates were saved.
+
+        Snapshot contains whole document for all mapped directions and rendered course for every one of them,
+        so API can build response for any subset of directions without deserialization.
+        Whole document is also published for clients of live updates stream.
+        """
+        directions = self.snapshot_directions
+        if not directions:
+            return
+        try:
+            values = await self.get_course_values(directions)
+        except CurrencyRateNotFound as exc:
+            logger.debug('Snapshot for %s is not saved, rates are not ingested yet: %s', self.exchanger, exc)
+            return
+
+        courses = {
+            direction.value: self._dumps({'direction': direction.value, 'value': float(values[direction])})
+            for direction in directions
+        }
+        document = self._render_courses(list(courses.values()))
+        await self.storage.set_snapshot({FULL_SNAPSHOT_FIELD: document, **courses}, update=document)
+
+    async def get_snapshot(self, directions: list[Direction] | None = None) -> Snapshot | None:
+        """Pre-rendered response document with its version or None if snapshot is absent."""
+        if not directions:
+            version, document = await self.storage.get_snapshot([SNAPSHOT_VERSION_FIELD, FULL_SNAPSHOT_FIELD])
+            if version is None or document is None:
+                return None
+            return Snapshot(version.decode(), document)
+
+        version, *courses = await self.storage.get_snapshot([SNAPSHOT_VERSION_FIELD, *directions])
+        if version is None or None in courses:
+            return None
+        return Snapshot(version.decode(), self._render_courses(courses))  # type: ignore[arg-type]
+
+    async def get_snapshot_version(self) -> str | None:
+        """Version of current snapshot, changes on every save of new rates."""
+        (version,) = await self.storage.get_snapshot([SNAPSHOT_VERSION_FIELD])
+        return version.decode() if version is not None else None
+
+    def _render_courses(self, courses: list[bytes]) -> bytes:
+        # same document as `CoursesResponse` would produce
+        return b'{"exchanger":%s,"courses":[%s]}' % (self._dumps(str(self.exchanger)), b','.join(courses))
+
+    @staticmethod
+    def _dumps(value: Any) -> bytes:
+        return json.dumps(value, ensure_ascii=False, allow_nan=False, separators=(',', ':')).encode()
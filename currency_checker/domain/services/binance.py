@@ -1,30 +1,31 @@
-from currency_checker.domain.models import CurrencyRateBinance, Direction, DirectionBinance
+from collections.abc import Sequence
+
+from currency_checker.domain.models import BinanceAveragePrice, CurrencyRateBinance, DirectionBinance, Exchanger
 from currency_checker.domain.services import AbstractCurrencyService
-from currency_checker.domain.storages.currency import AbstractCurrencyStorage
+from currency_checker.domain.symbols import SymbolMapping
 
 
-class BinanceService(AbstractCurrencyService):
-    def __init__(self, storage: AbstractCurrencyStorage) -> None:
-        self.storage = storage
+# mappings are stored in `symbols` table, these ones are used until it is loaded
+MAPPINGS = [
+    SymbolMapping(DirectionBinance.BTC_RUB, 'BTC', 'RUB'),
+    SymbolMapping(DirectionBinance.BTC_USDT, 'BTC', 'USDT'),
+    SymbolMapping(DirectionBinance.ETH_RUB, 'ETH', 'RUB'),
+    SymbolMapping(DirectionBinance.ETH_USDT, 'ETH', 'USDT'),
+    SymbolMapping(DirectionBinance.TRX_USDT, 'TRX', 'USDT'),
+    SymbolMapping(DirectionBinance.USDT_RUB, 'USDT', 'RUB'),
+]
+ALIASES: dict[str, str] = {
+    'USDTTRC': 'TRX',
+    'USDTERC': 'USDT',
+    # let's assume that USDT and USD is the same currency (because rate ~1)
+    'USD': 'USDT',
+}
 
-    async def get_course_value(self, direction: Direction) -> float:
-        if direction == Direction.USDTERC_USD:
-            # let's assume that USDT and USD is the same currency (because rate ~1)
-            return 1
-        if direction == Direction.USDTTRC_RUB:
-            # on this platform there are no info about TRX-RUB pair
-            trx_to_usd = await self.storage.get_key(DirectionBinance.TRX_USDT)
-            usd_to_rub = await self.storage.get_key(DirectionBinance.USDT_RUB)
-            return trx_to_usd * usd_to_rub
-        mapping = {  # if there will be more currencies this mapping might be stored in database
-            Direction.USDTTRC_USD: DirectionBinance.TRX_USDT,
-            Direction.USDTERC_RUB: DirectionBinance.USDT_RUB,
-            Direction.ETH_RUB: DirectionBinance.ETH_RUB,
-            Direction.ETH_USD: DirectionBinance.ETH_USDT,
-            Direction.BTC_RUB: DirectionBinance.BTC_RUB,
-            Direction.BTC_USD: DirectionBinance.BTC_USDT,
-        }
-        return await self.storage.get_key(mapping[direction])
 
-    async def save_course_values(self, currency_rate: CurrencyRateBinance) -> None:
-        await self.storage.set_key(currency_rate.symbol, currency_rate.price)
+class BinanceService(AbstractCurrencyService):
+    exchanger = Exchanger.BINANCE
+    mappings = MAPPINGS
+    aliases = ALIASES
+
+    async def save_course_values(self, currency_rates: Sequence[CurrencyRateBinance | BinanceAveragePrice]) -> None:
+        await self.storage.set_keys({currency_rate.symbol: currency_rate.price for currency_rate in currency_rates})
@@ -1,37 +1,50 @@
 from .base import AbstractCurrencyService
-from currency_checker.domain.models import CurrenciesCoinbase, Direction
-from currency_checker.domain.storages.currency import AbstractCurrencyStorage
+from currency_checker.domain.models import CurrenciesCoinbase, Exchanger
+from currency_checker.domain.symbols import SymbolMapping
 
 
-class CoingekoService(AbstractCurrencyService):
-    def __init__(self, storage: AbstractCurrencyStorage) -> None:
-        self.storage = storage
+# mappings are stored in `symbols` table, these ones are used until it is loaded
+_CURRENCY_TO_ASSET: dict[str, str] = {
+    CurrenciesCoinbase.TRON: 'TRX',
+    CurrenciesCoinbase.RUB: 'RUB',
+    CurrenciesCoinbase.USD: 'USD',
+    CurrenciesCoinbase.TETHER: 'USDT',
+    CurrenciesCoinbase.ETHEREUM: 'ETH',
+    CurrenciesCoinbase.BITCOIN: 'BTC',
+}
+MAPPINGS = [
+    SymbolMapping(
+        symbol=f'{_CURRENCY_TO_ASSET[currency]}{_CURRENCY_TO_ASSET[vs_currency]}',
+        base=_CURRENCY_TO_ASSET[currency],
+        quote=_CURRENCY_TO_ASSET[vs_currency],
+        base_code=currency,
+        quote_code=vs_currency,
+    )
+    for currency in (
+        CurrenciesCoinbase.BITCOIN,
+        CurrenciesCoinbase.ETHEREUM,
+        CurrenciesCoinbase.TETHER,
+        CurrenciesCoinbase.TRON,
+    )
+    for vs_currency in (CurrenciesCoinbase.USD, CurrenciesCoinbase.RUB)
+]
+ALIASES: dict[str, str] = {
+    'USDTTRC': 'TRX',
+    'USDTERC': 'USDT',
+}
+
 
-    async def get_course_value(self, direction: Direction) -> float:
-        mapping = {  # if there will be more currencies this mapping might be stored in database
-            Direction.USDTTRC_USD: 'TRXUSD',
-            Direction.USDTTRC_RUB: 'TRXRUB',
-            Direction.USDTERC_USD: 'USDTUSD',
-            Direction.USDTERC_RUB: 'USDTRUB',
-            Direction.ETH_RUB: 'ETHRUB',
-            Direction.ETH_USD: 'ETHUSD',
-            Direction.BTC_RUB: 'BTCRUB',
-            Direction.BTC_USD: 'BTCUSD',
-        }
-        return await self.storage.get_key(mapping[direction])
+class CoingekoService(AbstractCurrencyService):
+    exchanger = Exchanger.COINBASE
+    mappings = MAPPINGS
+    aliases = ALIASES
 
-    async def save_course_values(self, course_values: dict) -> None:
-        mapping = {  # if there will be more currencies this mapping might be stored in database
-            CurrenciesCoinbase.TRON: 'TRX',
-            CurrenciesCoinbase.RUB: 'RUB',
-            CurrenciesCoinbase.USD: 'USD',
-            CurrenciesCoinbase.TETHER: 'USDT',
-            CurrenciesCoinbase.ETHEREUM: 'ETH',
-            CurrenciesCoinbase.BITCOIN: 'BTC',
-        }
-        for first_currency, vs_currencies in course_values.items():
-            for second_currency, rate in vs_currencies.items():
-                await self.storage.set_key(
-                    f'{mapping[first_currency]}{mapping[second_currency]}',
-                    rate
-                )
+    async def save_course_values(self, course_values: dict[str, dict[str, float]]) -> None:
+        table = self.symbol_table
+        values = {}
+        for currency, vs_currencies in course_values.items():
+            for vs_currency, rate in vs_currencies.items():
+                symbol = table.symbol_by_codes(currency, vs_currency)
+                if symbol is not None:
+                    values[symbol] = rate
+        await self.storage.set_keys(values)
@@ -2,11 +2,11 @@ from abc import ABC, abstractmethod
 from itertools import cycle
 
 from sqlalchemy import select
-from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
 
 from currency_checker.domain.exceptions import AccountsNotFound
 from currency_checker.domain.models import Account
-from currency_checker.infrastructure.postgres import Accounts
+from currency_checker.infrastructure.postgres import Accounts, create_engine
 from currency_checker.infrastructure.settings import PostgresSettings
 
 
@@ -19,24 +19,21 @@ class AbstractAccountStorage(ABC):
     def get_active_account(self, source: str) -> Account:
         ...
 
+    @abstractmethod
+    def get_active_accounts(self, source: str) -> list[Account]:
+        ...
+
 
 class PostgresAccountStorage(AbstractAccountStorage):
     def __init__(self, postgres_settings: PostgresSettings) -> None:
-        dsn = f'postgresql+asyncpg://{postgres_settings.user}:{postgres_settings.password}@{postgres_settings.host}:{postgres_settings.port}/{postgres_settings.database}'
-        self._engine: AsyncEngine = create_async_engine(
-            dsn,
-            echo=False,
-            connect_args={
-                'ssl': postgres_settings.ssl_mode,
-                'statement_cache_size': 0,
-            }
-        )
+        self._engine: AsyncEngine = create_engine(postgres_settings)
         self._sessionmaker = async_sessionmaker(
             bind=self._engine,
             expire_on_commit=False,
             class_=AsyncSession
         )
 
+        self._accounts: dict[str, list[Account]] = {}
         self._active_accounts: dict[str, cycle[Account]] = {}
 
     async def cache_all_active_accounts(self, source: str) -> None:
@@ -45,7 +42,11 @@ class PostgresAccountStorage(AbstractAccountStorage):
         query_result = await session.execute(query)
         if query_result is None:
             raise AccountsNotFound
-        self._active_accounts[source] = cycle([Account.from_orm(account) for account in query_result.fetchall()])
+        self._accounts[source] = [Account.from_orm(account) for account in query_result.fetchall()]
+        self._active_accounts[source] = cycle(self._accounts[source])
 
     def get_active_account(self, source: str) -> Account:
         return next(self._active_accounts.get(source))  # type: ignore
+
+    def get_active_accounts(self, source: str) -> list[Account]:
+        return self._accounts.get(source, [])
@@ -0,0 +1,130 @@
+import asyncio
+import time
+from abc import ABC, abstractmethod
+from collections.abc import Sequence
+
+from redis.asyncio import Redis
+
+from currency_checker.domain.exceptions import AccountsNotFound
+
+
+# Picks the key with most tokens left among keys which are not cooling down and takes one token from it.
+# KEYS[1] - set of API keys, KEYS[1 + i] and KEYS[1 + n + i] - cooldown and bucket of API key ARGV[3 + i],
+# every key it touches is passed in KEYS, so it runs on Redis Cluster too.
+# Returns {key or false, milliseconds until some key might have a token}.
+ACQUIRE_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local bucket_ttl = tonumber(ARGV[3])
+local n = #ARGV - 3
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) * 1000 + math.floor(tonumber(clock[2]) / 1000)
+
+local best, best_bucket, best_tokens, wait = false, false, -1, -1
+for i = 1, n do
+    local key = ARGV[3 + i]
+    -- key might be removed from pool after client read its members
+    if redis.call('SISMEMBER', KEYS[1], key) == 1 then
+        local cooldown = redis.call('PTTL', KEYS[1 + i])
+        if cooldown > 0 then
+            if wait < 0 or cooldown < wait then wait = cooldown end
+        else
+            local state = redis.call('HMGET', KEYS[1 + n + i], 'tokens', 'updated_at')
+            local tokens = tonumber(state[1]) or capacity
+            local updated_at = tonumber(state[2]) or now
+            tokens = math.min(capacity, tokens + math.max(0, now - updated_at) * rate)
+            if tokens > best_tokens then best, best_bucket, best_tokens = key, KEYS[1 + n + i], tokens end
+        end
+    end
+end
+
+if best and best_tokens >= 1 then
+    redis.call('HSET', best_bucket, 'tokens', tostring(best_tokens - 1), 'updated_at', now)
+    redis.call('PEXPIRE', best_bucket, bucket_ttl)
+    return {best, 0}
+end
+if best then
+    local refill = math.ceil((1 - best_tokens) / rate)
+    if wait < 0 or refill < wait then wait = refill end
+end
+return {false, wait}
+"""
+
+
+class AbstractApiKeyPool(ABC):
+    @abstractmethod
+    async def set_keys(self, keys: Sequence[str]) -> None:
+        """Replace keys of pool, state of remaining keys is kept."""
+        ...
+
+    @abstractmethod
+    async def acquire(self, timeout: float = 0) -> str | None:
+        """
+        Key with most requests left, waits up to `timeout` seconds when all keys are exhausted.
+
+        :raises AccountsNotFound: pool has no keys
+        """
+        ...
+
+    @abstractmethod
+    async def cool_down(self, key: str, seconds: float) -> None:
+        """Do not give out `key` for `seconds`, e.g. after 429 response."""
+        ...
+
+
+class RedisApiKeyPool(AbstractApiKeyPool):
+    """
+    API keys with token bucket per key, shared by all worker processes.
+
+    Keys are stored in `{<prefix>}/keys` set, bucket state in `{<prefix>}/bucket/<key>` hashes
+    and cooldowns as expiring `{<prefix>}/cooldown/<key>` keys. Prefix is a hash tag, so all of them are
+    in one slot of Redis Cluster. Buckets are updated by Lua script with Redis clock,
+    so concurrent workers never give out more requests than quota allows.
+    """
+
+    def __init__(self, redis: Redis, key_prefix: str, requests_per_minute: float, burst: int = 1) -> None:
+        self.redis = redis
+        self.key_prefix = key_prefix
+        self._prefix = f'{{{key_prefix}}}'
+        self._rate = requests_per_minute / 60_000  # tokens per millisecond
+        self._burst = burst
+        self._acquire_script = redis.register_script(ACQUIRE_SCRIPT)
+
+    async def set_keys(self, keys: Sequence[str]) -> None:
+        async with self.redis.pipeline(transaction=True) as pipeline:
+            pipeline.delete(f'{self._prefix}/keys')
+            if keys:
+                pipeline.sadd(f'{self._prefix}/keys', *keys)
+            await pipeline.execute()
+
+    async def acquire(self, timeout: float = 0) -> str | None:
+        deadline = time.monotonic() + timeout
+        # script may touch only keys passed to it, so names of cooldowns and buckets are built from members
+        members = await self.redis.smembers(f'{self._prefix}/keys')  # type: ignore[misc]
+        keys = sorted(member.decode() for member in members)
+        if not keys:
+            raise AccountsNotFound('no API keys configured')
+        redis_keys = [
+            f'{self._prefix}/keys',
+            *[f'{self._prefix}/cooldown/{key}' for key in keys],
+            *[f'{self._prefix}/bucket/{key}' for key in keys],
+        ]
+        while True:
+            key, wait = await self._acquire_script(
+                keys=redis_keys,
+                args=[self._rate, self._burst, self._bucket_ttl, *keys],
+            )
+            if key is not None:
+                return key.decode()
+            remaining = deadline - time.monotonic()
+            if wait < 0 or remaining <= 0:  # keys were removed or timeout is exceeded
+                return None
+            await asyncio.sleep(min(wait / 1000, remaining))
+
+    async def cool_down(self, key: str, seconds: float) -> None:
+        await self.redis.set(f'{self._prefix}/cooldown/{key}', 1, px=max(1, int(seconds * 1000)))
+
+    @property
+    def _bucket_ttl(self) -> int:
+        # idle bucket is refilled completely by then, so its state is not needed anymore
+        return int(self._burst / self._rate) + 1000
@@ -1,8 +1,40 @@
+import asyncio
+import struct
+import time
 from abc import ABC, abstractmethod
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable, Mapping, Sequence
+from logging import getLogger
 
+import numpy as np
 from redis.asyncio import Redis
+from redis.exceptions import RedisError, ResponseError
 
-from currency_checker.infrastructure.settings import RedisSettings
+from currency_checker.domain.exceptions import CurrencyRateNotFound
+from currency_checker.domain.history import Series, empty_series
+from currency_checker.domain.storages.metrics import (
+    INGESTION_WRITES,
+    LOCAL_CACHE_HITS,
+    LOCAL_CACHE_INVALIDATIONS,
+    LOCAL_CACHE_MISSES,
+    WRITE_BUFFER_CONFLATED,
+    WRITE_BUFFER_DROPPED,
+    WRITE_BUFFER_FLUSHES,
+)
+from currency_checker.infrastructure.redis import get_redis
+from currency_checker.infrastructure.settings import HistorySettings, RedisSettings
+
+
+logger = getLogger(__name__)
+
+SNAPSHOT_KEY = 'snapshot'
+SNAPSHOT_VERSION_KEY = 'version'
+SNAPSHOT_VERSION_FIELD = '#version'
+HEARTBEAT_KEY = 'heartbeat'
+UPDATES_CHANNEL = 'updates'
+
+HISTORY_POINT = struct.Struct('<qd')  # timestamp in milliseconds, value
+HISTORY_DTYPE = np.dtype([('timestamp', '<i8'), ('value', '<f8')])
 
 
 class AbstractCurrencyStorage(ABC):
@@ -10,22 +42,502 @@ class AbstractCurrencyStorage(ABC):
     async def get_key(self, key: str) -> float:
         ...
 
+    @abstractmethod
+    async def get_keys(self, keys: Sequence[str]) -> list[float]:
+        """Read several keys in one round trip, values are returned in the order of `keys`."""
+        ...
+
     @abstractmethod
     async def set_key(self, key: str, value: float) -> None:
         ...
 
+    @abstractmethod
+    async def set_keys(self, values: Mapping[str, float]) -> None:
+        """Write several keys in one round trip."""
+        ...
+
+    @abstractmethod
+    async def touch_keys(self, keys: Sequence[str]) -> None:
+        """Refresh heartbeat of keys whose values did not change, written keys are refreshed by `set_keys`."""
+        ...
+
+    @abstractmethod
+    async def get_histories(self, keys: Sequence[str], start: int, end: int) -> list[Series]:
+        """History of every key between `start` and `end` (milliseconds, inclusive) in one round trip."""
+        ...
+
+    @abstractmethod
+    async def get_snapshot(self, fields: Sequence[str]) -> list[bytes | None]:
+        ...
+
+    @abstractmethod
+    async def set_snapshot(self, fields: Mapping[str, bytes], update: bytes | None = None) -> None:
+        """
+        Atomically replace pre-rendered snapshot with `fields`.
+
+        Snapshot gets new version in `SNAPSHOT_VERSION_FIELD` field, every version is used only once.
+
+        :param update: message for subscribers of live updates, published together with snapshot
+        """
+        ...
+
 
 class RedisCurrencyStorage(AbstractCurrencyStorage):
-    def __init__(self, settings: RedisSettings, key_prefix: str = '') -> None:
-        self.redis = Redis(
-            host=settings.host,
-            port=settings.port,
-            db=settings.database,
-        )
+    """
+    Rates are stored as plain keys `<prefix>/<key>`.
+
+    If history is enabled, every write is also appended as packed (timestamp, value) record to
+    `<prefix>:history/<key>/<chunk>` strings, one per `chunk_size` seconds, which expire after retention period.
+    Time of the latest write or touch of every key (milliseconds) is kept in `<prefix>:heartbeat` hash.
+    History and heartbeat keys are outside of `<prefix>/*` on purpose, so they do not trigger local caches invalidation.
+    """
+
+    def __init__(self, settings: RedisSettings, key_prefix: str = '', history: HistorySettings | None = None) -> None:
+        self.redis = get_redis(settings)
         self.key_prefix = key_prefix
+        self.updates_channel = f'{key_prefix}/{UPDATES_CHANNEL}'
+        self.heartbeat_key = f'{key_prefix}:{HEARTBEAT_KEY}'
+        self.history = history
 
     async def get_key(self, key: str) -> float:
-        return float(await self.redis.get(f'{self.key_prefix}/{key}'))
+        return (await self.get_keys([key]))[0]
+
+    async def get_keys(self, keys: Sequence[str]) -> list[float]:
+        if not keys:
+            return []
+        values = await self.redis.mget([f'{self.key_prefix}/{key}' for key in keys])
+        if None in values:
+            raise CurrencyRateNotFound([key for key, value in zip(keys, values) if value is None])
+        return [float(value) for value in values]
+
+    @staticmethod
+    async def get_keys_of(requests: Sequence[tuple['RedisCurrencyStorage', Sequence[str]]]) -> list[list[float | None]]:
+        """
+        Keys of several storages in one round trip, e.g. rates of all exchangers.
+
+        Storages must share Redis client. Values are returned per request, missing keys are None.
+        """
+        if not requests:
+            return []
+        full_keys = [f'{storage.key_prefix}/{key}' for storage, keys in requests for key in keys]
+        values = await requests[0][0].redis.mget(full_keys) if full_keys else []
+        result, offset = [], 0
+        for _, keys in requests:
+            chunk = values[offset:offset + len(keys)]
+            result.append([float(value) if value is not None else None for value in chunk])
+            offset += len(keys)
+        return result
+
+    async def set_key(self, key: str, value: float) -> None:
+        await self.set_keys({key: value})
+
+    async def set_keys(self, values: Mapping[str, float]) -> None:
+        if not values:
+            return
+        timestamp = int(time.time() * 1000)
+        async with self.redis.pipeline(transaction=False) as pipeline:
+            pipeline.mset({f'{self.key_prefix}/{key}': value for key, value in values.items()})
+            pipeline.hset(self.heartbeat_key, mapping=dict.fromkeys(values, timestamp))
+            if self.history is not None and self.history.enabled:
+                chunk = timestamp // (self.history.chunk_size * 1000)
+                for key, value in values.items():
+                    chunk_key = self._history_key(key, chunk)
+                    pipeline.append(chunk_key, HISTORY_POINT.pack(timestamp, value))
+                    pipeline.expire(chunk_key, self.history.retention + self.history.chunk_size)
+            await pipeline.execute()
+
+    async def touch_keys(self, keys: Sequence[str]) -> None:
+        if keys:
+            await self.redis.hset(self.heartbeat_key, mapping=dict.fromkeys(keys, int(time.time() * 1000)))  # type: ignore[misc]
+
+    async def get_heartbeats(self, keys: Sequence[str]) -> list[int | None]:
+        """Time of the latest write or touch of every key in milliseconds, None if key was never written."""
+        heartbeats = await self.redis.hmget(self.heartbeat_key, list(keys))  # type: ignore[misc]
+        return [int(heartbeat) if heartbeat is not None else None for heartbeat in heartbeats]
+
+    async def get_histories(self, keys: Sequence[str], start: int, end: int) -> list[Series]:
+        if self.history is None or not keys:
+            return [empty_series() for _ in keys]
+
+        chunk_size = self.history.chunk_size * 1000
+        now = int(time.time() * 1000)
+        # chunks outside of retention do not exist, so number of keys read is bounded by retention / chunk size
+        start = max(start, now - self.history.retention * 1000 - chunk_size)
+        end = min(end, now)
+        if start > end:
+            return [empty_series() for _ in keys]
+        chunks = range(start // chunk_size, end // chunk_size + 1)
+        raw_chunks = await self.redis.mget([self._history_key(key, chunk) for key in keys for chunk in chunks])
+
+        result = []
+        for index in range(len(keys)):
+            raw = b''.join(chunk for chunk in raw_chunks[index * len(chunks):(index + 1) * len(chunks)] if chunk)
+            points = np.frombuffer(raw, dtype=HISTORY_DTYPE)
+            points = points[(points['timestamp'] >= start) & (points['timestamp'] <= end)]
+            if len(points) > 1 and np.any(np.diff(points['timestamp']) < 0):  # concurrent writers
+                points = points[np.argsort(points['timestamp'], kind='stable')]
+            # fields of structured array are strided views, serializers and numpy kernels need contiguous arrays
+            result.append(Series(np.ascontiguousarray(points['timestamp']), np.ascontiguousarray(points['value'])))
+        return result
+
+    def _history_key(self, key: str, chunk: int) -> str:
+        return f'{self.key_prefix}:history/{key}/{chunk}'
+
+    async def get_snapshot(self, fields: Sequence[str]) -> list[bytes | None]:
+        return await self.redis.hmget(f'{self.key_prefix}/{SNAPSHOT_KEY}', list(fields))  # type: ignore[misc]
+
+    async def get_whole_snapshot(self) -> dict[str, bytes]:
+        snapshot = await self.redis.hgetall(f'{self.key_prefix}/{SNAPSHOT_KEY}')  # type: ignore[misc]
+        return {field.decode(): value for field, value in snapshot.items()}
+
+    async def set_snapshot(self, fields: Mapping[str, bytes], update: bytes | None = None) -> None:
+        key = f'{self.key_prefix}/{SNAPSHOT_KEY}'
+        # counter is a separate key, so it survives snapshot replacement
+        version = await self.redis.incr(f'{self.key_prefix}/{SNAPSHOT_VERSION_KEY}')
+        async with self.redis.pipeline(transaction=True) as pipeline:
+            pipeline.delete(key)
+            pipeline.hset(key, mapping={**fields, SNAPSHOT_VERSION_FIELD: version})
+            if update is not None:
+                pipeline.publish(self.updates_channel, update)
+            await pipeline.execute()
+
+
+class LocalCacheCurrencyStorage(AbstractCurrencyStorage):
+    """
+    Bounded LRU cache with TTL in front of `RedisCurrencyStorage`.
+
+    Entries are dropped by `RedisKeyspaceInvalidator` as soon as Redis reports a write,
+    TTL only limits staleness when a notification is lost.
+    """
+
+    def __init__(self, storage: RedisCurrencyStorage, max_size: int = 1024, ttl: float = 5.0) -> None:
+        self.storage = storage
+        self.key_prefix = storage.key_prefix
+        self._max_size = max_size
+        self._ttl = ttl
+        self._entries: OrderedDict[str, tuple[float, float]] = OrderedDict()  # key -> (expires_at, value)
+        self._snapshot: tuple[float, dict[str, bytes]] | None = None  # (expires_at, fields)
+        self._invalidations = 0
+
+    async def get_key(self, key: str) -> float:
+        return (await self.get_keys([key]))[0]
+
+    async def get_keys(self, keys: Sequence[str]) -> list[float]:
+        now = time.monotonic()
+        values: dict[str, float] = {}
+        missing: list[str] = []
+        for key in keys:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(key)
+                values[key] = entry[1]
+            elif key not in missing:
+                missing.append(key)
+
+        if values:
+            LOCAL_CACHE_HITS.labels(self.key_prefix).inc(len(values))
+        if missing:
+            LOCAL_CACHE_MISSES.labels(self.key_prefix).inc(len(missing))
+            invalidations_before_read = self._invalidations
+            fetched = await self.storage.get_keys(missing)
+            values.update(zip(missing, fetched))
+            # do not cache values that could be overwritten while we were waiting for Redis
+            if invalidations_before_read == self._invalidations:
+                for key, value in zip(missing, fetched):
+                    self._put(key, value, now + self._ttl)
+
+        return [values[key] for key in keys]
 
     async def set_key(self, key: str, value: float) -> None:
-        await self.redis.set(f'{self.key_prefix}/{key}', value)
+        await self.storage.set_key(key, value)
+        self.invalidate(key)
+
+    async def set_keys(self, values: Mapping[str, float]) -> None:
+        await self.storage.set_keys(values)
+        for key in values:
+            self.invalidate(key)
+
+    async def touch_keys(self, keys: Sequence[str]) -> None:
+        await self.storage.touch_keys(keys)
+
+    async def get_histories(self, keys: Sequence[str], start: int, end: int) -> list[Series]:
+        return await self.storage.get_histories(keys, start, end)
+
+    async def get_snapshot(self, fields: Sequence[str]) -> list[bytes | None]:
+        now = time.monotonic()
+        if self._snapshot is not None and self._snapshot[0] > now:
+            LOCAL_CACHE_HITS.labels(self.key_prefix).inc()
+            snapshot = self._snapshot[1]
+        else:
+            # whole snapshot is small, so it is cheaper to keep all fields than to cache every subset
+            LOCAL_CACHE_MISSES.labels(self.key_prefix).inc()
+            invalidations_before_read = self._invalidations
+            snapshot = await self.storage.get_whole_snapshot()
+            if invalidations_before_read == self._invalidations:
+                self._snapshot = (now + self._ttl, snapshot)
+        return [snapshot.get(field) for field in fields]
+
+    async def set_snapshot(self, fields: Mapping[str, bytes], update: bytes | None = None) -> None:
+        await self.storage.set_snapshot(fields, update)
+        self.invalidate(SNAPSHOT_KEY)
+
+    def invalidate(self, key: str | None = None) -> None:
+        """Drop one key or (if key is None) whole cache."""
+        self._invalidations += 1
+        if key is None:
+            self._entries.clear()
+            self._snapshot = None
+        elif key == SNAPSHOT_KEY:
+            if self._snapshot is not None:
+                LOCAL_CACHE_INVALIDATIONS.labels(self.key_prefix).inc()
+            self._snapshot = None
+        elif self._entries.pop(key, None) is not None:
+            LOCAL_CACHE_INVALIDATIONS.labels(self.key_prefix).inc()
+
+    def _put(self, key: str, value: float, expires_at: float) -> None:
+        self._entries[key] = (expires_at, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_size:
+            self._entries.popitem(last=False)
+
+
+class BufferedCurrencyStorage(AbstractCurrencyStorage):
+    """
+    Write-behind buffer in front of another storage for ingestion jobs.
+
+    Writes only update in-memory buffer, which keeps the latest value of every key and is flushed
+    by `run` task every `flush_interval` seconds in one round trip. When buffer is full, the oldest key is dropped,
+    so slow storage never blocks producer. Reads go to underlying storage, so they might not see buffered writes.
+    """
+
+    def __init__(
+        self,
+        storage: AbstractCurrencyStorage,
+        key_prefix: str = '',
+        flush_interval: float = 0.05,
+        max_size: int = 1024,
+        on_flush: Callable[[], Awaitable[None]] | None = None,
+    ) -> None:
+        self.storage = storage
+        self.key_prefix = key_prefix
+        self.on_flush = on_flush  # e.g. snapshot rendering after new rates were written
+        self._flush_interval = flush_interval
+        self._max_size = max_size
+        self._pending: OrderedDict[str, float] = OrderedDict()
+        self._has_pending = asyncio.Event()
+
+    async def get_key(self, key: str) -> float:
+        return await self.storage.get_key(key)
+
+    async def get_keys(self, keys: Sequence[str]) -> list[float]:
+        return await self.storage.get_keys(keys)
+
+    async def set_key(self, key: str, value: float) -> None:
+        self._put(key, value)
+
+    async def set_keys(self, values: Mapping[str, float]) -> None:
+        for key, value in values.items():
+            self._put(key, value)
+
+    async def touch_keys(self, keys: Sequence[str]) -> None:
+        await self.storage.touch_keys(keys)
+
+    async def get_histories(self, keys: Sequence[str], start: int, end: int) -> list[Series]:
+        return await self.storage.get_histories(keys, start, end)
+
+    async def get_snapshot(self, fields: Sequence[str]) -> list[bytes | None]:
+        return await self.storage.get_snapshot(fields)
+
+    async def set_snapshot(self, fields: Mapping[str, bytes], update: bytes | None = None) -> None:
+        await self.storage.set_snapshot(fields, update)
+
+    async def run(self) -> None:
+        while True:
+            await self._has_pending.wait()
+            await asyncio.sleep(self._flush_interval)
+            await self.try_flush()
+
+    async def try_flush(self) -> bool:
+        """Same as `flush`, but errors are logged instead of raised, returns whether buffer was written."""
+        try:
+            await self.flush()
+        except RedisError as exc:
+            logger.warning('Could not flush %s buffered rates: %s', len(self._pending), exc)
+        except Exception:
+            logger.exception('Could not flush buffered rates')
+        else:
+            return True
+        return False
+
+    async def flush(self) -> None:
+        """Write all buffered values, on failure they are returned to buffer unless newer values arrived."""
+        if not self._pending:
+            return
+        batch, self._pending = self._pending, OrderedDict()
+        self._has_pending.clear()
+        try:
+            await self.storage.set_keys(batch)
+        except BaseException:
+            for key, value in reversed(batch.items()):
+                if key not in self._pending:
+                    self._pending[key] = value
+                    self._pending.move_to_end(key, last=False)
+            self._trim()
+            self._has_pending.set()
+            raise
+        WRITE_BUFFER_FLUSHES.labels(self.key_prefix).inc()
+        if self.on_flush is not None:
+            await self.on_flush()
+
+    def _put(self, key: str, value: float) -> None:
+        if key in self._pending:
+            WRITE_BUFFER_CONFLATED.labels(self.key_prefix).inc()
+            self._pending.move_to_end(key)
+        self._pending[key] = value
+        self._trim()
+        self._has_pending.set()
+
+    def _trim(self) -> None:
+        while len(self._pending) > self._max_size:
+            self._pending.popitem(last=False)
+            WRITE_BUFFER_DROPPED.labels(self.key_prefix).inc()
+
+
+class ChangeFilterCurrencyStorage(AbstractCurrencyStorage):
+    """
+    Skips writes of rates which moved by no more than epsilon of their symbol since the last write of this process.
+
+    Skipped keys are only touched (at most once per `heartbeat_interval` seconds), so their heartbeat still shows
+    that ingestion is alive. Filter remembers only its own writes, while other workers might write the same keys,
+    so every key is written at least once per `max_age` seconds even if it did not change.
+    `written` counts keys which were really written, it tells jobs whether snapshot has to be rendered again.
+    """
+
+    def __init__(
+        self,
+        storage: AbstractCurrencyStorage,
+        key_prefix: str = '',
+        epsilons: Mapping[str, float] | None = None,
+        default_epsilon: float = 0.0,
+        max_age: float = 60.0,
+        heartbeat_interval: float = 1.0,
+    ) -> None:
+        self.storage = storage
+        self.key_prefix = key_prefix
+        self.written = 0
+        self._epsilons = dict(epsilons or {})
+        self._default_epsilon = default_epsilon
+        self._max_age = max_age
+        self._heartbeat_interval = heartbeat_interval
+        self._last: dict[str, tuple[float, float]] = {}  # key -> (written_at, value)
+        self._touched_at: dict[str, float] = {}
+
+    async def get_key(self, key: str) -> float:
+        return await self.storage.get_key(key)
+
+    async def get_keys(self, keys: Sequence[str]) -> list[float]:
+        return await self.storage.get_keys(keys)
+
+    async def set_key(self, key: str, value: float) -> None:
+        await self.set_keys({key: value})
+
+    async def set_keys(self, values: Mapping[str, float]) -> None:
+        now = time.monotonic()
+        changed: dict[str, float] = {}
+        touched: list[str] = []
+        for key, value in values.items():
+            last = self._last.get(key)
+            if (
+                last is None
+                or now - last[0] >= self._max_age
+                or abs(value - last[1]) > self._epsilons.get(key, self._default_epsilon)
+            ):
+                changed[key] = value
+            elif now - self._touched_at[key] >= self._heartbeat_interval:
+                touched.append(key)
+
+        if changed:
+            await self.storage.set_keys(changed)
+            for key, value in changed.items():
+                self._last[key] = (now, value)
+                self._touched_at[key] = now
+            self.written += len(changed)
+            INGESTION_WRITES.labels(self.key_prefix, 'written').inc(len(changed))
+        if len(changed) < len(values):
+            INGESTION_WRITES.labels(self.key_prefix, 'suppressed').inc(len(values) - len(changed))
+        if touched:
+            await self.touch_keys(touched)
+
+    async def touch_keys(self, keys: Sequence[str]) -> None:
+        await self.storage.touch_keys(keys)
+        now = time.monotonic()
+        for key in keys:
+            self._touched_at[key] = now
+
+    async def get_histories(self, keys: Sequence[str], start: int, end: int) -> list[Series]:
+        return await self.storage.get_histories(keys, start, end)
+
+    async def get_snapshot(self, fields: Sequence[str]) -> list[bytes | None]:
+        return await self.storage.get_snapshot(fields)
+
+    async def set_snapshot(self, fields: Mapping[str, bytes], update: bytes | None = None) -> None:
+        await self.storage.set_snapshot(fields, update)
+
+
+class RedisKeyspaceInvalidator:
+    """
+    Listens to keyspace notifications of every cached prefix over one pub/sub connection
+    and invalidates matching entries of local caches.
+    """
+
+    def __init__(
+        self,
+        redis: Redis,
+        database: int,
+        caches: Sequence[LocalCacheCurrencyStorage],
+        configure_notifications: bool = True,
+        reconnect_interval: float = 1.0,
+    ) -> None:
+        self.redis = redis
+        self._channel_prefix = f'__keyspace@{database}__:'
+        self._caches = {cache.key_prefix: cache for cache in caches}
+        self._configure_notifications = configure_notifications
+        self._reconnect_interval = reconnect_interval
+
+    async def run(self) -> None:
+        configure_notifications = self._configure_notifications
+        while True:
+            try:
+                # Redis might be unavailable on startup, so configuration is retried together with subscription
+                if configure_notifications:
+                    await self._enable_keyspace_notifications()
+                    configure_notifications = False
+                await self._listen()
+            except RedisError as exc:
+                logger.warning('Keyspace notifications subscription lost: %s', exc)
+            # notifications might be lost while we were disconnected
+            for cache in self._caches.values():
+                cache.invalidate()
+            await asyncio.sleep(self._reconnect_interval)
+
+    async def _listen(self) -> None:
+        async with self.redis.pubsub(ignore_subscribe_messages=True) as pubsub:
+            await pubsub.psubscribe(*[f'{self._channel_prefix}{prefix}/*' for prefix in self._caches])
+            async for message in pubsub.listen():
+                channel = message['channel'].decode()
+                prefix, _, key = channel.removeprefix(self._channel_prefix).partition('/')
+                cache = self._caches.get(prefix)
+                if cache is not None:
+                    cache.invalidate(key)
+
+    async def _enable_keyspace_notifications(self) -> None:
+        # K - keyspace events, $ - string commands, h - hash commands, g - generic commands (DEL, EXPIRE, ...)
+        try:
+            current = (await self.redis.config_get('notify-keyspace-events')).get('notify-keyspace-events', '')
+            if isinstance(current, bytes):
+                current = current.decode()
+            required = ''.join(sorted(set(current) | set('K$hg')))
+            if set(required) != set(current):
+                await self.redis.config_set('notify-keyspace-events', required)
+        except ResponseError as exc:  # e.g. CONFIG is disabled on managed Redis
+            logger.warning('Could not enable keyspace notifications, local cache relies on TTL only: %s', exc)
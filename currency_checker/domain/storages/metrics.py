@@ -0,0 +1,38 @@
+from prometheus_client import Counter
+
+
+LOCAL_CACHE_HITS = Counter(
+    name='currency_checker_local_cache_hits',
+    documentation='Currency rates served from in-process cache',
+    labelnames=('key_prefix',),
+)
+LOCAL_CACHE_MISSES = Counter(
+    name='currency_checker_local_cache_misses',
+    documentation='Currency rates that were not in in-process cache and were read from Redis',
+    labelnames=('key_prefix',),
+)
+LOCAL_CACHE_INVALIDATIONS = Counter(
+    name='currency_checker_local_cache_invalidations',
+    documentation='Keyspace notifications that dropped an in-process cache entry',
+    labelnames=('key_prefix',),
+)
+WRITE_BUFFER_CONFLATED = Counter(
+    name='currency_checker_write_buffer_conflated',
+    documentation='Buffered currency rates replaced by newer value of the same key before flush',
+    labelnames=('key_prefix',),
+)
+WRITE_BUFFER_DROPPED = Counter(
+    name='currency_checker_write_buffer_dropped',
+    documentation='Buffered currency rates dropped because buffer was full',
+    labelnames=('key_prefix',),
+)
+WRITE_BUFFER_FLUSHES = Counter(
+    name='currency_checker_write_buffer_flushes',
+    documentation='Round trips which wrote buffered currency rates to Redis',
+    labelnames=('key_prefix',),
+)
+INGESTION_WRITES = Counter(
+    name='currency_checker_ingestion_writes',
+    documentation='Currency rates received by ingestion jobs, by result: written or suppressed as unchanged',
+    labelnames=('key_prefix', 'result'),
+)
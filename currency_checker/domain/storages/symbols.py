@@ -0,0 +1,130 @@
+import asyncio
+import time
+from abc import ABC, abstractmethod
+from collections.abc import Callable
+from logging import getLogger
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from currency_checker.domain.symbols import (
+    SymbolMapping,
+    SymbolTable,
+    get_symbol_table,
+    remove_symbol_table,
+    set_symbol_table,
+)
+from currency_checker.infrastructure.postgres import AssetAliases, SymbolRevisions, Symbols, create_engine
+from currency_checker.infrastructure.settings import PostgresSettings
+
+
+logger = getLogger(__name__)
+
+
+class AbstractSymbolStorage(ABC):
+    @abstractmethod
+    async def get_revisions(self) -> dict[str, int]:
+        """Revision of mappings of every source, it is changed on every change of mappings."""
+        ...
+
+    @abstractmethod
+    async def get_symbol_table(self, source: str, revision: int) -> SymbolTable:
+        """Active mappings of `source` compiled into table."""
+        ...
+
+
+class PostgresSymbolStorage(AbstractSymbolStorage):
+    def __init__(self, postgres_settings: PostgresSettings) -> None:
+        self._engine: AsyncEngine = create_engine(postgres_settings)
+
+    async def get_revisions(self) -> dict[str, int]:
+        revisions = SymbolRevisions.__table__
+        async with self._engine.connect() as connection:
+            result = await connection.execute(select(revisions.c.source, revisions.c.revision))
+            return {row.source: row.revision for row in result}
+
+    async def get_symbol_table(self, source: str, revision: int) -> SymbolTable:
+        symbols, aliases = Symbols.__table__, AssetAliases.__table__
+        async with self._engine.connect() as connection:
+            symbol_rows = await connection.execute(
+                select(symbols.c.symbol, symbols.c.base, symbols.c.quote, symbols.c.base_code, symbols.c.quote_code)
+                .where(symbols.c.source == source, symbols.c.active.is_(True))
+                .order_by(symbols.c.symbol)
+            )
+            alias_rows = await connection.execute(
+                select(aliases.c.alias, aliases.c.asset).where(aliases.c.source == source)
+            )
+            return SymbolTable(
+                [SymbolMapping(row.symbol, row.base, row.quote, row.base_code, row.quote_code) for row in symbol_rows],
+                {row.alias: row.asset for row in alias_rows},
+                revision=revision,
+            )
+
+    async def close(self) -> None:
+        await self._engine.dispose()
+
+
+class SymbolTableReloader:
+    """
+    Keeps symbol tables of process in sync with database.
+
+    Revisions of all sources are read with one small query every `interval` seconds,
+    mappings are loaded and compiled only for sources whose revision changed.
+    Revisions are polled instead of LISTEN/NOTIFY, because connections might go through PgBouncer.
+    When source has no active mappings in database, built-in ones are used again and `on_change` gets None.
+    """
+
+    def __init__(
+        self,
+        storage: AbstractSymbolStorage,
+        interval: float = 30.0,
+        on_change: Callable[[str, SymbolTable | None], None] | None = None,
+    ) -> None:
+        self.storage = storage
+        self.interval = interval
+        self.on_change = on_change
+        self._reloaded_at: float | None = None
+        self._empty_revisions: dict[str, int] = {}  # source -> revision without active mappings
+
+    async def reload(self) -> list[str]:
+        """Load changed mappings, returns their sources."""
+        self._reloaded_at = time.monotonic()
+        changed = []
+        for source, revision in (await self.storage.get_revisions()).items():
+            current = get_symbol_table(source)
+            if (current.revision if current is not None else self._empty_revisions.get(source)) == revision:
+                continue
+            table = await self.storage.get_symbol_table(source, revision)
+            if table.symbols:
+                self._empty_revisions.pop(source, None)
+                set_symbol_table(source, table)
+                logger.info('Symbols of %s are reloaded, revision %s', source, revision)
+                self._notify(source, table)
+            else:
+                # e.g. all symbols were deactivated, built-in mappings are better than stale ones
+                logger.warning('Symbols of %s are not configured in database, built-in ones are used', source)
+                self._empty_revisions[source] = revision
+                if remove_symbol_table(source) is None:
+                    continue  # built-in mappings are used already
+                self._notify(source, None)
+            changed.append(source)
+        return changed
+
+    async def reload_if_due(self) -> list[str]:
+        """Same as `reload`, but database is queried at most once per `interval`, errors are logged."""
+        if self._reloaded_at is not None and time.monotonic() - self._reloaded_at < self.interval:
+            return []
+        try:
+            return await self.reload()
+        except Exception as exc:
+            logger.warning('Symbols are not reloaded: %r', exc)
+            return []
+
+    async def run(self) -> None:
+        while True:
+            await self.reload_if_due()
+            await asyncio.sleep(self.interval)
+
+    def _notify(self, source: str, table: SymbolTable | None) -> None:
+        if self.on_change is not None:
+            self.on_change(source, table)
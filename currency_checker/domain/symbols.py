@@ -0,0 +1,64 @@
+from collections.abc import Iterable, Mapping
+from dataclasses import dataclass
+from types import MappingProxyType
+
+from currency_checker.domain.conversion import ConversionGraph, Pair
+
+
+@dataclass(frozen=True, slots=True)
+class SymbolMapping:
+    """Symbol ingested from exchange, it is also a storage key of rate."""
+
+    symbol: str
+    base: str
+    quote: str
+    # ids of assets used by exchange API, if they differ from asset names (e.g. CoinGecko coin ids)
+    base_code: str | None = None
+    quote_code: str | None = None
+
+
+class SymbolTable:
+    """
+    Symbol mappings of one exchanger compiled for lookups.
+
+    Table is immutable: reload builds a new table and replaces reference to it,
+    so readers always see consistent mappings without any locks.
+    """
+
+    __slots__ = ('revision', 'symbols', 'aliases', 'conversion', 'base_codes', 'quote_codes', '_symbols_by_codes')
+
+    def __init__(self, mappings: Iterable[SymbolMapping], aliases: Mapping[str, str] | None = None, revision: int = 0):
+        """
+        :param aliases: asset name used in directions -> asset name used in symbols (e.g. USDTERC -> USDT)
+        :param revision: revision of mappings in database, 0 - built-in mappings
+        """
+        mappings = list(mappings)
+        self.revision = revision
+        self.symbols: Mapping[str, Pair] = MappingProxyType({item.symbol: (item.base, item.quote) for item in mappings})
+        self.aliases: Mapping[str, str] = MappingProxyType(dict(aliases or {}))
+        self.conversion = ConversionGraph(self.symbols, self.aliases)
+        self._symbols_by_codes = {
+            (item.base_code or item.base, item.quote_code or item.quote): item.symbol for item in mappings
+        }
+        self.base_codes = tuple(dict.fromkeys(base for base, _ in self._symbols_by_codes))
+        self.quote_codes = tuple(dict.fromkeys(quote for _, quote in self._symbols_by_codes))
+
+    def symbol_by_codes(self, base_code: str, quote_code: str) -> str | None:
+        return self._symbols_by_codes.get((base_code, quote_code))
+
+
+# source (name of exchange adapter) -> table loaded from database, shared by all services of process
+_tables: dict[str, SymbolTable] = {}
+
+
+def get_symbol_table(source: str) -> SymbolTable | None:
+    return _tables.get(source)
+
+
+def set_symbol_table(source: str, table: SymbolTable) -> None:
+    _tables[source] = table
+
+
+def remove_symbol_table(source: str) -> SymbolTable | None:
+    """Built-in mappings are used again, returns removed table."""
+    return _tables.pop(source, None)
@@ -4,21 +4,33 @@ import time
 from collections.abc import Awaitable, Callable, Mapping
 from decimal import Decimal
 from json import JSONEncoder
-from types import SimpleNamespace
 from typing import Any, Generic, Optional, Type, TypeVar, Union
 
 import aiohttp
-from aiohttp import ClientError, ClientSession, DummyCookieJar, TCPConnector, TraceConfig, hdrs, tracing
+from aiohttp import ClientError, DummyCookieJar, TCPConnector, TraceConfig, hdrs
 from prometheus_client import Summary
 from pydantic import BaseModel
 from pydantic.json import pydantic_encoder
 from yarl import URL
 
 from currency_checker.infrastructure.base_api_client.base_throttler import BaseThrottler, DoNothingThrottler
+from currency_checker.infrastructure.base_api_client.circuit_breaker import CircuitBreaker
 from currency_checker.infrastructure.base_api_client.exceptions import ApiClientError
-from currency_checker.infrastructure.base_api_client.metrics import HTTP_REQUEST_DURATION_SECONDS
+from currency_checker.infrastructure.base_api_client.hedging import HedgingPolicy, LatencyTracker
+from currency_checker.infrastructure.base_api_client.metrics import (
+    HTTP_CONNECTION_EVENTS,
+    HTTP_HEDGED_REQUESTS,
+    HTTP_REQUEST_DURATION_SECONDS,
+    HTTP_REQUEST_RETRIES,
+)
 from currency_checker.infrastructure.base_api_client.requests import RequestInfo
 from currency_checker.infrastructure.base_api_client.responses import Response
+from currency_checker.infrastructure.base_api_client.retries import NO_RETRY, RetryPolicy
+from currency_checker.infrastructure.base_api_client.timeouts import RequestTimeout
+from currency_checker.infrastructure.base_api_client.tracing import RequestTracer, tracing_ssl_context
+
+
+T = TypeVar('T')
 
 
 class BaseSession:
@@ -33,6 +45,10 @@ class BaseSession:
         throttler: Optional[BaseThrottler] = None,
         retry_num: int = 0,
         retry_interval: int = 0,
+        retry_policy: Optional[RetryPolicy] = None,
+        circuit_breaker: Optional[CircuitBreaker] = None,
+        timeout: Optional[RequestTimeout] = None,
+        hedging: Optional[HedgingPolicy] = None,
         enable_metrics: bool = False,
         api_service_name: str = '',
         client_name: str = '',
@@ -44,6 +60,12 @@ class BaseSession:
         self._throttler = throttler or DoNothingThrottler()
         self._retry_num = retry_num
         self._retry_interval = retry_interval
+        if retry_policy is None and retry_num:
+            retry_policy = RetryPolicy(attempts=retry_num + 1, base_delay=retry_interval, max_delay=retry_interval)
+        self._retry_policy = retry_policy or NO_RETRY
+        self._circuit_breaker = circuit_breaker
+        self._timeout = timeout
+        self._latencies = LatencyTracker(hedging) if hedging is not None else None
         self._enable_metrics = enable_metrics
         self._api_service_name = api_service_name
         self._client_name = client_name
@@ -68,10 +90,19 @@ class BaseSession:
         accept: Optional[str] = 'application/json',
         data: Any = None,
         json: Any = None,
+        timeout: Optional[RequestTimeout] = None,
+        hedge: bool = True,
     ) -> Response:
         """
+        Send request, repeating it according to retry policy of session.
+
+        Response of the last attempt is returned even if its status is retryable,
+        errors of the last attempt are raised.
+
         :param path_template: template of URL path, used with `path_params`
         :param path_params: parameters for `path_template`
+        :param timeout: limits of every attempt, session timeout is used by default
+        :param hedge: send hedged copy of slow idempotent request, if session has hedging policy
         """
         path_params = path_params or {}
         path = path_template.format(**path_params)
@@ -83,6 +114,133 @@ class BaseSession:
                 raise ValueError("headers already have 'Accept' header")
             headers[hdrs.ACCEPT] = accept
 
+        idempotent = self._retry_policy.is_retryable_method(method)
+        policy = self._retry_policy if idempotent else NO_RETRY
+        send = self._send_hedged if hedge and idempotent and self._latencies is not None else self._send
+        timeout = timeout or self._timeout
+        started_at = time.monotonic()
+        deadline = started_at + policy.deadline if policy.deadline is not None else None
+        attempt = 0
+        while True:
+            if self._circuit_breaker is not None:
+                self._circuit_breaker.before_request()
+            try:
+                response = await send(
+                    method,
+                    url,
+                    path_template,
+                    params=params,
+                    headers=headers,
+                    data=data,
+                    json=json,
+                    timeout=timeout,
+                    remaining=deadline - time.monotonic() if deadline is not None else None,
+                )
+            except ApiClientError as exc:
+                if self._circuit_breaker is not None:
+                    self._circuit_breaker.record_failure()
+                failure: Union[ApiClientError, Response] = exc
+            except BaseException:
+                # e.g. cancellation of job or hedged copy: upstream did not fail, but probe has to be released
+                if self._circuit_breaker is not None:
+                    self._circuit_breaker.release_probe()
+                raise
+            else:
+                if self._circuit_breaker is not None:
+                    if response.status < 500:
+                        self._circuit_breaker.record_success()
+                    else:
+                        self._circuit_breaker.record_failure()
+                if response.status not in policy.statuses:
+                    return response
+                failure = response
+
+            delay = policy.delay(attempt)
+            attempt += 1
+            out_of_time = deadline is not None and time.monotonic() + delay >= deadline
+            if attempt >= policy.attempts or out_of_time:
+                if isinstance(failure, Response):
+                    return failure
+                raise failure
+            self._logger.info('Attempt: %s. Error: %s', attempt, failure)
+            if self._enable_metrics:
+                HTTP_REQUEST_RETRIES.labels(self._api_service_name, self._client_name, path_template).inc()
+            await asyncio.sleep(delay)
+
+    async def request_json(self, method: str, path_template: str, **kwargs: Any) -> Any:
+        """Send request and decode JSON body of successful response, see `request`."""
+        return await self.request_model(Any, method, path_template, **kwargs)  # type: ignore[arg-type]
+
+    async def request_model(
+        self,
+        model: Type[T],
+        method: str,
+        path_template: str,
+        *,
+        strict: bool = True,
+        **kwargs: Any,
+    ) -> T:
+        """
+        Send request and decode JSON body of successful response straight into `model`, see `request`.
+
+        :param model: any type supported by msgspec, e.g. `list[SomeStruct]` or dataclass
+        :param strict: if False, strings are converted to numbers and so on
+        """
+        response = await self.request(method, path_template, **kwargs)
+        response.raise_for_status()
+        return response.json(model, strict=strict)
+
+    async def _send_hedged(self, method: str, url: URL, path_template: str, **kwargs: Any) -> Response:
+        assert self._latencies is not None
+        self._latencies.add_request()
+        delay = self._latencies.hedge_delay(path_template)
+        if delay is None:
+            return await self._send(method, url, path_template, **kwargs)
+
+        first = asyncio.create_task(self._send(method, url, path_template, **kwargs))
+        tasks = {first}
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if done or not self._latencies.take_hedge():
+                return await first
+
+            self._count_hedge(path_template, 'sent')
+            tasks.add(asyncio.create_task(self._send(method, url, path_template, **kwargs)))
+            pending = set(tasks)
+            while True:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                succeeded = [task for task in done if task.exception() is None]
+                if succeeded:
+                    if succeeded[0] is not first:
+                        self._count_hedge(path_template, 'won')
+                    return succeeded[0].result()
+                if not pending:  # both copies failed
+                    return first.result()
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    def _count_hedge(self, path_template: str, outcome: str) -> None:
+        if self._enable_metrics:
+            HTTP_HEDGED_REQUESTS.labels(self._api_service_name, self._client_name, path_template, outcome).inc()
+
+    async def _send(
+        self,
+        method: str,
+        url: URL,
+        path_template: str,
+        *,
+        params: Optional[dict[str, Union[str, int, float]]],
+        headers: dict[str, str],
+        data: Any,
+        json: Any,
+        timeout: Optional[RequestTimeout],
+        remaining: Optional[float],
+    ) -> Response:
+        request_kwargs = dict(self._request_kwargs)
+        if timeout is not None or remaining is not None:
+            request_kwargs['timeout'] = (timeout or RequestTimeout()).client_timeout(remaining)
+
         async with self._throttler:
             metric_response_status: str = ''
             started_at = time.monotonic()
@@ -94,16 +252,15 @@ class BaseSession:
                     headers=headers,
                     data=data,
                     json=json,
-                    **self._request_kwargs,
+                    **request_kwargs,
                 ) as response:
-                    # TODO Возможно, надо переделать на response.read().
-                    #  Сейчас упадем, если бинарь, или, не UTF-8 и не указана кодировка.
-                    #  Обсуждение: https://gitlab.cm.expert/python/cme-api-clients/-/merge_requests/226#note_304587
-                    body = await response.text()
-            except ClientError as e:
-                raise ApiClientError(str(e))
+                    body = await response.read()
+            except (ClientError, asyncio.TimeoutError) as e:
+                raise ApiClientError(str(e) or repr(e))
             else:
                 metric_response_status = str(response.status)
+                if self._latencies is not None:
+                    self._latencies.observe(path_template, time.monotonic() - started_at)
             finally:
                 if self._enable_metrics and path_template is not None:
                     self._http_request_duration_metric.labels(
@@ -120,9 +277,12 @@ class BaseSession:
                 method=method, url=url
             ),
             status=response.status,
-            data=body,
+            body=body,
             content_type=response.content_type,
+            headers=response.headers,
+            charset=response.charset,
         )
+        self._throttler.update(r)
         return r
 
     async def retry(
@@ -131,25 +291,25 @@ class BaseSession:
         *args: Any,
         **kwargs: Any
     ) -> Any:
-        for attempt in range(self._retry_num + 1):
+        attempts = self._retry_policy.attempts
+        for attempt in range(attempts):
             try:
                 return await cor_func(*args, **kwargs)
             except Exception as e:
                 self._logger.info(
                     'Attempt: %s. Error: %s ', attempt + 1, e
                 )
-                if attempt == self._retry_num:
+                if attempt == attempts - 1:
                     raise
-                await asyncio.sleep(self._retry_interval)
+                await asyncio.sleep(self._retry_policy.delay(attempt))
 
     async def request_with_retry(
         self,
         *args: Any,
         **kwargs: Any
     ) -> Any:
-        return await self.retry(
-            self.request, *args, **kwargs
-        )
+        # retries are made by `request` according to retry policy
+        return await self.request(*args, **kwargs)
 
 
 _SessionClassT = TypeVar('_SessionClassT', bound=BaseSession)
@@ -167,21 +327,35 @@ class BaseClient(Generic[_SessionClassT]):
         throttler: Optional[BaseThrottler] = None,
         retry_num: int = 0,
         retry_interval: int = 0,
+        retry_policy: Optional[RetryPolicy] = None,
+        circuit_breaker: Optional[CircuitBreaker] = None,
+        timeout: Optional[RequestTimeout] = None,
+        hedging: Optional[HedgingPolicy] = None,
         headers: Optional[Mapping[str, str]] = None,
         branch: Optional[str] = None,
         proxy: Optional[Union[str, URL]] = None,
         connection_limit: int = 100,
+        keepalive_timeout: float = 15.0,
+        dns_cache_ttl: Optional[int] = 10,
         enable_metrics: bool = False,
         client_name: str = '',
+        trace_body_sample_rate: float = 0.0,
     ) -> None:
         """
+        :param keepalive_timeout: seconds idle connection is kept open for reuse
+        :param dns_cache_ttl: seconds resolved addresses are cached, None - forever
         :param client_name: Name of the client who use API
+        :param trace_body_sample_rate: share of requests whose bodies are logged at DEBUG level
         """
         self._base_uri = URL(base_uri)
         self._mock_base_uri = URL(mock_base_uri) if mock_base_uri else None
         self._throttler = throttler
         self._retry_num = retry_num
         self._retry_interval = retry_interval
+        self._retry_policy = retry_policy
+        self._circuit_breaker = circuit_breaker
+        self._timeout = timeout
+        self._hedging = hedging
         self._proxy = URL(proxy) if proxy else None
         self._enable_metrics = enable_metrics
         if self._enable_metrics and not (self._api_service_name and client_name):
@@ -195,12 +369,12 @@ class BaseClient(Generic[_SessionClassT]):
             f'{self.__module__}.{type(self).__name__}'
         )
 
-        trace_config: Optional[TraceConfig] = None
-        if self._logger.level <= logging.INFO:
-            trace_config = TraceConfig()
-            trace_config.on_request_start.append(self._on_request_start)
-            trace_config.on_request_chunk_sent.append(self._on_request_chunk_sent)
-            trace_config.on_request_end.append(self._on_request_end)
+        tracer = RequestTracer(
+            self._api_service_name, self._client_name, self._logger, body_sample_rate=trace_body_sample_rate
+        )
+        trace_configs = [tracer.trace_config()]
+        if self._enable_metrics:
+            trace_configs.append(self._connection_metrics_trace_config())
 
         http_session_headers: dict[str, str] = {}
         if branch:
@@ -211,9 +385,15 @@ class BaseClient(Generic[_SessionClassT]):
         self._http_session = aiohttp.ClientSession(
             cookie_jar=DummyCookieJar(),
             json_serialize=JSONEncoder(default=self._json_encoder).encode,
-            trace_configs=[trace_config] if trace_config else None,
+            trace_configs=trace_configs,
             headers=http_session_headers,
-            connector=TCPConnector(limit=connection_limit)
+            connector=TCPConnector(
+                limit=connection_limit,
+                keepalive_timeout=keepalive_timeout,
+                use_dns_cache=True,
+                ttl_dns_cache=dns_cache_ttl,
+                ssl=tracing_ssl_context(),
+            )
         )
         self._sessions: dict[tuple[Any, ...], _SessionClassT] = {}
 
@@ -229,6 +409,10 @@ class BaseClient(Generic[_SessionClassT]):
                 throttler=self._throttler,
                 retry_num=self._retry_num,
                 retry_interval=self._retry_interval,
+                retry_policy=self._retry_policy,
+                circuit_breaker=self._circuit_breaker,
+                timeout=self._timeout,
+                hedging=self._hedging,
                 proxy=self._proxy,
                 enable_metrics=self._enable_metrics,
                 api_service_name=self._api_service_name,
@@ -251,26 +435,20 @@ class BaseClient(Generic[_SessionClassT]):
         else:
             return pydantic_encoder(obj)
 
-    @staticmethod
-    async def _on_request_start(
-        session: ClientSession, context: SimpleNamespace, params: tracing.TraceRequestStartParams
-    ) -> None:
-        context.request_body = ''
+    def _connection_metrics_trace_config(self) -> TraceConfig:
+        events = {
+            event: HTTP_CONNECTION_EVENTS.labels(self._api_service_name, self._client_name, event)
+            for event in ('created', 'reused', 'dns_cache_hit', 'dns_cache_miss')
+        }
 
-    @staticmethod
-    async def _on_request_chunk_sent(
-        session: ClientSession, context: SimpleNamespace, params: tracing.TraceRequestChunkSentParams
-    ) -> None:
-        context.request_body += params.chunk.decode('utf-8', 'replace')
+        def count(event: str) -> Callable[..., Awaitable[None]]:
+            async def handler(*args: Any) -> None:
+                events[event].inc()
+            return handler
 
-    async def _on_request_end(
-        self,
-        session: ClientSession,
-        context: SimpleNamespace,
-        params: tracing.TraceRequestEndParams
-    ) -> None:
-        self._logger.info(
-            "Request: %s %s",
-            params.method,
-            params.url
-        )
+        trace_config = TraceConfig()
+        trace_config.on_connection_create_end.append(count('created'))
+        trace_config.on_connection_reuseconn.append(count('reused'))
+        trace_config.on_dns_cache_hit.append(count('dns_cache_hit'))
+        trace_config.on_dns_cache_miss.append(count('dns_cache_miss'))
+        return trace_config
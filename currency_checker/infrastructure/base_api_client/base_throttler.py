@@ -2,12 +2,18 @@ import abc
 from types import TracebackType
 from typing import Optional, Type
 
+from currency_checker.infrastructure.base_api_client.responses import Response
+
 
 class BaseThrottler(abc.ABC):
     @abc.abstractmethod
     async def acquire(self) -> None:
         ...
 
+    def update(self, response: Response) -> None:
+        """Feedback from every received response, e.g. rate limit headers."""
+        pass
+
     async def __aenter__(self) -> None:
         await self.acquire()
 
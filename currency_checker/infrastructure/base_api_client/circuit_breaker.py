@@ -0,0 +1,69 @@
+import time
+from enum import IntEnum
+
+from currency_checker.infrastructure.base_api_client.exceptions import ApiClientCircuitOpenError
+from currency_checker.infrastructure.base_api_client.metrics import (
+    CIRCUIT_BREAKER_REJECTED,
+    CIRCUIT_BREAKER_STATE,
+)
+
+
+class CircuitState(IntEnum):
+    CLOSED = 0
+    OPEN = 1
+    HALF_OPEN = 2
+
+
+class CircuitBreaker:
+    """
+    Fails requests to upstream fast while it is down.
+
+    Circuit opens after `failure_threshold` failures in a row. After `recovery_timeout` seconds
+    one probe request is let through: success closes circuit, failure opens it again.
+    """
+
+    def __init__(self, name: str, failure_threshold: int = 5, recovery_timeout: float = 30.0) -> None:
+        self.name = name
+        self._failure_threshold = failure_threshold
+        self._recovery_timeout = recovery_timeout
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._state_metric = CIRCUIT_BREAKER_STATE.labels(name)
+        self._rejected_metric = CIRCUIT_BREAKER_REJECTED.labels(name)
+        self._set_state(CircuitState.CLOSED)
+
+    @property
+    def state(self) -> CircuitState:
+        return self._state
+
+    def before_request(self) -> None:
+        """Raise `ApiClientCircuitOpenError` if request should not be sent."""
+        if self._state == CircuitState.OPEN and time.monotonic() - self._opened_at >= self._recovery_timeout:
+            self._set_state(CircuitState.HALF_OPEN)
+        if self._state == CircuitState.OPEN or (self._state == CircuitState.HALF_OPEN and self._probe_in_flight):
+            self._rejected_metric.inc()
+            raise ApiClientCircuitOpenError(f'Circuit of {self.name} is open')
+        if self._state == CircuitState.HALF_OPEN:
+            self._probe_in_flight = True
+
+    def record_success(self) -> None:
+        self._failures = 0
+        self._probe_in_flight = False
+        if self._state != CircuitState.CLOSED:
+            self._set_state(CircuitState.CLOSED)
+
+    def release_probe(self) -> None:
+        """Request ended without outcome (e.g. it was cancelled), so another probe may be sent."""
+        self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        self._failures += 1
+        self._probe_in_flight = False
+        if self._state == CircuitState.HALF_OPEN or self._failures >= self._failure_threshold:
+            self._opened_at = time.monotonic()
+            self._set_state(CircuitState.OPEN)
+
+    def _set_state(self, state: CircuitState) -> None:
+        self._state = state
+        self._state_metric.set(state)
@@ -42,6 +42,10 @@ class ApiClientUnavailableError(ApiClientError):
     pass
 
 
+class ApiClientCircuitOpenError(ApiClientUnavailableError):
+    """Request was not sent, because upstream is considered down."""
+
+
 class ApiClientAuthError(ApiClientError):
     pass
 
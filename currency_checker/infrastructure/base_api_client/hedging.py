@@ -0,0 +1,54 @@
+from collections import deque
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True, slots=True)
+class HedgingPolicy:
+    """
+    Second copy of idempotent request is sent if the first one did not answer within `quantile` of latencies
+    observed for the same path. Response which comes first is used, the other request is cancelled.
+
+    :param budget: hedged requests per one request, e.g. 0.1 - at most 10% extra load on upstream
+    :param min_samples: latencies observed before hedging is started
+    :param min_delay: seconds, hedged request is never sent earlier
+    """
+
+    quantile: float = 0.95
+    budget: float = 0.1
+    min_samples: int = 20
+    min_delay: float = 0.01
+    window: int = 200  # latest latencies used for quantile
+
+
+class LatencyTracker:
+    """Latencies of latest requests and hedge budget of one session."""
+
+    def __init__(self, policy: HedgingPolicy) -> None:
+        self._policy = policy
+        self._latencies: dict[str, deque[float]] = {}
+        self._budget = 1.0  # one hedge is allowed right away
+
+    def observe(self, path: str, latency: float) -> None:
+        latencies = self._latencies.get(path)
+        if latencies is None:
+            latencies = self._latencies[path] = deque(maxlen=self._policy.window)
+        latencies.append(latency)
+
+    def hedge_delay(self, path: str) -> float | None:
+        """Seconds to wait before hedged request or None if there are not enough observations."""
+        latencies = self._latencies.get(path)
+        if latencies is None or len(latencies) < self._policy.min_samples:
+            return None
+        ordered = sorted(latencies)
+        index = min(len(ordered) - 1, int(len(ordered) * self._policy.quantile))
+        return max(self._policy.min_delay, ordered[index])
+
+    def add_request(self) -> None:
+        # budget is capped, so a long quiet period does not allow a burst of hedges
+        self._budget = min(10.0, self._budget + self._policy.budget)
+
+    def take_hedge(self) -> bool:
+        if self._budget < 1:
+            return False
+        self._budget -= 1
+        return True
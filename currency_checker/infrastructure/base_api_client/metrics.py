@@ -1,4 +1,4 @@
-from prometheus_client import Summary
+from prometheus_client import Counter, Gauge, Histogram, Summary
 
 
 HTTP_REQUEST_DURATION_SECONDS = Summary(
@@ -8,3 +8,40 @@ HTTP_REQUEST_DURATION_SECONDS = Summary(
         "api_service_name", "client_name", "base_uri", "path", "method", "response_status"
     ),
 )
+HTTP_CONNECTION_EVENTS = Counter(
+    name="cme_api_client_http_connection_events",
+    documentation="Connections created and reused by client and its DNS cache hits and misses",
+    labelnames=("api_service_name", "client_name", "event"),
+)
+THROTTLER_WAIT_SECONDS = Histogram(
+    name="cme_api_client_throttler_wait_seconds",
+    documentation="Time requests waited for throttler before they were sent",
+    labelnames=("throttler",),
+    buckets=(0.001, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60),
+)
+CIRCUIT_BREAKER_STATE = Gauge(
+    name="cme_api_client_circuit_breaker_state",
+    documentation="State of upstream circuit breaker: 0 - closed, 1 - open, 2 - half-open",
+    labelnames=("circuit",),
+)
+CIRCUIT_BREAKER_REJECTED = Counter(
+    name="cme_api_client_circuit_breaker_rejected",
+    documentation="Requests failed fast by open circuit breaker",
+    labelnames=("circuit",),
+)
+HTTP_REQUEST_RETRIES = Counter(
+    name="cme_api_client_http_request_retries",
+    documentation="Repeated attempts of requests",
+    labelnames=("api_service_name", "client_name", "path"),
+)
+HTTP_HEDGED_REQUESTS = Counter(
+    name="cme_api_client_http_hedged_requests",
+    documentation="Hedged copies of slow requests: sent and the ones which answered first",
+    labelnames=("api_service_name", "client_name", "path", "outcome"),
+)
+HTTP_REQUEST_PHASE_SECONDS = Histogram(
+    name="cme_api_client_http_request_phase_seconds",
+    documentation="Duration of request phases: queue, dns, connect, tls, ttfb and body",
+    labelnames=("api_service_name", "client_name", "phase"),
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
@@ -1,10 +1,9 @@
-from pydantic import BaseModel
+from dataclasses import dataclass
+
 from yarl import URL
 
 
-class RequestInfo(BaseModel):
+@dataclass(frozen=True, slots=True)
+class RequestInfo:
     url: URL
     method: str
-
-    class Config:
-        arbitrary_types_allowed = True
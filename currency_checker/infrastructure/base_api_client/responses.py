@@ -1,6 +1,9 @@
-from typing import Type, TypeVar
+from collections.abc import Mapping
+from dataclasses import dataclass, field
+from typing import Any, Optional, Type, TypeVar
 
-from pydantic import BaseModel, parse_raw_as
+import msgspec
+from pydantic import parse_raw_as
 
 from currency_checker.infrastructure.base_api_client.exceptions import (
     ApiClientInvalidResponseError,
@@ -12,11 +15,20 @@ from currency_checker.infrastructure.base_api_client.requests import RequestInfo
 T = TypeVar('T')
 
 
-class Response(BaseModel):
+# built for every request, so it is a plain value object without validation
+@dataclass(frozen=True, slots=True)
+class Response:
     request_info: RequestInfo
     status: int
-    data: str
+    body: bytes
     content_type: str
+    headers: Mapping[str, str] = field(default_factory=dict)  # case-insensitive when built by session
+    charset: Optional[str] = None
+
+    @property
+    def data(self) -> str:
+        """Body decoded to text, undecodable bytes are replaced."""
+        return self.body.decode(self.charset or 'utf-8', errors='replace')
 
     def raise_for_status(self) -> None:
         if self.status >= 400:
@@ -26,8 +38,20 @@ class Response(BaseModel):
                 message=self.data,
             )
 
+    def json(self, type: Type[T] = Any, strict: bool = True) -> T:  # type: ignore[assignment]
+        """
+        Decode JSON body straight from bytes.
+
+        :param type: any type supported by msgspec, e.g. `list[SomeStruct]` or dataclass
+        :param strict: if False, strings are converted to numbers and so on
+        """
+        try:
+            return msgspec.json.decode(self.body, type=type, strict=strict)
+        except msgspec.DecodeError as exc:
+            raise ApiClientInvalidResponseError(exc)
+
     def parse(self, model: Type[T]) -> T:
         try:
-            return parse_raw_as(model, self.data, content_type=self.content_type)
+            return parse_raw_as(model, self.body, content_type=self.content_type, encoding=self.charset or 'utf8')
         except (ValueError, TypeError) as exc:
             raise ApiClientInvalidResponseError(exc)
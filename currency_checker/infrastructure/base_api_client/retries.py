@@ -0,0 +1,31 @@
+import random
+from dataclasses import dataclass
+from typing import Optional
+
+
+@dataclass(frozen=True, slots=True)
+class RetryPolicy:
+    """
+    When and how long `BaseSession.request` waits before next attempt.
+
+    Only connection errors and `statuses` responses are retried and only for idempotent `methods`.
+    Delays grow exponentially from `base_delay` up to `max_delay` with full jitter.
+    No attempt is started after `deadline` seconds since the first one.
+    """
+
+    attempts: int = 1
+    base_delay: float = 0.1
+    max_delay: float = 5.0
+    deadline: Optional[float] = None
+    statuses: frozenset[int] = frozenset({408, 500, 502, 503, 504})
+    methods: frozenset[str] = frozenset({'GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE'})
+
+    def is_retryable_method(self, method: str) -> bool:
+        return method.upper() in self.methods
+
+    def delay(self, attempt: int) -> float:
+        """Delay after failed `attempt` (starting with 0)."""
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+
+NO_RETRY = RetryPolicy()
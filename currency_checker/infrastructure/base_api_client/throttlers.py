@@ -0,0 +1,146 @@
+import abc
+import asyncio
+import os
+import time
+from collections import deque
+
+from redis.asyncio import Redis
+
+from currency_checker.infrastructure.base_api_client.base_throttler import BaseThrottler
+from currency_checker.infrastructure.base_api_client.metrics import THROTTLER_WAIT_SECONDS
+from currency_checker.infrastructure.base_api_client.responses import Response
+
+
+class MeasuredThrottler(BaseThrottler):
+    """Throttler which exports time spent in `acquire` with its name."""
+
+    def __init__(self, name: str) -> None:
+        self._wait_seconds = THROTTLER_WAIT_SECONDS.labels(name)
+
+    async def acquire(self) -> None:
+        started_at = time.monotonic()
+        try:
+            await self._acquire()
+        finally:
+            self._wait_seconds.observe(time.monotonic() - started_at)
+
+    @abc.abstractmethod
+    async def _acquire(self) -> None:
+        ...
+
+
+class ChainThrottler(BaseThrottler):
+    """Request is sent when every throttler allows it, responses are passed to all of them."""
+
+    def __init__(self, *throttlers: BaseThrottler) -> None:
+        self._throttlers = throttlers
+
+    async def acquire(self) -> None:
+        for throttler in self._throttlers:
+            await throttler.acquire()
+
+    def update(self, response: Response) -> None:
+        for throttler in self._throttlers:
+            throttler.update(response)
+
+
+class TokenBucketThrottler(MeasuredThrottler):
+    """
+    `rate` requests per second on average with bursts up to `capacity` requests.
+
+    Waiting requests are served in FIFO order.
+    """
+
+    def __init__(self, rate: float, capacity: int = 1, name: str = 'token_bucket') -> None:
+        super().__init__(name)
+        self._rate = rate
+        self._capacity = capacity
+        self._tokens = float(capacity)
+        self._updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def _acquire(self) -> None:
+        async with self._lock:
+            self._refill()
+            if self._tokens < 1:
+                await asyncio.sleep((1 - self._tokens) / self._rate)
+                self._refill()
+            self._tokens -= 1
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self._capacity, self._tokens + (now - self._updated_at) * self._rate)
+        self._updated_at = now
+
+
+class SlidingWindowThrottler(MeasuredThrottler):
+    """
+    At most `limit` requests in any `period` seconds.
+
+    Unlike token bucket it allows whole `limit` at once, as exchanges with per-minute limits do.
+    """
+
+    def __init__(self, limit: int, period: float, name: str = 'sliding_window') -> None:
+        super().__init__(name)
+        self._limit = limit
+        self._period = period
+        self._sent_at: deque[float] = deque()
+        self._lock = asyncio.Lock()
+
+    async def _acquire(self) -> None:
+        async with self._lock:
+            now = time.monotonic()
+            self._forget(now)
+            if len(self._sent_at) >= self._limit:
+                await asyncio.sleep(self._sent_at[0] + self._period - now)
+                now = time.monotonic()
+                self._forget(now)
+            self._sent_at.append(now)
+
+    def _forget(self, now: float) -> None:
+        while self._sent_at and self._sent_at[0] <= now - self._period:
+            self._sent_at.popleft()
+
+
+# Sliding window log in sorted set, scores are Redis clock milliseconds.
+# Returns 0 if request is allowed, otherwise milliseconds until the oldest request leaves the window.
+SLIDING_WINDOW_SCRIPT = """
+local limit = tonumber(ARGV[1])
+local period = tonumber(ARGV[2])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) * 1000 + math.floor(tonumber(clock[2]) / 1000)
+
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', now - period)
+if redis.call('ZCARD', KEYS[1]) < limit then
+    redis.call('ZADD', KEYS[1], now, ARGV[3])
+    redis.call('PEXPIRE', KEYS[1], period)
+    return 0
+end
+local oldest = redis.call('ZRANGE', KEYS[1], 0, 0, 'WITHSCORES')
+return math.max(1, tonumber(oldest[2]) + period - now)
+"""
+
+
+class RedisThrottler(MeasuredThrottler):
+    """
+    Sliding window throttler shared by all processes which use the same Redis `key`.
+
+    Window is checked and updated atomically by Lua script with Redis clock,
+    so workers on different hosts do not need synchronized clocks.
+    """
+
+    def __init__(self, redis: Redis, key: str, limit: int, period: float, name: str | None = None) -> None:
+        super().__init__(name or key)
+        self.redis = redis
+        self.key = key
+        self._limit = limit
+        self._period_ms = int(period * 1000)
+        self._script = redis.register_script(SLIDING_WINDOW_SCRIPT)
+
+    async def _acquire(self) -> None:
+        request_id = os.urandom(8).hex()
+        while True:
+            wait = await self._script(keys=[self.key], args=[self._limit, self._period_ms, request_id])
+            if wait == 0:
+                return
+            await asyncio.sleep(wait / 1000)
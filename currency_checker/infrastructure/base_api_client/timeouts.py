@@ -0,0 +1,26 @@
+from dataclasses import dataclass
+from typing import Optional
+
+import aiohttp
+
+
+@dataclass(frozen=True, slots=True)
+class RequestTimeout:
+    """
+    Limits of one attempt of request in seconds, None - not limited.
+
+    :param connect: connection establishment (including waiting for free connection in pool)
+    :param ttfb: waiting for first byte of response and for every next chunk of it
+    :param total: whole attempt including reading of response body
+    """
+
+    connect: Optional[float] = None
+    ttfb: Optional[float] = None
+    total: Optional[float] = None
+
+    def client_timeout(self, remaining: Optional[float] = None) -> aiohttp.ClientTimeout:
+        """aiohttp timeout, total time is cut to `remaining` seconds of request deadline."""
+        total = self.total
+        if remaining is not None:
+            total = max(0.001, remaining if total is None else min(total, remaining))
+        return aiohttp.ClientTimeout(total=total, connect=self.connect, sock_read=self.ttfb)
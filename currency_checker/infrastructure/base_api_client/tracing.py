@@ -0,0 +1,169 @@
+import logging
+import random
+import ssl
+import time
+from contextvars import ContextVar
+from functools import cache
+from types import SimpleNamespace
+from typing import Any, Optional
+
+from aiohttp import ClientSession, TraceConfig, tracing
+
+from currency_checker.infrastructure.base_api_client.metrics import HTTP_REQUEST_PHASE_SECONDS
+
+
+PHASES = ('queue', 'dns', 'connect', 'tls', 'ttfb', 'body')
+
+# trace context of request which is opening connection in current task
+_connecting: ContextVar[Optional[SimpleNamespace]] = ContextVar('connecting', default=None)
+
+
+class TracingSSLContext(ssl.SSLContext):
+    """
+    Marks start of TLS handshake of traced connection.
+
+    aiohttp opens TCP connection and makes TLS handshake in one call without trace signals between them,
+    while asyncio wraps socket into SSL object right after TCP connection is established.
+    """
+
+    def wrap_bio(self, *args: Any, **kwargs: Any) -> ssl.SSLObject:
+        context = _connecting.get()
+        if context is not None:
+            context.tls_started_at = time.monotonic()
+        return super().wrap_bio(*args, **kwargs)
+
+
+@cache
+def tracing_ssl_context() -> TracingSSLContext:
+    """The same context as `ssl.create_default_context()`, shared by all clients."""
+    context = TracingSSLContext(ssl.PROTOCOL_TLS_CLIENT)
+    context.load_default_certs()
+    return context
+
+
+class RequestTracer:
+    """
+    Observes durations of request phases in `HTTP_REQUEST_PHASE_SECONDS` histogram.
+
+    queue - waiting for free connection in pool, dns - host resolution (DNS cache misses only),
+    connect - TCP connection, tls - TLS handshake (with `tracing_ssl_context`), ttfb - from sent request headers
+    to received response headers, body - reading of response body. Phases of connection are observed
+    only when new connection is opened. Hooks only take timestamps, so tracing is always on.
+
+    :param body_sample_rate: share of requests whose bodies are logged at DEBUG level
+    :param max_body_size: bytes of logged body, the rest is cut
+    """
+
+    def __init__(
+        self,
+        api_service_name: str,
+        client_name: str,
+        logger: logging.Logger,
+        body_sample_rate: float = 0.0,
+        max_body_size: int = 2048,
+    ) -> None:
+        self._phases = {
+            phase: HTTP_REQUEST_PHASE_SECONDS.labels(api_service_name, client_name, phase) for phase in PHASES
+        }
+        self._logger = logger
+        self._body_sample_rate = body_sample_rate
+        self._max_body_size = max_body_size
+
+    def trace_config(self) -> TraceConfig:
+        trace_config = TraceConfig()
+        trace_config.on_request_start.append(self._on_request_start)
+        trace_config.on_connection_queued_start.append(self._on_connection_queued_start)
+        trace_config.on_connection_queued_end.append(self._on_connection_queued_end)
+        trace_config.on_connection_create_start.append(self._on_connection_create_start)
+        trace_config.on_dns_resolvehost_start.append(self._on_dns_resolvehost_start)
+        trace_config.on_dns_resolvehost_end.append(self._on_dns_resolvehost_end)
+        trace_config.on_connection_create_end.append(self._on_connection_create_end)
+        trace_config.on_request_headers_sent.append(self._on_request_headers_sent)
+        trace_config.on_request_end.append(self._on_request_end)
+        trace_config.on_response_chunk_received.append(self._on_response_chunk_received)
+        if self._body_sample_rate > 0:
+            trace_config.on_request_chunk_sent.append(self._on_request_chunk_sent)
+        return trace_config
+
+    async def _on_request_start(
+        self, session: ClientSession, context: SimpleNamespace, params: tracing.TraceRequestStartParams
+    ) -> None:
+        context.dns = 0.0
+        context.tls_started_at = None
+        context.sent_at = context.response_at = time.monotonic()
+        # bodies are collected only when they are going to be logged
+        sampled = (
+            self._body_sample_rate > 0
+            and random.random() < self._body_sample_rate
+            and self._logger.isEnabledFor(logging.DEBUG)
+        )
+        context.request_body = [] if sampled else None
+
+    async def _on_connection_queued_start(
+        self, session: ClientSession, context: SimpleNamespace, params: tracing.TraceConnectionQueuedStartParams
+    ) -> None:
+        context.queued_at = time.monotonic()
+
+    async def _on_connection_queued_end(
+        self, session: ClientSession, context: SimpleNamespace, params: tracing.TraceConnectionQueuedEndParams
+    ) -> None:
+        self._phases['queue'].observe(time.monotonic() - context.queued_at)
+
+    async def _on_connection_create_start(
+        self, session: ClientSession, context: SimpleNamespace, params: tracing.TraceConnectionCreateStartParams
+    ) -> None:
+        context.connecting_at = time.monotonic()
+        _connecting.set(context)
+
+    async def _on_dns_resolvehost_start(
+        self, session: ClientSession, context: SimpleNamespace, params: tracing.TraceDnsResolveHostStartParams
+    ) -> None:
+        context.resolving_at = time.monotonic()
+
+    async def _on_dns_resolvehost_end(
+        self, session: ClientSession, context: SimpleNamespace, params: tracing.TraceDnsResolveHostEndParams
+    ) -> None:
+        context.dns = time.monotonic() - context.resolving_at
+        self._phases['dns'].observe(context.dns)
+
+    async def _on_connection_create_end(
+        self, session: ClientSession, context: SimpleNamespace, params: tracing.TraceConnectionCreateEndParams
+    ) -> None:
+        now = time.monotonic()
+        _connecting.set(None)
+        connected_at = context.tls_started_at if context.tls_started_at is not None else now
+        self._phases['connect'].observe(max(0.0, connected_at - context.connecting_at - context.dns))
+        if context.tls_started_at is not None:
+            self._phases['tls'].observe(now - context.tls_started_at)
+
+    async def _on_request_headers_sent(
+        self, session: ClientSession, context: SimpleNamespace, params: tracing.TraceRequestHeadersSentParams
+    ) -> None:
+        context.sent_at = time.monotonic()
+
+    async def _on_request_chunk_sent(
+        self, session: ClientSession, context: SimpleNamespace, params: tracing.TraceRequestChunkSentParams
+    ) -> None:
+        if context.request_body is not None:
+            context.request_body.append(params.chunk)
+
+    async def _on_request_end(
+        self, session: ClientSession, context: SimpleNamespace, params: tracing.TraceRequestEndParams
+    ) -> None:
+        context.response_at = time.monotonic()
+        self._phases['ttfb'].observe(context.response_at - context.sent_at)
+        if context.request_body is not None:
+            self._logger.debug(
+                'Request: %s %s, body: %r', params.method, params.url, self._cut(b''.join(context.request_body))
+            )
+
+    async def _on_response_chunk_received(
+        self, session: ClientSession, context: SimpleNamespace, params: tracing.TraceResponseChunkReceivedParams
+    ) -> None:
+        # response body is read at once, so the only chunk is the whole body
+        self._phases['body'].observe(time.monotonic() - context.response_at)
+        if context.request_body is not None:
+            self._logger.debug('Response: %s %s, body: %r', params.method, params.url, self._cut(params.chunk))
+
+    def _cut(self, body: bytes) -> bytes:
+        return body[:self._max_body_size]
@@ -0,0 +1,117 @@
+"""Symbols, asset aliases and their revisions
+
+Revision ID: 8aa7d9bb406a
+Revises: 3ef8c14c50b3
+Create Date: 2026-10-18 12:30:12.402119
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8aa7d9bb406a'
+down_revision: Union[str, None] = '3ef8c14c50b3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+BINANCE_SYMBOLS = [
+    ('BTCRUB', 'BTC', 'RUB'),
+    ('BTCUSDT', 'BTC', 'USDT'),
+    ('ETHRUB', 'ETH', 'RUB'),
+    ('ETHUSD', 'ETH', 'USDT'),
+    ('TRXUSDT', 'TRX', 'USDT'),
+    ('USDTRUB', 'USDT', 'RUB'),
+]
+COINGEKO_ASSETS = [('bitcoin', 'BTC'), ('ethereum', 'ETH'), ('tether', 'USDT'), ('tron', 'TRX')]
+COINGEKO_VS_ASSETS = [('usd', 'USD'), ('rub', 'RUB')]
+ALIASES = [
+    ('binance', 'USDTTRC', 'TRX'),
+    ('binance', 'USDTERC', 'USDT'),
+    ('binance', 'USD', 'USDT'),
+    ('coingeko', 'USDTTRC', 'TRX'),
+    ('coingeko', 'USDTERC', 'USDT'),
+]
+
+
+def upgrade() -> None:
+    symbols = op.create_table(
+        'symbols',
+        sa.Column('source', sa.String(length=50), nullable=False),
+        sa.Column('symbol', sa.String(length=50), nullable=False),
+        sa.Column('base', sa.String(length=20), nullable=False),
+        sa.Column('quote', sa.String(length=20), nullable=False),
+        sa.Column('base_code', sa.String(length=100), nullable=True),
+        sa.Column('quote_code', sa.String(length=100), nullable=True),
+        sa.Column('active', sa.Boolean(), server_default='true', nullable=False),
+        sa.Column('id', sa.UUID(), server_default=sa.text('gen_random_uuid()'), nullable=False),
+        sa.PrimaryKeyConstraint('id', name=op.f('pk__symbols')),
+        sa.UniqueConstraint('source', 'symbol', name=op.f('uq__symbols__source_symbol')),
+    )
+    asset_aliases = op.create_table(
+        'asset_aliases',
+        sa.Column('source', sa.String(length=50), nullable=False),
+        sa.Column('alias', sa.String(length=20), nullable=False),
+        sa.Column('asset', sa.String(length=20), nullable=False),
+        sa.Column('id', sa.UUID(), server_default=sa.text('gen_random_uuid()'), nullable=False),
+        sa.PrimaryKeyConstraint('id', name=op.f('pk__asset_aliases')),
+        sa.UniqueConstraint('source', 'alias', name=op.f('uq__asset_aliases__source_alias')),
+    )
+    op.create_table(
+        'symbol_revisions',
+        sa.Column('source', sa.String(length=50), nullable=False),
+        sa.Column('revision', sa.BigInteger(), nullable=False),
+        sa.PrimaryKeyConstraint('source', name=op.f('pk__symbol_revisions')),
+    )
+
+    # running processes poll revisions and reload mappings of changed sources
+    op.execute("""
+        CREATE FUNCTION bump_symbol_revision() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP <> 'INSERT' THEN
+                INSERT INTO symbol_revisions (source, revision) VALUES (OLD.source, 1)
+                ON CONFLICT (source) DO UPDATE SET revision = symbol_revisions.revision + 1;
+            END IF;
+            IF TG_OP <> 'DELETE' AND (TG_OP = 'INSERT' OR NEW.source <> OLD.source) THEN
+                INSERT INTO symbol_revisions (source, revision) VALUES (NEW.source, 1)
+                ON CONFLICT (source) DO UPDATE SET revision = symbol_revisions.revision + 1;
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    for table in ('symbols', 'asset_aliases'):
+        op.execute(f"""
+            CREATE TRIGGER {table}_revision AFTER INSERT OR UPDATE OR DELETE ON {table}
+            FOR EACH ROW EXECUTE FUNCTION bump_symbol_revision()
+        """)
+
+    # mappings which were hardcoded in services before
+    op.bulk_insert(symbols, [
+        {'source': 'binance', 'symbol': symbol, 'base': base, 'quote': quote}
+        for symbol, base, quote in BINANCE_SYMBOLS
+    ] + [
+        {
+            'source': 'coingeko',
+            'symbol': f'{base}{quote}',
+            'base': base,
+            'quote': quote,
+            'base_code': base_code,
+            'quote_code': quote_code,
+        }
+        for base_code, base in COINGEKO_ASSETS
+        for quote_code, quote in COINGEKO_VS_ASSETS
+    ])
+    op.bulk_insert(asset_aliases, [
+        {'source': source, 'alias': alias, 'asset': asset} for source, alias, asset in ALIASES
+    ])
+
+
+def downgrade() -> None:
+    op.drop_table('symbol_revisions')
+    op.drop_table('asset_aliases')
+    op.drop_table('symbols')
+    op.execute('DROP FUNCTION bump_symbol_revision()')
@@ -1,6 +1,9 @@
-from sqlalchemy import Boolean, Column, MetaData, String, UniqueConstraint, func
+from sqlalchemy import BigInteger, Boolean, Column, MetaData, String, UniqueConstraint, func
 from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.orm import DeclarativeBase
+
+from currency_checker.infrastructure.settings import PostgresSettings
 
 
 convention = {
@@ -13,7 +16,10 @@ convention = {
 }
 
 metadata = MetaData(naming_convention=convention)  # type: ignore
-Base = declarative_base(metadata=metadata)
+
+
+class Base(DeclarativeBase):
+    metadata = metadata
 
 
 class UIdMixin:
@@ -41,3 +47,49 @@ class Accounts(Base, UIdMixin):
         doc='Account source (like binance or coingecko)'
     )
     active = Column(Boolean, default=True)
+
+
+class Symbols(Base, UIdMixin):
+    __tablename__ = 'symbols'
+    __table_args__ = (
+        UniqueConstraint('source', 'symbol'),
+    )
+
+    source = Column(String(50), nullable=False, doc='Exchange adapter name (like binance or coingeko)')
+    symbol = Column(String(50), nullable=False, doc='Symbol on exchange, also a key of its rate in storage')
+    base = Column(String(20), nullable=False)
+    quote = Column(String(20), nullable=False)
+    base_code = Column(String(100), nullable=True, doc='Id of base asset in exchange API, if it is not asset name')
+    quote_code = Column(String(100), nullable=True, doc='Id of quote asset in exchange API, if it is not asset name')
+    active = Column(Boolean, nullable=False, server_default='true')
+
+
+class AssetAliases(Base, UIdMixin):
+    __tablename__ = 'asset_aliases'
+    __table_args__ = (
+        UniqueConstraint('source', 'alias'),
+    )
+
+    source = Column(String(50), nullable=False)
+    alias = Column(String(20), nullable=False, doc='Asset name used in directions (like USDTERC)')
+    asset = Column(String(20), nullable=False, doc='Asset name used in symbols (like USDT)')
+
+
+class SymbolRevisions(Base):
+    """Incremented by triggers on every change of `symbols` and `asset_aliases`, polled by running processes."""
+    __tablename__ = 'symbol_revisions'
+
+    source = Column(String(50), primary_key=True)
+    revision = Column(BigInteger, nullable=False)
+
+
+def create_engine(settings: PostgresSettings) -> AsyncEngine:
+    dsn = f'postgresql+asyncpg://{settings.user}:{settings.password}@{settings.host}:{settings.port}/{settings.database}'
+    return create_async_engine(
+        dsn,
+        echo=False,
+        connect_args={
+            'ssl': settings.ssl_mode,
+            'statement_cache_size': 0,
+        }
+    )
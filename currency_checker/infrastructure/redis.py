@@ -0,0 +1,62 @@
+from prometheus_client import Gauge
+from redis.asyncio import BlockingConnectionPool, Redis
+
+from currency_checker.infrastructure.settings import RedisSettings
+
+
+REDIS_POOL_CONNECTIONS = Gauge(
+    name='currency_checker_redis_pool_connections',
+    documentation='Connections of process-wide Redis connection pools',
+    labelnames=('pool', 'state'),
+)
+
+_clients: dict[RedisSettings, Redis] = {}
+
+
+def get_redis(settings: RedisSettings) -> Redis:
+    """
+    Process-wide Redis client with connection pool shared by every storage with same settings.
+
+    Pool should be closed with `close_redis_pools` on process shutdown.
+    """
+    if settings not in _clients:
+        pool = BlockingConnectionPool(
+            host=settings.host,
+            port=settings.port,
+            db=settings.database,
+            max_connections=settings.max_connections,
+            timeout=settings.pool_timeout,
+            socket_keepalive=settings.socket_keepalive,
+            health_check_interval=settings.health_check_interval,
+        )
+        _clients[settings] = Redis.from_pool(pool)
+        _register_pool_metrics(_pool_name(settings), pool)
+    return _clients[settings]
+
+
+async def close_redis_pools() -> None:
+    while _clients:
+        settings, client = _clients.popitem()
+        # callbacks of gauges hold closed pool, new pool with the same settings registers them again
+        _unregister_pool_metrics(_pool_name(settings))
+        await client.aclose()
+
+
+def _pool_name(settings: RedisSettings) -> str:
+    return f'{settings.host}:{settings.port}/{settings.database}'
+
+
+def _register_pool_metrics(name: str, pool: BlockingConnectionPool) -> None:
+    # redis-py has no public counters of pool connections, so they are read from its private attributes
+    REDIS_POOL_CONNECTIONS.labels(name, 'in_use').set_function(
+        lambda: len(getattr(pool, '_in_use_connections', ()))
+    )
+    REDIS_POOL_CONNECTIONS.labels(name, 'idle').set_function(
+        lambda: len(getattr(pool, '_available_connections', ()))
+    )
+    REDIS_POOL_CONNECTIONS.labels(name, 'max').set(pool.max_connections)
+
+
+def _unregister_pool_metrics(name: str) -> None:
+    for state in ('in_use', 'idle', 'max'):
+        REDIS_POOL_CONNECTIONS.remove(name, state)
@@ -1,7 +1,12 @@
+from logging import getLogger
 from os import getenv
 from pathlib import Path
+from typing import Any
 
-from pydantic import BaseModel, BaseSettings
+from pydantic import BaseModel, BaseSettings, root_validator
+
+
+logger = getLogger(__name__)
 
 
 class LoggingSettings(BaseModel):
@@ -22,27 +27,135 @@ class RedisSettings(BaseModel):
     host: str
     port: int
     database: int
+    max_connections: int = 50
+    pool_timeout: int = 5  # seconds to wait for free connection when pool is exhausted
+    socket_keepalive: bool = True
+    health_check_interval: int = 30
+
+    class Config:
+        frozen = True  # settings are used as a key of connection pools registry
+
+
+class LocalCacheSettings(BaseModel):
+    enabled: bool = False
+    max_size: int = 1024
+    ttl: float = 5.0  # upper bound of staleness if keyspace notification is lost
+    configure_notifications: bool = True  # run CONFIG SET notify-keyspace-events on startup
+
 
+class HistorySettings(BaseModel):
+    enabled: bool = True
+    retention: int = 86400  # seconds
+    chunk_size: int = 3600  # seconds of history in one Redis key
 
-class SchedulerSettings(BaseModel):
-    interval: int = 5
-    queue: str = 'default'
-    worker_count: int = 8
+
+class WriteBufferSettings(BaseModel):
+    flush_interval: float = 0.05  # seconds, only the latest value of every rate is written
+    max_size: int = 1024  # rates in buffer, the oldest ones are dropped when it is full
+
+
+class ChangeFilterSettings(BaseModel):
+    enabled: bool = True
+    max_age: float = 60.0  # seconds, unchanged rate is written anyway, because other workers might write older one
+    heartbeat_interval: float = 1.0  # seconds between heartbeats of unchanged rate
+
+
+class ExchangeClientSettings(BaseModel):
+    keepalive_timeout: float = 60.0  # longer than scheduler interval, so connections are reused between runs
+    dns_cache_ttl: int = 300
+    binance_requests_per_minute: int | None = None  # shared by all workers, None - not limited
+    binance_weight_limit: int = 6000  # request weight per minute for IP, published by Binance
+    retry_attempts: int = 3
+    retry_deadline: float = 10.0  # seconds for all attempts of one request
+    circuit_failure_threshold: int = 5  # failures in a row which open circuit
+    circuit_recovery_timeout: float = 30.0  # seconds before probe request to upstream which is down
+    connect_timeout: float = 3.0  # seconds, per attempt
+    ttfb_timeout: float = 5.0  # seconds to first byte of response and between its chunks
+    request_timeout: float = 8.0  # seconds for whole attempt, cut to what is left of retry deadline
+    hedging_quantile: float = 0.95  # latency after which hedged copy of GET request is sent
+    hedging_budget: float = 0.0  # hedged requests per request, 0 - hedging is disabled
+    trace_body_sample_rate: float = 0.0  # share of requests whose bodies are logged at DEBUG level
+
+    class Config:
+        frozen = True
+
+
+class ApiKeyPoolSettings(BaseModel):
+    requests_per_minute: float = 30  # quota of one key
+    burst: int = 1  # requests one idle key can serve at once
+    rate_limit_cooldown: float = 60.0  # seconds key is not used after 429 response
+    error_cooldown: float = 5.0  # seconds key is not used after 5xx response
+    acquire_timeout: float = 5.0  # seconds job waits for key with free quota
+
+
+class SymbolsSettings(BaseModel):
+    load_from_database: bool = True  # False - built-in mappings of services are used
+    reload_interval: float = 30.0  # seconds between checks for changed mappings in database
+
+
+class AdapterSettings(BaseModel):
+    enabled: bool = True
+    mode: str | None = None  # poll or stream, None - preferred mode of exchange adapter
+    interval: int = 5  # seconds between polls
+    change_epsilon: float = 0.0  # rate is not written if it moved by no more, 0 - only equal rates are skipped
+    change_epsilons: dict[str, float] = {}  # symbol -> epsilon, overrides `change_epsilon`
+
+
+class DeprecatedSchedulerSettings(BaseModel):
+    interval: int | None = None
 
 
 class Settings(BaseSettings):
     log: LoggingSettings
     postgres: PostgresSettings
     redis: RedisSettings
+    local_cache: LocalCacheSettings = LocalCacheSettings()
+    history: HistorySettings = HistorySettings()
+    write_buffer: WriteBufferSettings = WriteBufferSettings()
+    change_filter: ChangeFilterSettings = ChangeFilterSettings()
+    exchange_client: ExchangeClientSettings = ExchangeClientSettings()
 
-    binance_scheduler: SchedulerSettings
-    coingeko_scheduler: SchedulerSettings
+    # exchange adapter name -> its ingestion settings, adapters without settings are enabled with defaults
+    adapters: dict[str, AdapterSettings] = {}
+    adapter_modules: list[str] = []  # modules with additional adapters, imported on startup
+    symbols: SymbolsSettings = SymbolsSettings()
+    coingeko_api_keys: ApiKeyPoolSettings = ApiKeyPoolSettings()
 
     api_metrics_port: int | None = None
+    api_fast_response: bool = False  # render responses with orjson and skip response model validation
+    api_stream_buffer_size: int = 16  # updates buffered for one stream client before it is evicted
+    api_stream_keepalive_interval: float = 15.0
+    api_courses_max_age: int = 0  # seconds clients may reuse courses without revalidation
     scheduler_metrics_port: int | None = None
     broker_metrics_port: int | None = None
 
-    enable_websocket_binance_client: bool = True
+    # replaced by `adapters`, still applied to settings of built-in adapters unless those are set explicitly
+    binance_scheduler: DeprecatedSchedulerSettings | None = None
+    coingeko_scheduler: DeprecatedSchedulerSettings | None = None
+    enable_websocket_binance_client: bool | None = None
+
+    @root_validator(skip_on_failure=True)
+    def _apply_deprecated_settings(cls, values: dict[str, Any]) -> dict[str, Any]:
+        adapters: dict[str, AdapterSettings] = dict(values['adapters'])
+        for name in ('binance', 'coingeko'):
+            scheduler: DeprecatedSchedulerSettings | None = values[f'{name}_scheduler']
+            if scheduler is None or scheduler.interval is None:
+                continue
+            prefix = name.upper()
+            logger.warning('%s_SCHEDULER__INTERVAL is deprecated, use ADAPTERS__%s__INTERVAL', prefix, prefix)
+            adapter = adapters.get(name, AdapterSettings())
+            if 'interval' not in adapter.__fields_set__:
+                adapters[name] = adapter.copy(update={'interval': scheduler.interval})
+
+        if values['enable_websocket_binance_client'] is not None:
+            logger.warning('ENABLE_WEBSOCKET_BINANCE_CLIENT is deprecated, use ADAPTERS__BINANCE__MODE')
+            adapter = adapters.get('binance', AdapterSettings())
+            if adapter.mode is None:
+                mode = 'stream' if values['enable_websocket_binance_client'] else 'poll'
+                adapters['binance'] = adapter.copy(update={'mode': mode})
+
+        values['adapters'] = adapters
+        return values
 
     class Config:
         env_file_encoding = 'utf-8'
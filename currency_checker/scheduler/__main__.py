@@ -5,23 +5,19 @@ from logging import getLogger
 from types import FrameType
 
 from apscheduler.jobstores.redis import RedisJobStore
+from apscheduler.schedulers.base import BaseScheduler
 from apscheduler.schedulers.blocking import BlockingScheduler
 
-from currency_checker.domain.storages.accounts import AbstractAccountStorage, PostgresAccountStorage
+from currency_checker.domain.adapters import AbstractExchangeAdapter, IngestionMode, get_enabled_adapters
 from currency_checker.infrastructure.logging import configure_logging
+from currency_checker.infrastructure.redis import close_redis_pools
 from currency_checker.infrastructure.settings import Settings
-from currency_checker.scheduler.exceptions import ConfigurationException
-from currency_checker.scheduler.jobs import (
-    binance_get_currency_rates,
-    binance_get_currency_rates_by_websocket,
-    coingeko_get_currency_rates,
-)
+from currency_checker.scheduler.jobs import poll_exchange, stream_exchanges
 from currency_checker.scheduler.utils import run_metrics_server
 
 
 logger = getLogger(__name__)
 scheduler: BlockingScheduler | None = None
-account_storage: AbstractAccountStorage | None = None
 
 
 def sigterm_handler(_signal: int, _frame: FrameType | None) -> None:
@@ -35,19 +31,40 @@ def sigterm_handler(_signal: int, _frame: FrameType | None) -> None:
 signal.signal(signal.SIGTERM, sigterm_handler)
 
 
-def scheduled_task_binance() -> None:
-    binance_get_currency_rates.send()
+def scheduled_poll(name: str) -> None:
+    poll_exchange.send(name)
 
 
-def scheduled_task_coingeko() -> None:
-    if account_storage is None:
-        raise ConfigurationException("Account storage is not initialized")
-    account = account_storage.get_active_account('coingeko')
-    coingeko_get_currency_rates.send(account.token)
+def scheduled_streams(names: list[str]) -> None:
+    stream_exchanges.send(names)
 
 
-def scheduled_task_binance_by_websocket() -> None:
-    binance_get_currency_rates_by_websocket.send()
+def schedule_ingestion(scheduler: BaseScheduler, adapters: list[AbstractExchangeAdapter]) -> None:
+    """Poll job of every adapter in poll mode and one job with streams of the others."""
+    for adapter in adapters:
+        if adapter.mode == IngestionMode.POLL:
+            scheduler.add_job(
+                func=scheduled_poll,
+                args=[adapter.name],
+                trigger='interval',
+                seconds=adapter.config.interval,
+                start_date=datetime.now()
+            )
+    streams = [adapter.name for adapter in adapters if adapter.mode == IngestionMode.STREAM]
+    if streams:
+        # all streams are run by one long job, which restarts them, so it is sent only once
+        scheduler.add_job(
+            func=scheduled_streams,
+            args=[streams],
+            trigger='date',
+            next_run_time=datetime.now()
+        )
+
+
+async def prepare_adapters(adapters: list[AbstractExchangeAdapter]) -> None:
+    for adapter in adapters:
+        await adapter.prepare()
+    await close_redis_pools()  # event loop is closed after this coroutine
 
 
 if __name__ == "__main__":
@@ -67,28 +84,9 @@ if __name__ == "__main__":
     }
     scheduler = BlockingScheduler(jobstores=job_stores)
 
-    if settings.enable_websocket_binance_client:
-        scheduler.add_job(
-            func=scheduled_task_binance_by_websocket,
-            trigger='date',
-            next_run_time=datetime.now()
-        )
-    else:
-        scheduler.add_job(
-            func=scheduled_task_binance,
-            trigger='interval',
-            seconds=settings.binance_scheduler.interval,
-            start_date=datetime.now()
-        )
-
-    account_storage = PostgresAccountStorage(settings.postgres)
-    asyncio.run(account_storage.cache_all_active_accounts('coingeko'))
-    scheduler.add_job(
-        scheduled_task_coingeko,
-        trigger='interval',
-        seconds=settings.coingeko_scheduler.interval,
-        start_date=datetime.now()
-    )
+    adapters = get_enabled_adapters(settings)
+    asyncio.run(prepare_adapters(adapters))
+    schedule_ingestion(scheduler, adapters)
 
     try:
         logger.debug('Starting scheduler...')
@@ -1,131 +1,149 @@
-from abc import ABC, abstractmethod
+import asyncio
+from collections.abc import Awaitable, Callable
 from logging import getLogger
 
 import dramatiq
 from dramatiq.brokers.redis import RedisBroker
 from dramatiq.middleware.asyncio import AsyncIO
 
-from currency_checker.domain.exchange_clients import (
-    AbstractExchangeClient,
-    BinanceClient,
-    BinanceWebsocketClient,
-    CoingekoClient,
-)
-from currency_checker.domain.models import CurrenciesCoinbase, DirectionBinance
-from currency_checker.domain.services import AbstractCurrencyService, BinanceService, CoingekoService
-from currency_checker.domain.storages.currency import RedisCurrencyStorage
+from currency_checker.domain.adapters import AbstractExchangeAdapter, get_adapter
+from currency_checker.domain.exceptions import IngestionSkipped
+from currency_checker.domain.services import AbstractCurrencyService
+from currency_checker.domain.storages.currency import BufferedCurrencyStorage, ChangeFilterCurrencyStorage
+from currency_checker.domain.storages.symbols import PostgresSymbolStorage, SymbolTableReloader
 from currency_checker.infrastructure.settings import Settings
+from currency_checker.scheduler.middleware import ResourcesShutdown
 
 
 logger = getLogger(__name__)
 settings = Settings()
 
+STREAM_RESTART_DELAY = 1.0  # seconds before stream of adapter is started again after it ended
+
 # Set broker for scheduler process
 # Without it scheduler will start to work with AMQP instead of REdis
 redis_broker = RedisBroker(
     host=settings.redis.host,
     port=settings.redis.port,
     db=settings.redis.database,
-    middleware=[AsyncIO()],
+    middleware=[AsyncIO(), ResourcesShutdown()],
 )
 dramatiq.set_broker(redis_broker)
 
-
-class Job(ABC):
-    def __init__(self, client: AbstractExchangeClient, service: AbstractCurrencyService):
-        self.client = client
-        self.service = service
-
-    @abstractmethod
-    async def execute(self) -> None:
-        ...
-
-
-class CoingekoJob(Job):
-    async def execute(self) -> None:
-        course_values = await self.client.get_price(
-            currencies=[
-                CurrenciesCoinbase.BITCOIN,
-                CurrenciesCoinbase.ETHEREUM,
-                CurrenciesCoinbase.TETHER,
-                CurrenciesCoinbase.TRON
-            ],
-            vs_currencies=[
-                CurrenciesCoinbase.USD,
-                CurrenciesCoinbase.RUB
-            ],
-        )
-        await self.service.save_course_values(course_values)
-
-
-class BinanceJob(Job):
-    async def execute(self) -> None:
-        currency_rates = await self.client.get_price(
-            directions=[
-                DirectionBinance.BTC_USDT,
-                DirectionBinance.BTC_RUB,
-                DirectionBinance.TRX_USDT,
-                DirectionBinance.USDT_RUB,
-                DirectionBinance.ETH_RUB,
-                DirectionBinance.ETH_USDT,
-            ],
-        )
-        for currency_rate in currency_rates:
-            await self.service.save_course_values(currency_rate)
+# symbol tables are shared by all jobs of worker process
+symbol_reloader = (
+    SymbolTableReloader(PostgresSymbolStorage(settings.postgres), interval=settings.symbols.reload_interval)
+    if settings.symbols.load_from_database else None
+)
+# the latest rates written by worker process, kept between jobs to skip writes of unchanged ones
+change_filters: dict[str, ChangeFilterCurrencyStorage] = {}
 
 
-class BinanceWebsocketJob(Job):
-    async def execute(self) -> None:
-        async for currency_rate in self.client.get_price(
-            directions=[
-                DirectionBinance.BTC_USDT,
-                DirectionBinance.BTC_RUB,
-                DirectionBinance.TRX_USDT,
-                DirectionBinance.USDT_RUB,
-                DirectionBinance.ETH_RUB,
-                DirectionBinance.ETH_USDT,
-            ],
-        ):
-            await self.service.save_course_values(currency_rate)
+@dramatiq.actor
+async def poll_exchange(name: str) -> None:
+    if symbol_reloader is not None:
+        await symbol_reloader.reload_if_due()
+    adapter = get_adapter(name, settings)
+    change_filter = _get_change_filter(adapter)
+    service = adapter.create_service(change_filter or adapter.create_storage())
+    written = change_filter.written if change_filter is not None else 0
+    logger.info('Job poll_exchange(%s) started', name)
+    try:
+        await adapter.poll(service)
+    except IngestionSkipped as exc:
+        logger.warning('Job poll_exchange(%s) skipped: %s', name, exc)
+        return
+    if change_filter is None or change_filter.written != written:
+        await service.save_snapshot()
+    logger.info('Job poll_exchange(%s) ended', name)
 
 
 @dramatiq.actor
-async def binance_get_currency_rates() -> None:
-    job = BinanceJob(
-        service=BinanceService(
-            RedisCurrencyStorage(settings.redis, 'binance')
-        ),
-        client=BinanceClient()
+async def stream_exchanges(names: list[str]) -> None:
+    """
+    Streams of all adapters in stream mode.
+
+    Streams run concurrently on event loop of `AsyncIO` middleware and occupy one worker thread together,
+    stream which ended or failed is started again, as well as stream whose symbols were changed.
+    """
+    logger.info('Job stream_exchanges(%s) started', ', '.join(names))
+    async with asyncio.TaskGroup() as group:
+        if symbol_reloader is not None:
+            group.create_task(symbol_reloader.run())
+        for name in names:
+            group.create_task(_stream_forever(get_adapter(name, settings)))
+
+
+async def _stream_forever(adapter: AbstractExchangeAdapter) -> None:
+    while True:
+        try:
+            await _stream(adapter)
+        except Exception:
+            logger.exception('Stream of %s failed', adapter.name)
+        await asyncio.sleep(STREAM_RESTART_DELAY)
+
+
+async def _stream(adapter: AbstractExchangeAdapter) -> None:
+    change_filter = _get_change_filter(adapter)
+    storage = BufferedCurrencyStorage(
+        change_filter or adapter.create_storage(),
+        key_prefix=adapter.name,
+        flush_interval=settings.write_buffer.flush_interval,
+        max_size=settings.write_buffer.max_size,
     )
-    logger.info('Job get_currency_rates started')
-    await job.execute()
-    await job.client.close()
-    logger.info('Job get_currency_rates ended')
+    service = adapter.create_service(storage)
+    storage.on_flush = _save_snapshot_on_change(service, change_filter)
+    flusher = asyncio.create_task(storage.run())
+    stream = asyncio.create_task(adapter.stream(service))
+    try:
+        # stream is resubscribed with new symbols after reload
+        while not stream.done() and adapter.symbol_table() is service.symbol_table:
+            await asyncio.wait([stream], timeout=settings.symbols.reload_interval)
+        if not stream.done():
+            logger.info('Symbols of %s were changed, stream is restarted', adapter.name)
+            stream.cancel()
+            await asyncio.wait([stream])
+        if not stream.cancelled():
+            stream.result()  # error of stream
+    finally:
+        # tasks are awaited with `wait`, so cancellation of this job is not swallowed
+        stream.cancel()
+        flusher.cancel()
+        await asyncio.wait([stream, flusher])
+        # failed flush must not replace error or cancellation of stream
+        await storage.try_flush()
+    logger.info('Stream of %s ended', adapter.name)
+
+
+def _get_change_filter(adapter: AbstractExchangeAdapter) -> ChangeFilterCurrencyStorage | None:
+    if not settings.change_filter.enabled:
+        return None
+    if adapter.name not in change_filters:
+        change_filters[adapter.name] = ChangeFilterCurrencyStorage(
+            adapter.create_storage(),
+            key_prefix=adapter.name,
+            # keys of env variables are lowercased, while symbols are upper case
+            epsilons={symbol.upper(): epsilon for symbol, epsilon in adapter.config.change_epsilons.items()},
+            default_epsilon=adapter.config.change_epsilon,
+            max_age=settings.change_filter.max_age,
+            heartbeat_interval=settings.change_filter.heartbeat_interval,
+        )
+    return change_filters[adapter.name]
 
 
-@dramatiq.actor
-async def binance_get_currency_rates_by_websocket() -> None:
-    job = BinanceWebsocketJob(
-        service=BinanceService(
-            RedisCurrencyStorage(settings.redis, 'binance')
-        ),
-        client=BinanceWebsocketClient(),
-    )
-    logger.info('Job get_currency_rates started')
-    await job.execute()
-    logger.info('Job get_currency_rates ended')
-    binance_get_currency_rates_by_websocket.send()  # trigger same task after one will end with connection error etc.
+def _save_snapshot_on_change(
+    service: AbstractCurrencyService,
+    change_filter: ChangeFilterCurrencyStorage | None,
+) -> Callable[[], Awaitable[None]]:
+    """Snapshot is rendered and published only after flush which really wrote something."""
+    if change_filter is None:
+        return service.save_snapshot
+    written = change_filter.written
 
+    async def save_snapshot() -> None:
+        nonlocal written
+        if change_filter.written != written:
+            written = change_filter.written
+            await service.save_snapshot()
 
-@dramatiq.actor
-async def coingeko_get_currency_rates(api_token: str) -> None:
-    job = CoingekoJob(
-        service=CoingekoService(
-            RedisCurrencyStorage(settings.redis, 'coingeko')
-        ),
-        client=CoingekoClient(api_token)
-    )
-    logger.info('Job get_currency_rates started')
-    await job.execute()
-    await job.client.close()
-    logger.info('Job get_currency_rates ended')
+    return save_snapshot
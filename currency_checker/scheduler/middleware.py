@@ -0,0 +1,28 @@
+from logging import getLogger
+
+from dramatiq import Broker, Middleware, Worker
+from dramatiq.asyncio import get_event_loop_thread
+
+from currency_checker.domain.exchange_clients import close_exchange_clients
+from currency_checker.infrastructure.redis import close_redis_pools
+
+
+logger = getLogger(__name__)
+
+
+class ResourcesShutdown(Middleware):
+    """
+    Close process-wide resources that are shared between actor runs.
+
+    Must be placed after `AsyncIO` middleware: resources are bound to its event loop
+    and "after" hooks are called in reverse order, so they are closed after all actors
+    are finished but before the loop is stopped.
+    """
+
+    def after_worker_shutdown(self, broker: Broker, worker: Worker) -> None:
+        event_loop_thread = get_event_loop_thread()
+        if event_loop_thread is None:
+            return
+        logger.debug('Closing shared resources...')
+        event_loop_thread.run_coroutine(close_exchange_clients())
+        event_loop_thread.run_coroutine(close_redis_pools())
@@ -0,0 +1,60 @@
+from collections.abc import AsyncGenerator
+
+import httpx
+import pytest
+from fakeredis.aioredis import FakeRedis
+from fastapi import FastAPI
+
+from currency_checker.api.routes.courses import router as courses_router
+from currency_checker.domain.models import Exchanger
+from currency_checker.domain.services import AbstractCurrencyService, BinanceService, CoingekoService
+from currency_checker.domain.storages.currency import RedisCurrencyStorage
+from currency_checker.infrastructure.settings import Settings
+
+
+@pytest.fixture
+def storage(settings: Settings, redis: FakeRedis) -> RedisCurrencyStorage:
+    """Storage of Binance rates."""
+    return RedisCurrencyStorage(settings.redis, 'binance', settings.history)
+
+
+@pytest.fixture
+def coingeko_storage(settings: Settings, redis: FakeRedis) -> RedisCurrencyStorage:
+    return RedisCurrencyStorage(settings.redis, 'coingeko', settings.history)
+
+
+@pytest.fixture
+def service(storage: RedisCurrencyStorage) -> BinanceService:
+    return BinanceService(storage)
+
+
+@pytest.fixture
+def coingeko_service(coingeko_storage: RedisCurrencyStorage) -> CoingekoService:
+    return CoingekoService(coingeko_storage)
+
+
+@pytest.fixture
+def app(
+    settings: Settings,
+    service: BinanceService,
+    coingeko_service: CoingekoService,
+    storage: RedisCurrencyStorage,
+    coingeko_storage: RedisCurrencyStorage,
+) -> FastAPI:
+    # application without lifespan, its state is what lifespan would build
+    app = FastAPI()
+    app.include_router(courses_router, prefix='/v1')
+    app.state.settings = settings
+    services: dict[Exchanger, AbstractCurrencyService] = {
+        Exchanger.BINANCE: service,
+        Exchanger.COINBASE: coingeko_service,
+    }
+    app.state.services = services
+    app.state.storages = {Exchanger.BINANCE: storage, Exchanger.COINBASE: coingeko_storage}
+    return app
+
+
+@pytest.fixture
+async def client(app: FastAPI) -> AsyncGenerator[httpx.AsyncClient, None]:
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url='http://test') as client:
+        yield client
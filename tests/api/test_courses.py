@@ -0,0 +1,155 @@
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from currency_checker.domain.services import BinanceService
+from currency_checker.domain.storages.currency import RedisCurrencyStorage
+from currency_checker.domain.symbols import SymbolMapping, SymbolTable
+from currency_checker.infrastructure.settings import Settings
+
+
+RATES = {'BTCRUB': 100.0, 'BTCUSDT': 2.0, 'ETHRUB': 10.0, 'ETHUSD': 0.2, 'TRXUSDT': 0.1, 'USDTRUB': 50.0}
+COURSES = [
+    {'direction': 'BTC-RUB', 'value': 100.0},
+    {'direction': 'BTC-USD', 'value': 2.0},
+    {'direction': 'ETH-RUB', 'value': 10.0},
+    {'direction': 'ETH-USD', 'value': 0.2},
+    {'direction': 'USDTTRC-RUB', 'value': 5.0},
+    {'direction': 'USDTTRC-USD', 'value': 0.1},
+    {'direction': 'USDTERC-RUB', 'value': 50.0},
+    {'direction': 'USDTERC-USD', 'value': 1.0},
+]
+
+
+@pytest.fixture
+async def snapshot(storage: RedisCurrencyStorage, service: BinanceService) -> str:
+    """Rates and snapshot saved by ingestion job, returns ETag of snapshot."""
+    await storage.set_keys(RATES)
+    await service.save_snapshot()
+    version = await service.get_snapshot_version()
+    return f'"binance-{version}"'
+
+
+async def test_courses_from_snapshot(client: httpx.AsyncClient, snapshot: str) -> None:
+    response = await client.get('/v1/courses')
+
+    assert response.status_code == 200
+    assert response.headers['etag'] == snapshot
+    assert response.headers['cache-control'] == 'no-cache'
+    assert response.json() == {'exchanger': 'binance', 'courses': pytest.approx(COURSES)}
+
+
+async def test_subset_of_courses_from_snapshot(client: httpx.AsyncClient, snapshot: str) -> None:
+    response = await client.get('/v1/courses', params={'directions': ['USDTTRC-RUB', 'BTC-RUB']})
+
+    assert response.status_code == 200
+    assert response.headers['etag'] == snapshot
+    assert response.json() == {
+        'exchanger': 'binance',
+        'courses': [
+            {'direction': 'USDTTRC-RUB', 'value': pytest.approx(5.0)},
+            {'direction': 'BTC-RUB', 'value': 100.0},
+        ],
+    }
+
+
+@pytest.mark.parametrize('if_none_match', ['{etag}', 'W/{etag}', '"binance-0", {etag}', '*'])
+async def test_not_modified(client: httpx.AsyncClient, snapshot: str, if_none_match: str) -> None:
+    response = await client.get('/v1/courses', headers={'If-None-Match': if_none_match.format(etag=snapshot)})
+
+    assert response.status_code == 304
+    assert response.headers['etag'] == snapshot
+    assert response.content == b''
+
+
+async def test_new_snapshot_changes_etag(
+    client: httpx.AsyncClient, storage: RedisCurrencyStorage, service: BinanceService, snapshot: str
+) -> None:
+    await storage.set_keys({'BTCRUB': 120.0})
+    await service.save_snapshot()
+
+    response = await client.get('/v1/courses', headers={'If-None-Match': snapshot})
+
+    assert response.status_code == 200
+    assert response.headers['etag'] != snapshot
+    assert response.json()['courses'][0] == {'direction': 'BTC-RUB', 'value': 120.0}
+
+
+async def test_max_age(client: httpx.AsyncClient, settings: Settings, snapshot: str) -> None:
+    settings.api_courses_max_age = 5
+
+    response = await client.get('/v1/courses', headers={'If-None-Match': snapshot})
+
+    assert response.status_code == 304
+    assert response.headers['cache-control'] == 'max-age=5'
+
+
+async def test_courses_without_snapshot(client: httpx.AsyncClient, storage: RedisCurrencyStorage) -> None:
+    await storage.set_keys(RATES)
+
+    response = await client.get(
+        '/v1/courses', params={'directions': ['USDTTRC-RUB']}, headers={'If-None-Match': '"binance-1"'}
+    )
+
+    assert response.status_code == 200
+    assert 'etag' not in response.headers
+    assert response.json() == {'exchanger': 'binance', 'courses': [{'direction': 'USDTTRC-RUB', 'value': 5.0}]}
+
+
+async def test_courses_without_rates(client: httpx.AsyncClient) -> None:
+    response = await client.get('/v1/courses')
+
+    assert response.status_code == 503
+
+
+async def test_courses_of_unmapped_direction(
+    client: httpx.AsyncClient, storage: RedisCurrencyStorage, service: BinanceService
+) -> None:
+    service.set_symbol_table(SymbolTable([SymbolMapping('BTCRUB', 'BTC', 'RUB')]))
+    await storage.set_keys(RATES)
+
+    response = await client.get('/v1/courses', params={'directions': ['ETH-RUB']})
+
+    assert response.status_code == 404
+
+
+async def test_snapshot_leaves_out_unmapped_directions(
+    client: httpx.AsyncClient, storage: RedisCurrencyStorage, service: BinanceService
+) -> None:
+    service.set_symbol_table(SymbolTable([
+        SymbolMapping('BTCRUB', 'BTC', 'RUB'),
+        SymbolMapping('ETHRUB', 'ETH', 'RUB'),
+    ]))
+    await storage.set_keys(RATES)
+    await service.save_snapshot()
+
+    response = await client.get('/v1/courses')
+
+    assert response.status_code == 200
+    assert 'etag' in response.headers
+    assert response.json()['courses'] == [
+        {'direction': 'BTC-RUB', 'value': 100.0},
+        {'direction': 'ETH-RUB', 'value': 10.0},
+    ]
+
+
+async def test_courses_of_exchanger_from_other_package(
+    app: FastAPI, client: httpx.AsyncClient, settings: Settings
+) -> None:
+    class KrakenService(BinanceService):
+        exchanger = 'kraken'
+
+    storage = RedisCurrencyStorage(settings.redis, 'kraken', settings.history)
+    await storage.set_keys(RATES)
+    app.state.services = {**app.state.services, 'kraken': KrakenService(storage)}
+
+    response = await client.get('/v1/courses', params={'exchanger': 'kraken', 'directions': ['BTC-RUB']})
+
+    assert response.status_code == 200
+    assert response.json() == {'exchanger': 'kraken', 'courses': [{'direction': 'BTC-RUB', 'value': 100.0}]}
+
+
+async def test_courses_of_unknown_exchanger(client: httpx.AsyncClient) -> None:
+    response = await client.get('/v1/courses', params={'exchanger': 'kraken'})
+
+    assert response.status_code == 404
@@ -0,0 +1,102 @@
+from typing import Any
+
+import httpx
+import pytest
+from fakeredis.aioredis import FakeRedis
+
+from currency_checker.domain.services import BinanceService, CoingekoService
+from currency_checker.domain.storages.currency import RedisCurrencyStorage
+from currency_checker.domain.symbols import SymbolMapping, SymbolTable
+
+
+async def test_aggregate(
+    client: httpx.AsyncClient,
+    storage: RedisCurrencyStorage,
+    coingeko_storage: RedisCurrencyStorage,
+) -> None:
+    await storage.set_keys({'BTCRUB': 100.0, 'ETHRUB': 10.0})
+    await coingeko_storage.set_keys({'BTCRUB': 110.0, 'ETHRUB': 12.0})
+
+    response = await client.get('/v1/courses/aggregate', params={'directions': ['BTC-RUB', 'ETH-RUB']})
+
+    assert response.status_code == 200
+    assert response.json() == {
+        'exchangers': ['binance', 'coinbase'],
+        'courses': [
+            {
+                'direction': 'BTC-RUB',
+                'values': {'binance': 100.0, 'coinbase': 110.0},
+                'median': 105.0,
+                'min': 100.0,
+                'max': 110.0,
+                'spread': 10.0,
+            },
+            {
+                'direction': 'ETH-RUB',
+                'values': {'binance': 10.0, 'coinbase': 12.0},
+                'median': 11.0,
+                'min': 10.0,
+                'max': 12.0,
+                'spread': 2.0,
+            },
+        ],
+    }
+
+
+async def test_rates_of_all_exchangers_are_read_at_once(
+    client: httpx.AsyncClient,
+    redis: FakeRedis,
+    storage: RedisCurrencyStorage,
+    coingeko_storage: RedisCurrencyStorage,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    await storage.set_keys({'BTCRUB': 100.0})
+    await coingeko_storage.set_keys({'BTCRUB': 110.0})
+    calls: list[Any] = []
+    mget = redis.mget
+
+    async def counting_mget(*args: Any, **kwargs: Any) -> Any:
+        calls.append(args)
+        return await mget(*args, **kwargs)
+
+    monkeypatch.setattr(redis, 'mget', counting_mget)
+
+    response = await client.get('/v1/courses/aggregate', params={'directions': ['BTC-RUB']})
+
+    assert response.status_code == 200
+    assert calls == [(['binance/BTCRUB', 'coingeko/BTCRUB'],)]
+
+
+async def test_exchanger_without_rates_is_left_out(
+    client: httpx.AsyncClient,
+    storage: RedisCurrencyStorage,
+    coingeko_storage: RedisCurrencyStorage,
+) -> None:
+    await storage.set_keys({'BTCRUB': 100.0})
+    await coingeko_storage.set_keys({'ETHRUB': 12.0})
+
+    response = await client.get('/v1/courses/aggregate', params={'directions': ['BTC-RUB']})
+
+    assert response.status_code == 200
+    assert response.json()['exchangers'] == ['binance']
+    assert response.json()['courses'][0]['spread'] == 0.0
+
+
+async def test_no_rates_yet(client: httpx.AsyncClient) -> None:
+    response = await client.get('/v1/courses/aggregate', params={'directions': ['BTC-RUB']})
+
+    assert response.status_code == 503
+
+
+async def test_direction_is_not_available(
+    client: httpx.AsyncClient,
+    service: BinanceService,
+    coingeko_service: CoingekoService,
+) -> None:
+    table = SymbolTable([SymbolMapping('BTCRUB', 'BTC', 'RUB')])
+    service.set_symbol_table(table)
+    coingeko_service.set_symbol_table(table)
+
+    response = await client.get('/v1/courses/aggregate', params={'directions': ['ETH-RUB']})
+
+    assert response.status_code == 404
@@ -0,0 +1,106 @@
+import asyncio
+import time
+from typing import Any
+
+import httpx
+import pytest
+from fakeredis.aioredis import FakeRedis
+
+from currency_checker.domain.storages.currency import RedisCurrencyStorage
+from currency_checker.infrastructure.settings import Settings
+
+
+@pytest.fixture
+async def history(storage: RedisCurrencyStorage) -> int:
+    """Two writes of every rate, returns time before the first one."""
+    started_at = int(time.time() * 1000)
+    await storage.set_keys({'BTCRUB': 100.0, 'TRXUSDT': 0.1, 'USDTRUB': 10.0})
+    await asyncio.sleep(0.002)  # points have millisecond timestamps
+    await storage.set_keys({'BTCRUB': 110.0, 'TRXUSDT': 0.2, 'USDTRUB': 10.0})
+    return started_at
+
+
+async def test_raw_history_of_single_symbol(client: httpx.AsyncClient, history: int) -> None:
+    response = await client.get('/v1/courses/history', params={'direction': 'BTC-RUB', 'interval': 'raw'})
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body['values'] == [100.0, 110.0]
+    assert len(body['timestamps']) == 2
+    assert all(timestamp >= history for timestamp in body['timestamps'])
+
+
+async def test_raw_history_of_cross_rate(client: httpx.AsyncClient, history: int) -> None:
+    # USDTTRC is TRX on Binance, TRX-RUB is TRXUSDT * USDTRUB
+    response = await client.get('/v1/courses/history', params={'direction': 'USDTTRC-RUB', 'interval': 'raw'})
+
+    assert response.status_code == 200
+    assert response.json()['values'] == pytest.approx([1.0, 2.0])
+
+
+async def test_raw_history_without_points(client: httpx.AsyncClient, history: int) -> None:
+    response = await client.get('/v1/courses/history', params={'direction': 'ETH-RUB', 'interval': 'raw'})
+
+    assert response.status_code == 200
+    assert response.json()['timestamps'] == []
+    assert response.json()['values'] == []
+
+
+async def test_history_of_identity_direction_is_rejected(client: httpx.AsyncClient, history: int) -> None:
+    # USDTERC and USD are the same asset on Binance
+    response = await client.get('/v1/courses/history', params={'direction': 'USDTERC-USD', 'interval': 'raw'})
+
+    assert response.status_code == 422
+    assert response.json() == {'detail': 'Course of USDTERC-USD is always 1 on exchanger binance'}
+
+
+async def test_ohlc_history(client: httpx.AsyncClient, history: int) -> None:
+    response = await client.get('/v1/courses/history', params={'direction': 'BTC-RUB', 'interval': '1h'})
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body['open'] == [100.0]
+    assert body['high'] == [110.0]
+    assert body['low'] == [100.0]
+    assert body['close'] == [110.0]
+
+
+async def test_history_range_is_clamped(
+    client: httpx.AsyncClient,
+    settings: Settings,
+    redis: FakeRedis,
+    history: int,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    reads: list[int] = []
+    mget = redis.mget
+
+    async def counting_mget(keys: list[str]) -> Any:
+        reads.append(len(keys))
+        return await mget(keys)
+
+    monkeypatch.setattr(redis, 'mget', counting_mget)
+
+    response = await client.get(
+        '/v1/courses/history',
+        params={
+            'direction': 'BTC-RUB',
+            'interval': 'raw',
+            'start': '2000-01-01T00:00:00Z',
+            'end': '2100-01-01T00:00:00Z',
+        },
+    )
+
+    assert response.status_code == 200
+    assert response.json()['values'] == [100.0, 110.0]
+    # chunks of retention period and current one, not a century of them
+    assert reads == [settings.history.retention // settings.history.chunk_size + 1]
+
+
+async def test_history_starting_after_end(client: httpx.AsyncClient) -> None:
+    response = await client.get(
+        '/v1/courses/history',
+        params={'direction': 'BTC-RUB', 'start': '2026-10-18T12:00:00Z', 'end': '2026-10-18T11:00:00Z'},
+    )
+
+    assert response.status_code == 422
@@ -0,0 +1,134 @@
+import asyncio
+import json
+from collections.abc import AsyncGenerator
+
+import httpx
+import pytest
+from fakeredis.aioredis import FakeRedis
+from fastapi import FastAPI
+from prometheus_client import REGISTRY
+
+from currency_checker.api.streaming import CoursesUpdatesHub
+from currency_checker.domain.models import Direction, Exchanger
+from currency_checker.domain.services import BinanceService
+from currency_checker.domain.storages.currency import RedisCurrencyStorage
+
+
+RATES = {'BTCRUB': 100.0, 'BTCUSDT': 2.0, 'ETHRUB': 10.0, 'ETHUSD': 0.2, 'TRXUSDT': 0.1, 'USDTRUB': 50.0}
+DOCUMENT = json.dumps({
+    'exchanger': 'binance',
+    'courses': [{'direction': 'BTC-RUB', 'value': 100.0}, {'direction': 'ETH-RUB', 'value': 10.0}],
+}).encode()
+
+
+@pytest.fixture
+def hub(redis: FakeRedis, storage: RedisCurrencyStorage, coingeko_storage: RedisCurrencyStorage) -> CoursesUpdatesHub:
+    return CoursesUpdatesHub(
+        redis=redis,
+        channels={storage.updates_channel: Exchanger.BINANCE, coingeko_storage.updates_channel: Exchanger.COINBASE},
+        buffer_size=2,
+        reconnect_interval=0.01,
+    )
+
+
+@pytest.fixture
+async def running_hub(hub: CoursesUpdatesHub, redis: FakeRedis) -> AsyncGenerator[CoursesUpdatesHub, None]:
+    task = asyncio.create_task(hub.run())
+    while not (await redis.pubsub_numsub(*hub._channels))[0][1]:
+        await asyncio.sleep(0.001)
+    yield hub
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
+
+
+def parse_event(event: bytes) -> dict:
+    name, data = event.decode().removesuffix('\n\n').split('\n')
+    assert name == 'event: courses'
+    return json.loads(data.removeprefix('data: '))
+
+
+def evictions() -> float:
+    return REGISTRY.get_sample_value('currency_checker_stream_evictions_total') or 0.0
+
+
+async def test_clients_share_one_subscription(
+    running_hub: CoursesUpdatesHub,
+    redis: FakeRedis,
+    storage: RedisCurrencyStorage,
+    service: BinanceService,
+) -> None:
+    first = running_hub.subscribe()
+    second = running_hub.subscribe([Exchanger.BINANCE])
+    await storage.set_keys(RATES)
+
+    await service.save_snapshot()
+
+    first_event = await asyncio.wait_for(first.queue.get(), 1)
+    second_event = await asyncio.wait_for(second.queue.get(), 1)
+    assert first_event is second_event  # rendered once for clients with the same filter
+    assert first_event is not None and parse_event(first_event)['exchanger'] == 'binance'
+    assert await redis.pubsub_numsub(storage.updates_channel) == [(storage.updates_channel.encode(), 1)]
+
+
+def test_directions_are_filtered(hub: CoursesUpdatesHub) -> None:
+    btc = hub.subscribe(directions=[Direction.BTC_RUB])
+    coingeko = hub.subscribe([Exchanger.COINBASE])
+
+    hub.publish(Exchanger.BINANCE, DOCUMENT)
+
+    event = btc.queue.get_nowait()
+    assert event is not None
+    assert parse_event(event) == {'exchanger': 'binance', 'courses': [{'direction': 'BTC-RUB', 'value': 100.0}]}
+    assert coingeko.queue.empty()
+
+
+def test_slow_client_is_evicted(hub: CoursesUpdatesHub) -> None:
+    slow = hub.subscribe()
+    fast = hub.subscribe()
+    evictions_before = evictions()
+
+    for _ in range(3):
+        hub.publish(Exchanger.BINANCE, DOCUMENT)
+        fast.queue.get_nowait()
+
+    # buffered events are dropped, client stream is told to stop
+    assert slow.queue.qsize() == 1 and slow.queue.get_nowait() is None
+    assert evictions() == evictions_before + 1
+    hub.publish(Exchanger.BINANCE, DOCUMENT)
+    assert slow.queue.empty()
+    assert fast.queue.get_nowait() is not None
+
+
+async def test_stream_sends_snapshot_and_keepalive(
+    app: FastAPI,
+    client: httpx.AsyncClient,
+    hub: CoursesUpdatesHub,
+    storage: RedisCurrencyStorage,
+    service: BinanceService,
+) -> None:
+    app.state.courses_hub = hub
+    app.state.settings.api_stream_keepalive_interval = 0.01
+    await storage.set_keys(RATES)
+    await service.save_snapshot()
+
+    request = asyncio.create_task(
+        client.get('/v1/courses/stream', params={'exchanger': ['binance'], 'directions': ['BTC-RUB']})
+    )
+    while not hub._subscribers:
+        await asyncio.sleep(0.001)
+    await asyncio.sleep(0.05)
+    (subscriber,) = hub._subscribers
+    assert subscriber.exchangers == {Exchanger.BINANCE} and subscriber.directions == {Direction.BTC_RUB}
+    for _ in range(3):  # published at once, faster than client reads them, so it is evicted and response ends
+        hub.publish(Exchanger.BINANCE, DOCUMENT)
+    response = await asyncio.wait_for(request, 1)
+
+    assert response.status_code == 200
+    assert response.headers['content-type'].startswith('text/event-stream')
+    first_event, *rest = response.content.split(b'\n\n')
+    assert parse_event(first_event + b'\n\n') == {
+        'exchanger': 'binance',
+        'courses': [{'direction': 'BTC-RUB', 'value': 100.0}],
+    }
+    assert b': keep-alive' in rest
+    assert not hub._subscribers
@@ -0,0 +1,30 @@
+from collections.abc import AsyncGenerator
+
+import pytest
+from fakeredis import FakeServer
+from fakeredis.aioredis import FakeRedis
+
+from currency_checker.infrastructure.settings import Settings
+
+
+@pytest.fixture
+def settings() -> Settings:
+    return Settings(
+        _env_file=None,
+        log={'level': 'INFO'},
+        postgres={'user': 'user', 'password': 'password', 'database': 'database'},
+        redis={'host': 'redis', 'port': 6379, 'database': 0},
+    )
+
+
+@pytest.fixture
+async def redis(monkeypatch: pytest.MonkeyPatch) -> AsyncGenerator[FakeRedis, None]:
+    """In-memory Redis, also returned by `get_redis` to storages."""
+    client = FakeRedis(server=FakeServer())
+    monkeypatch.setattr(
+        'currency_checker.domain.storages.currency.get_redis',
+        lambda settings: client,
+    )
+    yield client
+    await client.aclose()
+
@@ -0,0 +1,159 @@
+import logging
+from pathlib import Path
+
+import pytest
+from fakeredis.aioredis import FakeRedis
+
+from currency_checker.domain.adapters import (
+    AbstractExchangeAdapter,
+    BinanceAdapter,
+    CoingekoAdapter,
+    IngestionMode,
+    get_adapter,
+    get_enabled_adapters,
+    register_adapter,
+    registry,
+)
+from currency_checker.domain.exceptions import IngestionSkipped
+from currency_checker.domain.services import AbstractCurrencyService, BinanceService
+from currency_checker.infrastructure.settings import AdapterSettings, Settings
+
+
+EXTRA_ADAPTER_MODULE = '''
+from currency_checker.domain.adapters import AbstractExchangeAdapter, register_adapter
+from currency_checker.domain.services import BinanceService
+
+
+@register_adapter
+class KrakenAdapter(AbstractExchangeAdapter):
+    name = 'kraken'
+    exchanger = 'kraken'
+    service_class = BinanceService
+
+    async def poll(self, service):
+        pass
+'''
+
+
+class FakeAdapter(AbstractExchangeAdapter):
+    name = 'fake'
+    exchanger = 'fake'
+    service_class = BinanceService
+
+    async def poll(self, service: AbstractCurrencyService) -> None:
+        pass
+
+
+@pytest.fixture(autouse=True)
+def adapters(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Adapters registered by test are forgotten after it."""
+    monkeypatch.setattr(registry, '_adapters', dict(registry._adapters))
+
+
+@pytest.fixture
+def env(monkeypatch: pytest.MonkeyPatch) -> pytest.MonkeyPatch:
+    """Settings are read from environment only."""
+    monkeypatch.setenv('LOG__LEVEL', 'INFO')
+    monkeypatch.setenv('POSTGRES__USER', 'user')
+    monkeypatch.setenv('POSTGRES__PASSWORD', 'password')
+    monkeypatch.setenv('POSTGRES__DATABASE', 'database')
+    monkeypatch.setenv('REDIS__HOST', 'redis')
+    monkeypatch.setenv('REDIS__PORT', '6379')
+    monkeypatch.setenv('REDIS__DATABASE', '0')
+    return monkeypatch
+
+
+def test_built_in_adapters_are_enabled_by_default(settings: Settings) -> None:
+    adapters = get_enabled_adapters(settings)
+
+    assert [(type(adapter), adapter.mode) for adapter in adapters] == [
+        (BinanceAdapter, IngestionMode.STREAM),
+        (CoingekoAdapter, IngestionMode.POLL),
+    ]
+
+
+def test_adapter_is_disabled_by_settings(settings: Settings) -> None:
+    settings.adapters = {'coingeko': AdapterSettings(enabled=False)}
+
+    assert [adapter.name for adapter in get_enabled_adapters(settings)] == ['binance']
+
+
+def test_mode_is_switched_by_settings(settings: Settings) -> None:
+    settings.adapters = {'binance': AdapterSettings(mode='poll'), 'coingeko': AdapterSettings(mode='stream')}
+
+    assert get_adapter('binance', settings).mode == IngestionMode.POLL
+    with pytest.raises(ValueError, match='does not support stream mode'):
+        get_adapter('coingeko', settings).mode
+
+
+def test_adapter_is_registered_once() -> None:
+    register_adapter(FakeAdapter)
+
+    with pytest.raises(ValueError, match='already registered'):
+        register_adapter(FakeAdapter)
+    with pytest.raises(ValueError, match='already served'):
+        register_adapter(type('OtherFakeAdapter', (FakeAdapter,), {'name': 'other'}))
+
+
+def test_adapters_are_imported_from_modules(
+    settings: Settings, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    (tmp_path / 'kraken_adapter.py').write_text(EXTRA_ADAPTER_MODULE)
+    monkeypatch.syspath_prepend(str(tmp_path))
+    settings.adapter_modules = ['kraken_adapter']
+
+    adapters = get_enabled_adapters(settings)
+
+    assert [adapter.name for adapter in adapters] == ['binance', 'coingeko', 'kraken']
+    # exchanger is not a member of built-in `Exchanger` enum
+    assert adapters[-1].exchanger == 'kraken'
+    assert get_adapter('kraken', settings).mode == IngestionMode.POLL
+
+
+def test_settings_of_adapters_are_read_from_env(env: pytest.MonkeyPatch) -> None:
+    env.setenv('ADAPTERS__BINANCE__MODE', 'poll')
+    env.setenv('ADAPTERS__BINANCE__INTERVAL', '2')
+    env.setenv('ADAPTER_MODULES', '["kraken_adapter"]')
+
+    settings = Settings(_env_file=None)
+
+    assert get_adapter('binance', settings).mode == IngestionMode.POLL
+    assert settings.adapters['binance'].interval == 2
+    assert settings.adapter_modules == ['kraken_adapter']
+
+
+def test_deprecated_settings_are_applied(env: pytest.MonkeyPatch, caplog: pytest.LogCaptureFixture) -> None:
+    env.setenv('BINANCE_SCHEDULER__INTERVAL', '7')
+    env.setenv('COINGEKO_SCHEDULER__INTERVAL', '9')
+    env.setenv('ADAPTERS__COINGEKO__INTERVAL', '60')
+    env.setenv('ENABLE_WEBSOCKET_BINANCE_CLIENT', 'false')
+
+    with caplog.at_level(logging.WARNING):
+        settings = Settings(_env_file=None)
+
+    assert get_adapter('binance', settings).mode == IngestionMode.POLL
+    assert settings.adapters['binance'].interval == 7
+    assert settings.adapters['coingeko'].interval == 60  # new setting wins
+    assert [record.getMessage() for record in caplog.records] == [
+        'BINANCE_SCHEDULER__INTERVAL is deprecated, use ADAPTERS__BINANCE__INTERVAL',
+        'COINGEKO_SCHEDULER__INTERVAL is deprecated, use ADAPTERS__COINGEKO__INTERVAL',
+        'ENABLE_WEBSOCKET_BINANCE_CLIENT is deprecated, use ADAPTERS__BINANCE__MODE',
+    ]
+
+
+def test_deprecated_websocket_switch_does_not_override_mode(env: pytest.MonkeyPatch) -> None:
+    env.setenv('ENABLE_WEBSOCKET_BINANCE_CLIENT', 'true')
+    env.setenv('ADAPTERS__BINANCE__MODE', 'poll')
+
+    assert get_adapter('binance', Settings(_env_file=None)).mode == IngestionMode.POLL
+
+
+async def test_poll_without_api_keys_is_skipped(
+    settings: Settings, redis: FakeRedis, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr('currency_checker.domain.adapters.coingeko.get_redis', lambda settings: redis)
+    adapter = get_adapter('coingeko', settings)
+    await adapter.key_pool().set_keys([])  # there are no active accounts
+
+    with pytest.raises(IngestionSkipped, match='no CoinGecko API keys configured'):
+        await adapter.poll(adapter.create_service(adapter.create_storage()))
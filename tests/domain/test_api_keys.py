@@ -0,0 +1,97 @@
+import time
+
+import pytest
+from fakeredis.aioredis import FakeRedis
+
+from currency_checker.domain.exceptions import AccountsNotFound
+from currency_checker.domain.storages.api_keys import RedisApiKeyPool
+
+
+async def test_keys_are_given_out_by_quota(redis: FakeRedis) -> None:
+    pool = RedisApiKeyPool(redis, 'coingeko/api_keys', requests_per_minute=1, burst=2)
+    await pool.set_keys(['first', 'second'])
+
+    keys = [await pool.acquire() for _ in range(4)]
+
+    assert sorted(keys) == ['first', 'first', 'second', 'second']  # key with most tokens left goes first
+    assert keys[0] != keys[1]
+    assert await pool.acquire() is None
+
+
+async def test_acquire_waits_for_refill(redis: FakeRedis) -> None:
+    pool = RedisApiKeyPool(redis, 'coingeko/api_keys', requests_per_minute=600, burst=1)  # one token in 100ms
+    await pool.set_keys(['first'])
+    assert await pool.acquire() == 'first'
+
+    started_at = time.monotonic()
+    assert await pool.acquire(timeout=0.01) is None
+    assert await pool.acquire(timeout=1) == 'first'
+    assert time.monotonic() - started_at < 0.3
+
+
+async def test_cooling_down_key_is_skipped(redis: FakeRedis) -> None:
+    pool = RedisApiKeyPool(redis, 'coingeko/api_keys', requests_per_minute=1, burst=5)
+    await pool.set_keys(['first', 'second'])
+
+    await pool.cool_down('first', 60)
+
+    assert [await pool.acquire() for _ in range(3)] == ['second'] * 3
+
+
+async def test_key_is_given_out_after_cooldown(redis: FakeRedis) -> None:
+    pool = RedisApiKeyPool(redis, 'coingeko/api_keys', requests_per_minute=1, burst=5)
+    await pool.set_keys(['first'])
+    await pool.cool_down('first', 0.05)
+
+    assert await pool.acquire() is None
+    assert await pool.acquire(timeout=1) == 'first'
+
+
+async def test_empty_pool_is_not_taken_for_exhausted_one(redis: FakeRedis) -> None:
+    pool = RedisApiKeyPool(redis, 'coingeko/api_keys', requests_per_minute=1)
+    await pool.set_keys([])
+
+    started_at = time.monotonic()
+    with pytest.raises(AccountsNotFound):
+        await pool.acquire(timeout=1)
+    assert time.monotonic() - started_at < 0.1
+
+
+async def test_removed_key_is_not_given_out(redis: FakeRedis, monkeypatch: pytest.MonkeyPatch) -> None:
+    pool = RedisApiKeyPool(redis, 'coingeko/api_keys', requests_per_minute=1, burst=5)
+    await pool.set_keys(['first', 'second'])
+    members = await redis.smembers('{coingeko/api_keys}/keys')
+    await pool.set_keys(['second'])
+
+    # members were read by worker right before scheduler replaced them
+    async def smembers(name: str) -> set[bytes]:
+        return members
+
+    monkeypatch.setattr(redis, 'smembers', smembers)
+
+    assert [await pool.acquire() for _ in range(3)] == ['second'] * 3
+
+
+async def test_keys_of_pool_are_in_one_cluster_slot(redis: FakeRedis) -> None:
+    pool = RedisApiKeyPool(redis, 'coingeko/api_keys', requests_per_minute=1)
+    await pool.set_keys(['first', 'second'])
+    await pool.acquire()
+    await pool.cool_down('second', 60)
+
+    assert sorted(await redis.keys()) == [
+        b'{coingeko/api_keys}/bucket/first',
+        b'{coingeko/api_keys}/cooldown/second',
+        b'{coingeko/api_keys}/keys',
+    ]
+
+
+async def test_set_keys_keeps_state_of_remaining_keys(redis: FakeRedis) -> None:
+    pool = RedisApiKeyPool(redis, 'coingeko/api_keys', requests_per_minute=1, burst=1)
+    await pool.set_keys(['first', 'second'])
+    await pool.cool_down('first', 60)
+    assert await pool.acquire() == 'second'
+
+    await pool.set_keys(['first', 'second', 'third'])
+
+    assert await pool.acquire() == 'third'
+    assert await pool.acquire() is None
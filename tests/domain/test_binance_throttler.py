@@ -0,0 +1,96 @@
+import asyncio
+
+import pytest
+from yarl import URL
+
+from currency_checker.domain.exchange_clients import binance
+from currency_checker.domain.exchange_clients.binance import BinanceWeightThrottler
+from currency_checker.infrastructure.base_api_client.requests import RequestInfo
+from currency_checker.infrastructure.base_api_client.responses import Response
+
+
+class Clock:
+    """Wall clock of throttler, sleeping moves it forward at once."""
+
+    def __init__(self, now: float) -> None:
+        self.now = now
+        self.sleeps: list[float] = []
+
+    def time(self) -> float:
+        return self.now
+
+    async def sleep(self, delay: float) -> None:
+        self.sleeps.append(delay)
+        self.now += delay
+
+
+@pytest.fixture
+def clock(monkeypatch: pytest.MonkeyPatch) -> Clock:
+    clock = Clock(now=60 * 1000)  # start of minute
+    monkeypatch.setattr(binance, 'time', clock)
+    monkeypatch.setattr(asyncio, 'sleep', clock.sleep)
+    return clock
+
+
+@pytest.fixture
+def throttler(clock: Clock) -> BinanceWeightThrottler:
+    # requests are slowed down above 70 of weight and wait for the next minute above 90
+    return BinanceWeightThrottler(weight_limit=100, request_weight=10, slowdown_ratio=0.7, limit_ratio=0.9)
+
+
+def response(used_weight: str) -> Response:
+    return Response(
+        RequestInfo(url=URL('https://api.binance.com/api/v3/ticker/price'), method='GET'),
+        status=200,
+        body=b'[]',
+        content_type='application/json',
+        headers={BinanceWeightThrottler.USED_WEIGHT_HEADER: used_weight},
+    )
+
+
+async def test_weight_is_budgeted_per_request(throttler: BinanceWeightThrottler, clock: Clock) -> None:
+    for _ in range(7):
+        await throttler.acquire()
+    assert clock.sleeps == []
+
+    await throttler.acquire()
+
+    # 20 of weight is left before the limit, i.e. 2 requests are spread over the rest of minute
+    assert clock.sleeps == [30]
+
+
+async def test_used_weight_is_synced_from_header(throttler: BinanceWeightThrottler, clock: Clock) -> None:
+    await throttler.acquire()
+    throttler.update(response('70'))  # weight used by other processes on the host
+
+    await throttler.acquire()
+
+    assert clock.sleeps == [30]
+
+
+async def test_header_does_not_lower_weight_of_requests_in_flight(
+    throttler: BinanceWeightThrottler, clock: Clock
+) -> None:
+    for _ in range(3):
+        await throttler.acquire()
+    throttler.update(response('10'))  # response to the first request, two others are not counted by Binance yet
+
+    for _ in range(4):
+        await throttler.acquire()
+    assert clock.sleeps == []
+    await throttler.acquire()
+
+    assert clock.sleeps == [30]
+
+
+async def test_exhausted_budget_blocks_until_next_minute(throttler: BinanceWeightThrottler, clock: Clock) -> None:
+    clock.now += 15
+    throttler.update(response('85'))
+
+    await throttler.acquire()
+
+    assert clock.sleeps == [45]
+    # weight of the new minute is counted from zero
+    for _ in range(6):
+        await throttler.acquire()
+    assert clock.sleeps == [45]
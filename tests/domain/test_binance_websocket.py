@@ -0,0 +1,145 @@
+import json
+from collections.abc import AsyncGenerator, Sequence
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from prometheus_client import REGISTRY
+
+from currency_checker.domain.exchange_clients import BinanceWebsocketClient
+from currency_checker.domain.models import BinanceAveragePrice, CurrencyRateBinance
+
+
+def price_message(symbol: str, price: str) -> str:
+    return json.dumps({
+        'stream': f'{symbol.lower()}@avgPrice',
+        'data': {'e': 'avgPrice', 'E': 1, 's': symbol, 'i': '5m', 'w': price, 'T': 1},
+    })
+
+
+SUBSCRIBED = json.dumps({'result': None, 'id': None})
+
+
+class FakeBinance:
+    """Websocket server, every connection sends next list of messages and is closed then."""
+
+    def __init__(self, *connections: list[str]) -> None:
+        self.connections = list(connections)
+        self.subscriptions: list[dict] = []
+
+    async def handle(self, request: web.Request) -> web.WebSocketResponse:
+        websocket = web.WebSocketResponse()
+        await websocket.prepare(request)
+        self.subscriptions.append(await websocket.receive_json())
+        for message in self.connections.pop(0) if self.connections else []:
+            await websocket.send_str(message)
+        await websocket.close()
+        return websocket
+
+
+class FakeRestClient:
+    def __init__(self) -> None:
+        self.calls = 0
+
+    async def get_price(self, directions: Sequence[str]) -> list[CurrencyRateBinance]:
+        self.calls += 1
+        return [CurrencyRateBinance(symbol, 0.0) for symbol in directions]
+
+
+@pytest.fixture
+async def server() -> AsyncGenerator[tuple[FakeBinance, str], None]:
+    """Fake server and its URL, messages are set by test."""
+    fake = FakeBinance()
+    app = web.Application()
+    app.router.add_get('/stream', fake.handle)
+    test_server = TestServer(app)
+    await test_server.start_server()
+    yield fake, str(test_server.make_url('/')).rstrip('/')
+    await test_server.close()
+
+
+def make_client(url: str, rest_client: FakeRestClient | None = None) -> BinanceWebsocketClient:
+    return BinanceWebsocketClient(
+        base_url=url,
+        rest_client=rest_client,  # type: ignore[arg-type]
+        reconnect_min_delay=0,
+        max_reconnects=3,
+    )
+
+
+async def collect(client: BinanceWebsocketClient, count: int) -> list[CurrencyRateBinance | BinanceAveragePrice]:
+    rates = []
+    stream = client.get_price(['BTCRUB'])
+    async for rate in stream:
+        rates.append(rate)
+        if len(rates) == count:
+            break
+    await stream.aclose()
+    return rates
+
+
+def gap_count() -> float:
+    return REGISTRY.get_sample_value('currency_checker_websocket_gap_seconds_count', {'exchanger': 'binance'}) or 0.0
+
+
+async def test_reconnects_and_fills_gap(server: tuple[FakeBinance, str]) -> None:
+    fake, url = server
+    fake.connections = [
+        [SUBSCRIBED, price_message('BTCRUB', '100.5')],
+        [SUBSCRIBED, price_message('BTCRUB', '101')],
+    ]
+    rest_client = FakeRestClient()
+    gaps_before = gap_count()
+
+    rates = await collect(make_client(url, rest_client), 3)
+
+    assert [(rate.symbol, rate.price) for rate in rates] == [('BTCRUB', 100.5), ('BTCRUB', 0.0), ('BTCRUB', 101.0)]
+    assert rest_client.calls == 1
+    assert gap_count() == gaps_before + 1
+    assert fake.subscriptions == [{'method': 'SUBSCRIBE', 'params': ['btcrub@avgPrice'], 'id': None}] * 2
+
+
+async def test_unexpected_messages_are_skipped(server: tuple[FakeBinance, str]) -> None:
+    fake, url = server
+    fake.connections = [[
+        SUBSCRIBED,
+        json.dumps({'error': {'code': 2, 'msg': 'Invalid request'}, 'id': None}),
+        'not json',
+        price_message('BTCRUB', '100.5'),
+    ]]
+
+    rates = await collect(make_client(url), 1)
+
+    assert [(rate.symbol, rate.price) for rate in rates] == [('BTCRUB', 100.5)]
+    assert len(fake.subscriptions) == 1  # connection was not dropped
+
+
+async def test_gap_is_filled_when_stream_is_started_again(server: tuple[FakeBinance, str]) -> None:
+    fake, url = server
+    fake.connections = [
+        [SUBSCRIBED, price_message('BTCRUB', '100.5')],
+        [SUBSCRIBED, price_message('BTCRUB', '101')],
+    ]
+    rest_client = FakeRestClient()
+    client = make_client(url, rest_client)
+    gaps_before = gap_count()
+
+    # e.g. stream job failed after the first rate and supervisor started it again with the same client
+    await collect(client, 1)
+    assert client.disconnected_at is not None
+    rates = await collect(client, 2)
+
+    assert [(rate.symbol, rate.price) for rate in rates] == [('BTCRUB', 0.0), ('BTCRUB', 101.0)]
+    assert rest_client.calls == 1
+    assert gap_count() == gaps_before + 1
+
+
+async def test_stream_ends_after_max_reconnects(server: tuple[FakeBinance, str]) -> None:
+    fake, url = server
+    fake.connections = [[SUBSCRIBED]]
+    client = make_client(url)
+
+    rates = [rate async for rate in client.get_price(['BTCRUB'])]
+
+    assert rates == []
+    assert len(fake.subscriptions) == 4  # the first connection and 3 reconnects
@@ -0,0 +1,115 @@
+import time
+
+import pytest
+from fakeredis.aioredis import FakeRedis
+
+from currency_checker.domain.storages import currency
+from currency_checker.domain.storages.currency import ChangeFilterCurrencyStorage, RedisCurrencyStorage
+from currency_checker.infrastructure.settings import Settings
+
+
+class Clock:
+    """Replaces `time` module of storages, only monotonic clock is controlled by test."""
+
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+    @staticmethod
+    def time() -> float:
+        return time.time()
+
+
+@pytest.fixture
+def clock(monkeypatch: pytest.MonkeyPatch) -> Clock:
+    clock = Clock()
+    monkeypatch.setattr(currency, 'time', clock)
+    return clock
+
+
+@pytest.fixture
+def storage(settings: Settings, redis: FakeRedis) -> RedisCurrencyStorage:
+    return RedisCurrencyStorage(settings.redis, 'binance')
+
+
+@pytest.fixture
+def change_filter(storage: RedisCurrencyStorage, clock: Clock) -> ChangeFilterCurrencyStorage:
+    return ChangeFilterCurrencyStorage(
+        storage,
+        key_prefix='binance',
+        epsilons={'BTCRUB': 10.0},
+        default_epsilon=0.01,
+        max_age=60,
+        heartbeat_interval=1,
+    )
+
+
+async def test_changes_within_epsilon_are_not_written(
+    change_filter: ChangeFilterCurrencyStorage, storage: RedisCurrencyStorage
+) -> None:
+    await change_filter.set_keys({'BTCRUB': 100.0, 'USDTRUB': 90.0})
+
+    await change_filter.set_keys({'BTCRUB': 110.0, 'USDTRUB': 90.005})
+
+    assert await storage.get_keys(['BTCRUB', 'USDTRUB']) == [100.0, 90.0]
+    assert change_filter.written == 2
+
+
+async def test_changes_above_epsilon_are_written(
+    change_filter: ChangeFilterCurrencyStorage, storage: RedisCurrencyStorage
+) -> None:
+    await change_filter.set_keys({'BTCRUB': 100.0, 'USDTRUB': 90.0})
+
+    await change_filter.set_keys({'BTCRUB': 89.0, 'USDTRUB': 90.02})
+
+    assert await storage.get_keys(['BTCRUB', 'USDTRUB']) == [89.0, 90.02]
+    assert change_filter.written == 4
+
+
+async def test_epsilon_is_measured_from_the_last_write(
+    change_filter: ChangeFilterCurrencyStorage, storage: RedisCurrencyStorage
+) -> None:
+    # slow drift is written once it exceeds epsilon in total
+    for value in (100.0, 106.0, 112.0):
+        await change_filter.set_keys({'BTCRUB': value})
+
+    assert await storage.get_key('BTCRUB') == 112.0
+    assert change_filter.written == 2
+
+
+async def test_unchanged_rate_is_written_after_max_age(
+    change_filter: ChangeFilterCurrencyStorage, storage: RedisCurrencyStorage, clock: Clock
+) -> None:
+    await change_filter.set_keys({'BTCRUB': 100.0})
+    # another worker wrote older rate meanwhile
+    await storage.set_keys({'BTCRUB': 95.0})
+
+    clock.now += 59
+    await change_filter.set_keys({'BTCRUB': 100.0})
+    assert await storage.get_key('BTCRUB') == 95.0
+
+    clock.now += 1
+    await change_filter.set_keys({'BTCRUB': 100.0})
+    assert await storage.get_key('BTCRUB') == 100.0
+    assert change_filter.written == 2
+
+
+async def test_unchanged_rate_keeps_heartbeat(
+    change_filter: ChangeFilterCurrencyStorage, storage: RedisCurrencyStorage, clock: Clock
+) -> None:
+    await change_filter.set_keys({'BTCRUB': 100.0})
+    (written_at,) = await storage.get_heartbeats(['BTCRUB'])
+    await storage.redis.hset(storage.heartbeat_key, 'BTCRUB', 0)
+
+    clock.now += 0.5
+    await change_filter.set_keys({'BTCRUB': 100.0})
+    assert await storage.get_heartbeats(['BTCRUB']) == [0]  # at most one heartbeat per interval
+
+    clock.now += 0.5
+    await change_filter.set_keys({'BTCRUB': 100.0})
+    (touched_at,) = await storage.get_heartbeats(['BTCRUB'])
+    assert written_at is not None and touched_at is not None and touched_at >= written_at
+    assert change_filter.written == 1
+    assert await storage.get_heartbeats(['ETHRUB']) == [None]
@@ -0,0 +1,66 @@
+import numpy as np
+import pytest
+
+from currency_checker.domain.conversion import ConversionGraph
+from currency_checker.domain.exceptions import ConversionPathNotFound
+from currency_checker.domain.models import Direction, DirectionBinance
+from currency_checker.domain.services.binance import BinanceService
+from currency_checker.domain.services.coingeko import CoingekoService
+
+
+# mappings which were hard-coded in services before symbol tables, conversion paths must give the same courses
+OLD_BINANCE_MAPPING = {
+    Direction.USDTERC_USD: [],  # USDT and USD are the same currency
+    Direction.USDTTRC_RUB: [(DirectionBinance.TRX_USDT, 1), (DirectionBinance.USDT_RUB, 1)],
+    Direction.USDTTRC_USD: [(DirectionBinance.TRX_USDT, 1)],
+    Direction.USDTERC_RUB: [(DirectionBinance.USDT_RUB, 1)],
+    Direction.ETH_RUB: [(DirectionBinance.ETH_RUB, 1)],
+    Direction.ETH_USD: [(DirectionBinance.ETH_USDT, 1)],
+    Direction.BTC_RUB: [(DirectionBinance.BTC_RUB, 1)],
+    Direction.BTC_USD: [(DirectionBinance.BTC_USDT, 1)],
+}
+OLD_COINGEKO_MAPPING = {
+    Direction.USDTTRC_USD: 'TRXUSD',
+    Direction.USDTTRC_RUB: 'TRXRUB',
+    Direction.USDTERC_USD: 'USDTUSD',
+    Direction.USDTERC_RUB: 'USDTRUB',
+    Direction.ETH_RUB: 'ETHRUB',
+    Direction.ETH_USD: 'ETHUSD',
+    Direction.BTC_RUB: 'BTCRUB',
+    Direction.BTC_USD: 'BTCUSD',
+}
+
+
+@pytest.mark.parametrize('direction', list(Direction))
+def test_binance_paths_match_old_mapping(direction: Direction) -> None:
+    conversion = BinanceService.default_symbol_table().conversion
+
+    assert conversion.path_symbols(direction.assets) == OLD_BINANCE_MAPPING[direction]
+
+
+@pytest.mark.parametrize('direction', list(Direction))
+def test_coingeko_paths_match_old_mapping(direction: Direction) -> None:
+    conversion = CoingekoService.default_symbol_table().conversion
+
+    assert conversion.path_symbols(direction.assets) == [(OLD_COINGEKO_MAPPING[direction], 1)]
+
+
+def test_inverse_and_multi_hop_paths() -> None:
+    conversion = ConversionGraph({'BTCUSDT': ('BTC', 'USDT'), 'USDTRUB': ('USDT', 'RUB'), 'ETHBTC': ('ETH', 'BTC')})
+
+    assert conversion.path_symbols(('RUB', 'USDT')) == [('USDTRUB', -1)]
+    assert conversion.path_symbols(('ETH', 'RUB')) == [('ETHBTC', 1), ('BTCUSDT', 1), ('USDTRUB', 1)]
+    with pytest.raises(ConversionPathNotFound):
+        conversion.path(('ETH', 'EUR'))
+
+
+def test_plan_reads_every_symbol_once() -> None:
+    conversion = BinanceService.default_symbol_table().conversion
+    directions = [Direction.USDTTRC_RUB, Direction.USDTERC_RUB, Direction.USDTERC_USD, Direction.BTC_RUB]
+
+    plan = conversion.plan(tuple(direction.assets for direction in directions))
+    rates = {'BTCRUB': 5_000_000.0, 'TRXUSDT': 0.1, 'USDTRUB': 90.0}
+
+    assert sorted(plan.symbols) == sorted(rates)
+    values = ConversionGraph.evaluate(plan, [rates[symbol] for symbol in plan.symbols])
+    np.testing.assert_allclose(values, [9.0, 90.0, 1.0, 5_000_000.0])
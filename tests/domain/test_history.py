@@ -0,0 +1,83 @@
+import time
+
+import numpy as np
+from fakeredis.aioredis import FakeRedis
+
+from currency_checker.domain.history import Series, downsample_ohlc, empty_series, multiply_series
+from currency_checker.domain.storages.currency import HISTORY_POINT, RedisCurrencyStorage
+from currency_checker.infrastructure.settings import Settings
+
+
+def series(*points: tuple[int, float]) -> Series:
+    timestamps, values = zip(*points)
+    return Series(np.array(timestamps, dtype=np.int64), np.array(values, dtype=np.float64))
+
+
+def test_multiply_series_takes_last_known_value_of_every_leg() -> None:
+    first = series((10, 2.0), (30, 4.0))
+    second = series((20, 10.0), (30, 20.0), (40, 30.0))
+
+    result = multiply_series([first, second])
+
+    # point 10 is dropped, second leg has no value yet
+    np.testing.assert_array_equal(result.timestamps, [20, 30, 40])
+    np.testing.assert_allclose(result.values, [20.0, 80.0, 120.0])
+
+
+def test_multiply_series_with_inverse_leg() -> None:
+    result = multiply_series([series((10, 2.0)), series((10, 4.0))], exponents=[1, -1])
+
+    np.testing.assert_allclose(result.values, [0.5])
+
+
+def test_multiply_series_with_empty_leg() -> None:
+    result = multiply_series([series((10, 2.0)), empty_series()])
+
+    assert len(result.timestamps) == len(result.values) == 0
+
+
+def test_downsample_ohlc() -> None:
+    ohlc = downsample_ohlc(series((0, 3.0), (500, 5.0), (900, 1.0), (1000, 2.0), (3500, 7.0), (3600, 6.0)), 1000)
+
+    np.testing.assert_array_equal(ohlc.timestamps, [0, 1000, 3000])
+    np.testing.assert_allclose(ohlc.open, [3.0, 2.0, 7.0])
+    np.testing.assert_allclose(ohlc.high, [5.0, 2.0, 7.0])
+    np.testing.assert_allclose(ohlc.low, [1.0, 2.0, 6.0])
+    np.testing.assert_allclose(ohlc.close, [1.0, 2.0, 6.0])
+
+
+def test_downsample_empty_series() -> None:
+    ohlc = downsample_ohlc(empty_series(), 1000)
+
+    assert len(ohlc.timestamps) == len(ohlc.open) == len(ohlc.close) == 0
+
+
+async def test_histories_are_contiguous(settings: Settings, redis: FakeRedis) -> None:
+    storage = RedisCurrencyStorage(settings.redis, 'binance', settings.history)
+    await storage.set_keys({'BTCRUB': 1.0, 'USDTRUB': 90.0})
+    await storage.set_keys({'BTCRUB': 2.0})
+    now = int(time.time() * 1000)
+
+    btc, usdt, missing = await storage.get_histories(['BTCRUB', 'USDTRUB', 'ETHRUB'], now - 60_000, now + 1)
+
+    np.testing.assert_allclose(btc.values, [1.0, 2.0])
+    np.testing.assert_allclose(usdt.values, [90.0])
+    assert len(missing.timestamps) == 0
+    for item in (btc, usdt, missing):
+        assert item.timestamps.flags.c_contiguous and item.values.flags.c_contiguous
+        assert item.timestamps.dtype == np.int64 and item.values.dtype == np.float64
+
+
+async def test_history_of_concurrent_writers_is_sorted(settings: Settings, redis: FakeRedis) -> None:
+    storage = RedisCurrencyStorage(settings.redis, 'binance', settings.history)
+    now = int(time.time() * 1000)
+    chunk = now // (settings.history.chunk_size * 1000)
+    # the second worker appended older point after the newer one
+    points = HISTORY_POINT.pack(now, 2.0) + HISTORY_POINT.pack(now - 1, 1.0)
+    await redis.append(f'binance:history/BTCRUB/{chunk}', points)
+
+    (btc,) = await storage.get_histories(['BTCRUB'], now - 60_000, now)
+
+    np.testing.assert_array_equal(btc.timestamps, [now - 1, now])
+    np.testing.assert_allclose(btc.values, [1.0, 2.0])
+    assert btc.timestamps.flags.c_contiguous and btc.values.flags.c_contiguous
@@ -0,0 +1,58 @@
+import asyncio
+from contextlib import suppress
+from typing import Any
+
+from redis.exceptions import ConnectionError as RedisConnectionError
+
+from currency_checker.domain.storages.currency import RedisKeyspaceInvalidator
+
+
+class FlakyRedis:
+    """Redis which is down for the first `failures` calls of every command."""
+
+    def __init__(self, failures: int) -> None:
+        self.failures = failures
+        self.config_gets = 0
+        self.config: dict[str, str] = {'notify-keyspace-events': ''}
+        self.subscribed = asyncio.Event()
+
+    async def config_get(self, name: str) -> dict[str, str]:
+        self.config_gets += 1
+        if self.config_gets <= self.failures:
+            raise RedisConnectionError('Connection refused')
+        return {name: self.config[name]}
+
+    async def config_set(self, name: str, value: str) -> None:
+        self.config[name] = value
+
+    def pubsub(self, **kwargs: Any) -> Any:
+        self.subscribed.set()
+        raise RedisConnectionError('Connection refused')
+
+
+class FakeCache:
+    key_prefix = 'binance'
+
+    def __init__(self) -> None:
+        self.invalidations = 0
+
+    def invalidate(self, key: str | None = None) -> None:
+        self.invalidations += 1
+
+
+async def test_notifications_are_configured_once_redis_is_available() -> None:
+    redis = FlakyRedis(failures=2)
+    cache = FakeCache()
+    invalidator = RedisKeyspaceInvalidator(redis, 0, [cache], reconnect_interval=0)  # type: ignore[arg-type, list-item]
+
+    task = asyncio.create_task(invalidator.run())
+    await asyncio.wait_for(redis.subscribed.wait(), timeout=1)
+    for _ in range(3):  # a few more reconnects
+        await asyncio.sleep(0)
+    task.cancel()
+    with suppress(asyncio.CancelledError):
+        await task
+
+    assert redis.config_gets == 3
+    assert set(redis.config['notify-keyspace-events']) == set('K$hg')
+    assert cache.invalidations >= 3
@@ -0,0 +1,105 @@
+import pytest
+
+from currency_checker.domain import symbols
+from currency_checker.domain.storages.symbols import AbstractSymbolStorage, SymbolTableReloader
+from currency_checker.domain.symbols import SymbolMapping, SymbolTable, get_symbol_table
+
+
+class FakeSymbolStorage(AbstractSymbolStorage):
+    def __init__(self) -> None:
+        self.revisions: dict[str, int] = {}
+        self.mappings: dict[str, list[SymbolMapping]] = {}
+        self.loads: list[tuple[str, int]] = []
+
+    async def get_revisions(self) -> dict[str, int]:
+        return dict(self.revisions)
+
+    async def get_symbol_table(self, source: str, revision: int) -> SymbolTable:
+        self.loads.append((source, revision))
+        return SymbolTable(self.mappings.get(source, []), revision=revision)
+
+    def update(self, source: str, *mappings: SymbolMapping) -> None:
+        self.revisions[source] = self.revisions.get(source, 0) + 1
+        self.mappings[source] = list(mappings)
+
+
+@pytest.fixture(autouse=True)
+def tables(monkeypatch: pytest.MonkeyPatch) -> dict[str, SymbolTable]:
+    """Symbol tables of process are isolated between tests."""
+    tables: dict[str, SymbolTable] = {}
+    monkeypatch.setattr(symbols, '_tables', tables)
+    return tables
+
+
+@pytest.fixture
+def storage() -> FakeSymbolStorage:
+    return FakeSymbolStorage()
+
+
+@pytest.fixture
+def changes() -> list[tuple[str, SymbolTable | None]]:
+    return []
+
+
+@pytest.fixture
+def reloader(storage: FakeSymbolStorage, changes: list[tuple[str, SymbolTable | None]]) -> SymbolTableReloader:
+    return SymbolTableReloader(storage, interval=60, on_change=lambda source, table: changes.append((source, table)))
+
+
+async def test_changed_revision_is_loaded_once(
+    storage: FakeSymbolStorage, reloader: SymbolTableReloader, changes: list[tuple[str, SymbolTable | None]]
+) -> None:
+    storage.update('binance', SymbolMapping('BTCRUB', 'BTC', 'RUB'))
+
+    assert await reloader.reload() == ['binance']
+    assert await reloader.reload() == []
+
+    table = get_symbol_table('binance')
+    assert table is not None and table.revision == 1
+    assert dict(table.symbols) == {'BTCRUB': ('BTC', 'RUB')}
+    assert changes == [('binance', table)]
+    assert storage.loads == [('binance', 1)]
+
+
+async def test_reload_if_due_queries_database_once_per_interval(
+    storage: FakeSymbolStorage, reloader: SymbolTableReloader
+) -> None:
+    storage.update('binance', SymbolMapping('BTCRUB', 'BTC', 'RUB'))
+    assert await reloader.reload_if_due() == ['binance']
+
+    storage.update('binance', SymbolMapping('ETHRUB', 'ETH', 'RUB'))
+    assert await reloader.reload_if_due() == []
+    assert storage.loads == [('binance', 1)]
+
+
+async def test_source_without_mappings_keeps_built_in_ones(
+    storage: FakeSymbolStorage, reloader: SymbolTableReloader, changes: list[tuple[str, SymbolTable | None]]
+) -> None:
+    storage.update('binance')
+
+    assert await reloader.reload() == []
+    assert await reloader.reload() == []
+
+    assert get_symbol_table('binance') is None
+    assert changes == []
+    assert storage.loads == [('binance', 1)]
+
+
+async def test_deactivated_mappings_fall_back_to_built_in_ones(
+    storage: FakeSymbolStorage, reloader: SymbolTableReloader, changes: list[tuple[str, SymbolTable | None]]
+) -> None:
+    storage.update('binance', SymbolMapping('BTCRUB', 'BTC', 'RUB'))
+    await reloader.reload()
+    storage.update('binance')
+
+    assert await reloader.reload() == ['binance']
+    assert await reloader.reload() == []
+
+    assert get_symbol_table('binance') is None
+    assert changes[-1] == ('binance', None)
+    assert storage.loads == [('binance', 1), ('binance', 2)]
+
+    storage.update('binance', SymbolMapping('ETHRUB', 'ETH', 'RUB'))
+    assert await reloader.reload() == ['binance']
+    table = get_symbol_table('binance')
+    assert table is not None and table.revision == 3
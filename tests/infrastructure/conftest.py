@@ -0,0 +1,10 @@
+from collections.abc import AsyncGenerator
+
+import aiohttp
+import pytest
+
+
+@pytest.fixture
+async def http_session() -> AsyncGenerator[aiohttp.ClientSession, None]:
+    async with aiohttp.ClientSession() as session:
+        yield session
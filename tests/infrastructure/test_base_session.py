@@ -0,0 +1,252 @@
+import asyncio
+from typing import Any
+
+import aiohttp
+import pytest
+from yarl import URL
+
+from currency_checker.infrastructure.base_api_client.base_client import BaseSession
+from currency_checker.infrastructure.base_api_client.circuit_breaker import CircuitBreaker, CircuitState
+from currency_checker.infrastructure.base_api_client.exceptions import ApiClientCircuitOpenError, ApiClientError
+from currency_checker.infrastructure.base_api_client.hedging import HedgingPolicy
+from currency_checker.infrastructure.base_api_client.requests import RequestInfo
+from currency_checker.infrastructure.base_api_client.responses import Response
+from currency_checker.infrastructure.base_api_client.retries import RetryPolicy
+from currency_checker.infrastructure.base_api_client.timeouts import RequestTimeout
+
+
+class FakeSend:
+    """Replaces `BaseSession._send`, every call takes the next outcome: status, exception or awaitable."""
+
+    def __init__(self, *outcomes: Any) -> None:
+        self.outcomes = list(outcomes)
+        self.calls = 0
+
+    async def __call__(self, method: str, url: URL, path_template: str, **kwargs: Any) -> Response:
+        self.calls += 1
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, BaseException):
+            raise outcome
+        if isinstance(outcome, asyncio.Event):
+            await outcome.wait()
+            outcome = 200
+        return Response(RequestInfo(url, method), status=outcome, body=b'{}', content_type='application/json')
+
+
+class SlowSend:
+    """Replaces `BaseSession._send`, call answers with its (seconds, outcome), body of response is number of call."""
+
+    def __init__(self, *outcomes: tuple[float, int | BaseException]) -> None:
+        self.outcomes = list(outcomes)
+        self.calls: list[dict[str, Any]] = []
+        self.cancelled: list[int] = []
+
+    async def __call__(self, method: str, url: URL, path_template: str, **kwargs: Any) -> Response:
+        index = len(self.calls)
+        self.calls.append(kwargs)
+        seconds, outcome = self.outcomes[index]
+        try:
+            await asyncio.sleep(seconds)
+        except asyncio.CancelledError:
+            self.cancelled.append(index)
+            raise
+        if isinstance(outcome, BaseException):
+            raise outcome
+        request_info = RequestInfo(url, method)
+        return Response(request_info, status=outcome, body=str(index).encode(), content_type='text/plain')
+
+
+def make_session(http_session: aiohttp.ClientSession, send: FakeSend | SlowSend, **kwargs: Any) -> BaseSession:
+    session = BaseSession(http_session=http_session, base_uri='http://upstream', **kwargs)
+    session._send = send  # type: ignore[method-assign]
+    return session
+
+
+@pytest.mark.parametrize(
+    ('outcomes', 'status', 'calls'),
+    [
+        ([503, 502, 200], 200, 3),
+        ([503, 503, 503], 503, 3),
+        ([501], 501, 1),  # 5xx which is not in retry policy
+        ([404], 404, 1),
+        ([ApiClientError('reset'), 200], 200, 2),
+    ],
+)
+async def test_retries_by_policy(
+    http_session: aiohttp.ClientSession, outcomes: list[Any], status: int, calls: int
+) -> None:
+    send = FakeSend(*outcomes)
+    session = make_session(http_session, send, retry_policy=RetryPolicy(attempts=3, base_delay=0))
+
+    response = await session.request('GET', 'price')
+
+    assert response.status == status
+    assert send.calls == calls
+
+
+async def test_non_idempotent_request_is_not_retried(http_session: aiohttp.ClientSession) -> None:
+    send = FakeSend(503, 200)
+    session = make_session(http_session, send, retry_policy=RetryPolicy(attempts=3, base_delay=0))
+
+    assert (await session.request('POST', 'order')).status == 503
+    assert send.calls == 1
+
+
+async def test_last_error_is_raised(http_session: aiohttp.ClientSession) -> None:
+    send = FakeSend(ApiClientError('reset'), ApiClientError('timeout'))
+    session = make_session(http_session, send, retry_policy=RetryPolicy(attempts=2, base_delay=0))
+
+    with pytest.raises(ApiClientError, match='timeout'):
+        await session.request('GET', 'price')
+
+
+async def test_server_errors_open_circuit(http_session: aiohttp.ClientSession) -> None:
+    breaker = CircuitBreaker('upstream', failure_threshold=2, recovery_timeout=60)
+    send = FakeSend(501, 501)
+    session = make_session(http_session, send, circuit_breaker=breaker)
+
+    await session.request('GET', 'price')
+    await session.request('GET', 'price')
+
+    assert breaker.state == CircuitState.OPEN
+    with pytest.raises(ApiClientCircuitOpenError):
+        await session.request('GET', 'price')
+    assert send.calls == 2
+
+
+async def test_cancelled_probe_releases_half_open_circuit(http_session: aiohttp.ClientSession) -> None:
+    breaker = CircuitBreaker('upstream', failure_threshold=1, recovery_timeout=0)
+    hanging = asyncio.Event()
+    send = FakeSend(ApiClientError('reset'), hanging, 200)
+    session = make_session(http_session, send, circuit_breaker=breaker)
+    with pytest.raises(ApiClientError):
+        await session.request('GET', 'price')
+
+    probe = asyncio.create_task(session.request('GET', 'price'))
+    await asyncio.sleep(0)
+    assert breaker.state == CircuitState.HALF_OPEN
+    probe.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await probe
+
+    # cancelled probe is not a failure of upstream, next probe is let through right away
+    assert breaker.state == CircuitState.HALF_OPEN
+    assert (await session.request('GET', 'price')).status == 200
+    assert breaker.state == CircuitState.CLOSED
+
+
+async def test_cancellation_does_not_open_circuit(http_session: aiohttp.ClientSession) -> None:
+    breaker = CircuitBreaker('upstream', failure_threshold=1, recovery_timeout=60)
+    hanging = asyncio.Event()
+    send = FakeSend(hanging, 200)
+    session = make_session(http_session, send, circuit_breaker=breaker)
+
+    request = asyncio.create_task(session.request('GET', 'price'))
+    await asyncio.sleep(0)
+    request.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await request
+
+    assert breaker.state == CircuitState.CLOSED
+    assert (await session.request('GET', 'price')).status == 200
+
+
+def make_hedging_session(http_session: aiohttp.ClientSession, send: SlowSend) -> BaseSession:
+    """Session which sends hedged copy of request after 0.02 seconds."""
+    session = make_session(http_session, send, hedging=HedgingPolicy(min_samples=1, min_delay=0.02))
+    assert session._latencies is not None
+    session._latencies.observe('price', 0.02)
+    return session
+
+
+@pytest.mark.parametrize(('outcomes', 'winner', 'loser'), [
+    ([(1.0, 200), (0.0, 200)], b'1', 0),  # hedged copy answers first
+    ([(0.05, 200), (1.0, 200)], b'0', 1),  # first request answers after hedged copy was sent
+])
+async def test_first_response_wins_and_other_is_cancelled(
+    http_session: aiohttp.ClientSession, outcomes: list[tuple[float, int]], winner: bytes, loser: int
+) -> None:
+    send = SlowSend(*outcomes)
+    session = make_hedging_session(http_session, send)
+
+    response = await session.request('GET', 'price')
+
+    assert response.body == winner
+    assert len(send.calls) == 2
+    await asyncio.sleep(0)
+    assert send.cancelled == [loser]
+
+
+async def test_hedge_is_not_sent_without_budget(http_session: aiohttp.ClientSession) -> None:
+    send = SlowSend((0.1, 200), (0.0, 200), (0.1, 200))
+    session = make_hedging_session(http_session, send)
+
+    assert (await session.request('GET', 'price')).body == b'1'
+    # budget of one hedge is spent, the next slow request waits for its own response
+    assert (await session.request('GET', 'price')).body == b'2'
+    assert len(send.calls) == 3
+
+
+async def test_hedge_is_not_sent_for_non_idempotent_request(http_session: aiohttp.ClientSession) -> None:
+    send = SlowSend((0.05, 200))
+    session = make_hedging_session(http_session, send)
+
+    assert (await session.request('POST', 'price')).body == b'0'
+    assert len(send.calls) == 1
+
+
+async def test_early_failure_of_first_request_is_raised(http_session: aiohttp.ClientSession) -> None:
+    send = SlowSend((0.0, ApiClientError('reset')))
+    session = make_hedging_session(http_session, send)
+
+    with pytest.raises(ApiClientError, match='reset'):
+        await session.request('GET', 'price')
+    assert len(send.calls) == 1
+
+
+async def test_failed_copy_waits_for_other_one(http_session: aiohttp.ClientSession) -> None:
+    send = SlowSend((0.05, 200), (0.0, ApiClientError('reset')))
+    session = make_hedging_session(http_session, send)
+
+    assert (await session.request('GET', 'price')).body == b'0'
+
+
+async def test_deadline_stops_retries(http_session: aiohttp.ClientSession) -> None:
+    send = SlowSend(*[(0.04, 503)] * 10)
+    policy = RetryPolicy(attempts=10, base_delay=0, deadline=0.1)
+    session = make_session(http_session, send, retry_policy=policy)
+
+    response = await session.request('GET', 'price')
+
+    assert response.status == 503
+    assert len(send.calls) == 3
+    remaining = [call['remaining'] for call in send.calls]
+    assert remaining == sorted(remaining, reverse=True)
+    assert remaining[0] <= 0.1 and remaining[-1] < 0.03
+
+
+async def test_timeout_of_call_overrides_timeout_of_session(http_session: aiohttp.ClientSession) -> None:
+    send = SlowSend((0.0, 200), (0.0, 200))
+    session = make_session(http_session, send, timeout=RequestTimeout(total=10))
+
+    await session.request('GET', 'price')
+    await session.request('GET', 'price', timeout=RequestTimeout(ttfb=1))
+
+    assert [call['timeout'] for call in send.calls] == [RequestTimeout(total=10), RequestTimeout(ttfb=1)]
+
+
+@pytest.mark.parametrize(('timeout', 'remaining', 'total'), [
+    (RequestTimeout(total=5), None, 5),
+    (RequestTimeout(total=5), 0.5, 0.5),
+    (RequestTimeout(total=5), 10, 5),
+    (RequestTimeout(), 3, 3),
+    (RequestTimeout(), -1, 0.001),  # deadline has passed, attempt fails at once
+])
+def test_total_timeout_is_cut_to_deadline(timeout: RequestTimeout, remaining: float | None, total: float) -> None:
+    assert timeout.client_timeout(remaining).total == total
+
+
+def test_timeout_phases_are_passed_to_aiohttp() -> None:
+    client_timeout = RequestTimeout(connect=1, ttfb=2).client_timeout()
+
+    assert (client_timeout.connect, client_timeout.sock_read, client_timeout.total) == (1, 2, None)
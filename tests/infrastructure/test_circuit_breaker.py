@@ -0,0 +1,101 @@
+import pytest
+
+from currency_checker.infrastructure.base_api_client import circuit_breaker
+from currency_checker.infrastructure.base_api_client.circuit_breaker import CircuitBreaker, CircuitState
+from currency_checker.infrastructure.base_api_client.exceptions import ApiClientCircuitOpenError
+
+
+class Clock:
+    """Replaces `time` module of circuit breaker, so event loop keeps real clock."""
+
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch: pytest.MonkeyPatch) -> Clock:
+    clock = Clock()
+    monkeypatch.setattr(circuit_breaker, 'time', clock)
+    return clock
+
+
+@pytest.fixture
+def breaker(clock: Clock) -> CircuitBreaker:
+    return CircuitBreaker('upstream', failure_threshold=3, recovery_timeout=30)
+
+
+def open_circuit(breaker: CircuitBreaker) -> None:
+    for _ in range(3):
+        breaker.before_request()
+        breaker.record_failure()
+
+
+def test_opens_after_failures_in_a_row(breaker: CircuitBreaker) -> None:
+    for _ in range(2):
+        breaker.record_failure()
+    breaker.record_success()  # resets counter
+    for _ in range(2):
+        breaker.record_failure()
+    assert breaker.state == CircuitState.CLOSED
+
+    breaker.record_failure()
+
+    assert breaker.state == CircuitState.OPEN
+    with pytest.raises(ApiClientCircuitOpenError):
+        breaker.before_request()
+
+
+def test_one_probe_after_recovery_timeout(breaker: CircuitBreaker, clock: Clock) -> None:
+    open_circuit(breaker)
+    clock.now += 29
+    with pytest.raises(ApiClientCircuitOpenError):
+        breaker.before_request()
+
+    clock.now += 1
+    breaker.before_request()
+
+    assert breaker.state == CircuitState.HALF_OPEN
+    with pytest.raises(ApiClientCircuitOpenError):  # probe is in flight
+        breaker.before_request()
+
+
+def test_successful_probe_closes_circuit(breaker: CircuitBreaker, clock: Clock) -> None:
+    open_circuit(breaker)
+    clock.now += 30
+    breaker.before_request()
+
+    breaker.record_success()
+
+    assert breaker.state == CircuitState.CLOSED
+    breaker.before_request()
+    breaker.before_request()
+
+
+def test_failed_probe_opens_circuit_again(breaker: CircuitBreaker, clock: Clock) -> None:
+    open_circuit(breaker)
+    clock.now += 30
+    breaker.before_request()
+
+    breaker.record_failure()
+
+    assert breaker.state == CircuitState.OPEN
+    clock.now += 29
+    with pytest.raises(ApiClientCircuitOpenError):
+        breaker.before_request()
+    clock.now += 1
+    breaker.before_request()
+    assert breaker.state == CircuitState.HALF_OPEN
+
+
+def test_released_probe_lets_next_probe_through(breaker: CircuitBreaker, clock: Clock) -> None:
+    open_circuit(breaker)
+    clock.now += 30
+    breaker.before_request()
+
+    breaker.release_probe()
+
+    assert breaker.state == CircuitState.HALF_OPEN
+    breaker.before_request()
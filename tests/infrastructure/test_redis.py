@@ -0,0 +1,70 @@
+import functools
+
+import pytest
+from fakeredis import FakeServer
+from fakeredis.aioredis import FakeAsyncRedisConnection
+from prometheus_client import REGISTRY
+from redis.asyncio import BlockingConnectionPool
+
+from currency_checker.infrastructure import redis
+from currency_checker.infrastructure.redis import close_redis_pools, get_redis
+from currency_checker.infrastructure.settings import RedisSettings
+
+
+@pytest.fixture(autouse=True)
+def fake_pools(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Registry of process is isolated between tests, its pools connect to in-memory Redis."""
+    monkeypatch.setattr(redis, '_clients', {})
+    pool_class = functools.partial(
+        BlockingConnectionPool, connection_class=FakeAsyncRedisConnection, server=FakeServer()
+    )
+    monkeypatch.setattr(redis, 'BlockingConnectionPool', pool_class)
+
+
+def redis_settings(**kwargs: int) -> RedisSettings:
+    # health check is not supported by in-memory connections
+    return RedisSettings(host='redis', port=6379, **{'database': 0, 'health_check_interval': 0, **kwargs})
+
+
+def connections(pool: str, state: str) -> float | None:
+    return REGISTRY.get_sample_value('currency_checker_redis_pool_connections', {'pool': pool, 'state': state})
+
+
+async def test_pool_is_shared_by_same_settings() -> None:
+    settings = redis_settings()
+
+    client = get_redis(settings)
+
+    assert get_redis(redis_settings()) is client
+    assert get_redis(settings.copy(update={'database': 1})) is not client
+    await close_redis_pools()
+
+
+async def test_pool_connections_are_exported() -> None:
+    client = get_redis(redis_settings(max_connections=3))
+    await client.set('key', 1)
+
+    assert connections('redis:6379/0', 'max') == 3
+    assert connections('redis:6379/0', 'idle') == 1
+    assert connections('redis:6379/0', 'in_use') == 0
+    connection = await client.connection_pool.get_connection()
+    assert connections('redis:6379/0', 'in_use') == 1
+    assert connections('redis:6379/0', 'idle') == 0
+    await client.connection_pool.release(connection)
+    await close_redis_pools()
+
+
+async def test_closed_pools_are_not_exported() -> None:
+    settings = redis_settings(database=2)
+    client = get_redis(settings)
+    await client.set('key', 1)
+
+    await close_redis_pools()
+
+    assert connections('redis:6379/2', 'in_use') is None
+    assert connections('redis:6379/2', 'idle') is None
+    assert connections('redis:6379/2', 'max') is None
+    # registry is empty, the next client opens new pool
+    assert get_redis(settings) is not client
+    assert connections('redis:6379/2', 'max') == 50
+    await close_redis_pools()
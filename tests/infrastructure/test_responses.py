@@ -0,0 +1,97 @@
+from typing import Any
+
+import aiohttp
+import msgspec
+import pytest
+from pydantic import BaseModel
+from yarl import URL
+
+from currency_checker.infrastructure.base_api_client.base_client import BaseSession
+from currency_checker.infrastructure.base_api_client.exceptions import (
+    ApiClientInvalidResponseError,
+    ApiClientResponseError,
+)
+from currency_checker.infrastructure.base_api_client.requests import RequestInfo
+from currency_checker.infrastructure.base_api_client.responses import Response
+
+
+class Price(msgspec.Struct):
+    symbol: str
+    price: float
+
+
+class PriceModel(BaseModel):
+    symbol: str
+    price: float
+
+
+def make_response(body: bytes, status: int = 200, charset: str | None = None) -> Response:
+    return Response(
+        RequestInfo(url=URL('http://upstream/price'), method='GET'),
+        status=status,
+        body=body,
+        content_type='application/json',
+        charset=charset,
+    )
+
+
+def test_json_is_decoded_into_type() -> None:
+    response = make_response(b'[{"symbol": "BTCRUB", "price": "100.5"}]')
+
+    assert response.json() == [{'symbol': 'BTCRUB', 'price': '100.5'}]
+    assert response.json(list[Price], strict=False) == [Price('BTCRUB', 100.5)]
+    with pytest.raises(ApiClientInvalidResponseError):
+        response.json(list[Price])  # price is a string, it is converted only when not strict
+
+
+def test_invalid_json_raises_invalid_response() -> None:
+    with pytest.raises(ApiClientInvalidResponseError):
+        make_response(b'<html>Bad Gateway</html>').json()
+
+
+def test_parse_validates_model() -> None:
+    assert make_response(b'{"symbol": "BTCRUB", "price": "100.5"}').parse(PriceModel) == PriceModel(
+        symbol='BTCRUB', price=100.5
+    )
+    with pytest.raises(ApiClientInvalidResponseError):
+        make_response(b'{"symbol": "BTCRUB"}').parse(PriceModel)
+
+
+@pytest.mark.parametrize(('body', 'charset', 'data'), [
+    ('Курс'.encode(), None, 'Курс'),
+    ('Курс'.encode('cp1251'), 'cp1251', 'Курс'),
+    (b'rate \xff', None, 'rate �'),  # undecodable bytes are replaced
+])
+def test_data_is_decoded_by_charset(body: bytes, charset: str | None, data: str) -> None:
+    assert make_response(body, charset=charset).data == data
+
+
+def test_error_response_is_raised_with_decoded_text() -> None:
+    response = make_response('Ошибка'.encode('cp1251'), status=400, charset='cp1251')
+
+    with pytest.raises(ApiClientResponseError) as exc_info:
+        response.raise_for_status()
+
+    assert exc_info.value.status == 400
+    assert exc_info.value.message == 'Ошибка'
+    assert str(exc_info.value) == "400, message='Ошибка', url=URL('http://upstream/price')"
+
+
+def test_successful_response_is_not_raised() -> None:
+    make_response(b'{}', status=304).raise_for_status()
+
+
+async def test_request_model(http_session: aiohttp.ClientSession) -> None:
+    bodies = [(200, b'[{"symbol": "BTCRUB", "price": "100.5"}]'), (404, b'Not found')]
+
+    async def send(method: str, url: URL, path_template: str, **kwargs: Any) -> Response:
+        status, body = bodies.pop(0)
+        request_info = RequestInfo(url, method)
+        return Response(request_info, status=status, body=body, content_type='application/json')
+
+    session = BaseSession(http_session=http_session, base_uri='http://upstream')
+    session._send = send  # type: ignore[method-assign]
+
+    assert await session.request_model(list[Price], 'GET', 'price', strict=False) == [Price('BTCRUB', 100.5)]
+    with pytest.raises(ApiClientResponseError, match='Not found'):
+        await session.request_model(list[Price], 'GET', 'price')
@@ -0,0 +1,25 @@
+import pytest
+
+from currency_checker.infrastructure.base_api_client.retries import NO_RETRY, RetryPolicy
+
+
+@pytest.mark.parametrize(('attempt', 'limit'), [(0, 0.1), (1, 0.2), (3, 0.8), (10, 1.0)])
+def test_delay_grows_exponentially_up_to_max_delay(attempt: int, limit: float) -> None:
+    policy = RetryPolicy(attempts=20, base_delay=0.1, max_delay=1.0)
+
+    delays = [policy.delay(attempt) for _ in range(200)]
+
+    assert all(0 <= delay <= limit for delay in delays)
+    assert max(delays) > limit / 2  # full jitter covers whole range
+
+
+@pytest.mark.parametrize(
+    ('method', 'retryable'),
+    [('GET', True), ('get', True), ('PUT', True), ('DELETE', True), ('POST', False), ('PATCH', False)],
+)
+def test_only_idempotent_methods_are_retried(method: str, retryable: bool) -> None:
+    assert RetryPolicy(attempts=3).is_retryable_method(method) is retryable
+
+
+def test_no_retry_makes_one_attempt() -> None:
+    assert NO_RETRY.attempts == 1
@@ -0,0 +1,54 @@
+import asyncio
+import time
+
+import pytest
+from fakeredis.aioredis import FakeRedis
+
+from currency_checker.infrastructure.base_api_client.base_throttler import BaseThrottler
+from currency_checker.infrastructure.base_api_client.throttlers import (
+    RedisThrottler,
+    SlidingWindowThrottler,
+    TokenBucketThrottler,
+)
+
+
+async def acquire_times(throttler: BaseThrottler, count: int) -> list[float]:
+    """Seconds since start when each of `count` concurrent requests was let through."""
+    started_at = time.monotonic()
+
+    async def acquire() -> float:
+        await throttler.acquire()
+        return time.monotonic() - started_at
+
+    return list(await asyncio.gather(*[acquire() for _ in range(count)]))
+
+
+async def test_token_bucket_allows_burst_then_rate() -> None:
+    throttler = TokenBucketThrottler(rate=20, capacity=2)
+
+    first, second, third, fourth = await acquire_times(throttler, 4)
+
+    assert first < 0.02 and second < 0.02
+    assert third == pytest.approx(0.05, abs=0.03)
+    assert fourth == pytest.approx(0.1, abs=0.03)
+
+
+async def test_sliding_window_allows_whole_limit_at_once() -> None:
+    throttler = SlidingWindowThrottler(limit=3, period=0.1)
+
+    times = await acquire_times(throttler, 4)
+
+    assert all(elapsed < 0.02 for elapsed in times[:3])
+    assert times[3] == pytest.approx(0.1, abs=0.03)
+
+
+async def test_redis_throttler_is_shared_by_processes(redis: FakeRedis) -> None:
+    first = RedisThrottler(redis, 'throttler/binance', limit=2, period=0.1)
+    second = RedisThrottler(redis, 'throttler/binance', limit=2, period=0.1)
+
+    await first.acquire()
+    await second.acquire()
+    (third,) = await acquire_times(first, 1)
+
+    assert third == pytest.approx(0.1, abs=0.05)
+    assert 0 < await redis.pttl('throttler/binance') <= 100
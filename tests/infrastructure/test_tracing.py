@@ -0,0 +1,141 @@
+import asyncio
+import datetime
+import ipaddress
+import logging
+import ssl
+from collections.abc import AsyncGenerator
+from pathlib import Path
+
+import aiohttp
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from prometheus_client import REGISTRY
+
+from currency_checker.infrastructure.base_api_client.tracing import PHASES, RequestTracer, TracingSSLContext
+
+
+x509 = pytest.importorskip('cryptography.x509')
+hashes = pytest.importorskip('cryptography.hazmat.primitives.hashes')
+serialization = pytest.importorskip('cryptography.hazmat.primitives.serialization')
+ec = pytest.importorskip('cryptography.hazmat.primitives.asymmetric.ec')
+
+
+@pytest.fixture(scope='module')
+def certificate(tmp_path_factory: pytest.TempPathFactory) -> tuple[Path, Path]:
+    """Self-signed certificate of localhost and its key."""
+    key = ec.generate_private_key(ec.SECP256R1())
+    name = x509.Name([x509.NameAttribute(x509.NameOID.COMMON_NAME, 'localhost')])
+    now = datetime.datetime.now(datetime.timezone.utc)
+    cert = (
+        x509.CertificateBuilder()
+        .subject_name(name)
+        .issuer_name(name)
+        .public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now - datetime.timedelta(minutes=1))
+        .not_valid_after(now + datetime.timedelta(hours=1))
+        .add_extension(
+            x509.SubjectAlternativeName([
+                x509.DNSName('localhost'),
+                x509.IPAddress(ipaddress.ip_address('127.0.0.1')),
+                x509.IPAddress(ipaddress.ip_address('::1')),
+            ]),
+            critical=False,
+        )
+        .add_extension(x509.BasicConstraints(ca=True, path_length=None), critical=True)
+        .sign(key, hashes.SHA256())
+    )
+    directory = tmp_path_factory.mktemp('tls')
+    cert_path, key_path = directory / 'cert.pem', directory / 'key.pem'
+    cert_path.write_bytes(cert.public_bytes(serialization.Encoding.PEM))
+    key_path.write_bytes(key.private_bytes(
+        serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+    ))
+    return cert_path, key_path
+
+
+@pytest.fixture
+async def server(certificate: tuple[Path, Path]) -> AsyncGenerator[TestServer, None]:
+    """HTTPS server which answers after 10 ms with the body of request."""
+    async def echo(request: web.Request) -> web.Response:
+        await asyncio.sleep(0.01)
+        return web.Response(body=await request.read() or b'{}', content_type='application/json')
+
+    app = web.Application()
+    app.router.add_route('*', '/price', echo)
+    context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+    context.load_cert_chain(*certificate)
+    test_server = TestServer(app, host='127.0.0.1')
+    await test_server.start_server(ssl=context)
+    yield test_server
+    await test_server.close()
+
+
+def make_session(tracer: RequestTracer, certificate: tuple[Path, Path]) -> aiohttp.ClientSession:
+    ssl_context = TracingSSLContext(ssl.PROTOCOL_TLS_CLIENT)
+    ssl_context.load_verify_locations(certificate[0])
+    # one connection, so concurrent request waits for it in queue
+    connector = aiohttp.TCPConnector(limit=1, ssl=ssl_context)
+    return aiohttp.ClientSession(connector=connector, trace_configs=[tracer.trace_config()])
+
+
+def phase_count(client_name: str, phase: str) -> float:
+    labels = {'api_service_name': 'upstream', 'client_name': client_name, 'phase': phase}
+    return REGISTRY.get_sample_value('cme_api_client_http_request_phase_seconds_count', labels) or 0.0
+
+
+async def test_phases_of_requests_are_observed(server: TestServer, certificate: tuple[Path, Path]) -> None:
+    tracer = RequestTracer('upstream', 'test-phases', logging.getLogger(__name__))
+    url = f'https://localhost:{server.port}/price'
+
+    async with make_session(tracer, certificate) as session:
+        async def get() -> bytes:
+            async with session.get(url) as response:
+                return await response.read()
+
+        assert await asyncio.gather(get(), get()) == [b'{}', b'{}']
+
+    counts = {phase: phase_count('test-phases', phase) for phase in PHASES}
+    # the second request waited for connection of the first one and reused it
+    assert counts == {'queue': 1, 'dns': 1, 'connect': 1, 'tls': 1, 'ttfb': 2, 'body': 2}
+    ttfb_sum = REGISTRY.get_sample_value(
+        'cme_api_client_http_request_phase_seconds_sum',
+        {'api_service_name': 'upstream', 'client_name': 'test-phases', 'phase': 'ttfb'},
+    )
+    assert ttfb_sum is not None and ttfb_sum >= 0.02
+
+
+@pytest.mark.parametrize(('sample_rate', 'level', 'logged'), [
+    (1.0, logging.DEBUG, True),
+    (1.0, logging.INFO, False),
+    (0.0, logging.DEBUG, False),
+])
+async def test_bodies_are_captured_only_when_sampled_at_debug(
+    server: TestServer,
+    certificate: tuple[Path, Path],
+    caplog: pytest.LogCaptureFixture,
+    monkeypatch: pytest.MonkeyPatch,
+    sample_rate: float,
+    level: int,
+    logged: bool,
+) -> None:
+    logger = logging.getLogger(f'{__name__}.bodies')
+    caplog.set_level(level, logger=logger.name)
+    tracer = RequestTracer('upstream', 'test-bodies', logger, body_sample_rate=sample_rate)
+    cut_bodies: list[bytes] = []
+    monkeypatch.setattr(tracer, '_cut', lambda body: cut_bodies.append(body) or body)
+
+    async with make_session(tracer, certificate) as session:
+        async with session.post(f'https://localhost:{server.port}/price', data=b'{"symbol": "BTCRUB"}') as response:
+            await response.read()
+
+    if logged:
+        assert cut_bodies == [b'{"symbol": "BTCRUB"}', b'{"symbol": "BTCRUB"}']
+        assert [record.getMessage().split(',')[0] for record in caplog.records] == [
+            f'Request: POST https://localhost:{server.port}/price',
+            f'Response: POST https://localhost:{server.port}/price',
+        ]
+    else:
+        assert cut_bodies == []
+        assert caplog.records == []
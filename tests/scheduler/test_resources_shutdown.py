@@ -0,0 +1,75 @@
+import logging
+from collections.abc import Iterator
+
+import pytest
+from dramatiq.asyncio import EventLoopThread, set_event_loop_thread
+from fakeredis.aioredis import FakeRedis
+
+from currency_checker.domain.exchange_clients import (
+    CoingekoClient,
+    close_exchange_clients,
+    get_binance_client,
+    get_coingeko_client,
+    registry,
+)
+from currency_checker.infrastructure.settings import ExchangeClientSettings
+from currency_checker.scheduler.middleware import ResourcesShutdown
+
+
+@pytest.fixture(autouse=True)
+def clients(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Registry of process is isolated between tests."""
+    monkeypatch.setattr(registry, '_clients', {})
+    monkeypatch.setattr(registry, '_circuit_breakers', {})
+
+
+@pytest.fixture
+def event_loop_thread() -> Iterator[EventLoopThread]:
+    """Event loop of dramatiq `AsyncIO` middleware, jobs run in it."""
+    thread = EventLoopThread(logging.getLogger(__name__))
+    thread.start()
+    set_event_loop_thread(thread)
+    yield thread
+    set_event_loop_thread(None)
+    thread.stop()
+
+
+async def test_clients_are_reused_between_jobs(redis: FakeRedis) -> None:
+    settings = ExchangeClientSettings()
+
+    binance = get_binance_client(settings, redis)
+    first = get_coingeko_client(settings, 'first-key')
+    second = get_coingeko_client(settings, 'second-key')
+
+    assert get_binance_client(ExchangeClientSettings(), redis) is binance
+    assert get_coingeko_client(settings, 'first-key') is first
+    assert second is not first
+    # upstream is down for every key, so clients of one exchange share circuit breaker
+    assert first._circuit_breaker is second._circuit_breaker
+    assert binance._circuit_breaker is not first._circuit_breaker
+    await close_exchange_clients()
+
+
+async def test_closed_clients_are_created_again(redis: FakeRedis) -> None:
+    settings = ExchangeClientSettings()
+    binance = get_binance_client(settings, redis)
+    coingeko = get_coingeko_client(settings, 'key')
+
+    await close_exchange_clients()
+
+    assert binance._http_session.closed and coingeko._http_session.closed
+    assert get_binance_client(settings, redis) is not binance
+    await close_exchange_clients()
+
+
+def test_clients_are_closed_on_worker_shutdown(event_loop_thread: EventLoopThread) -> None:
+    async def job() -> CoingekoClient:
+        return get_coingeko_client(ExchangeClientSettings(), 'key')
+
+    client = event_loop_thread.run_coroutine(job())
+    assert event_loop_thread.run_coroutine(job()) is client
+
+    ResourcesShutdown().after_worker_shutdown(broker=None, worker=None)  # type: ignore[arg-type]
+
+    assert client._http_session.closed
+    assert registry._clients == {}
@@ -0,0 +1,50 @@
+import importlib
+import signal
+from types import ModuleType
+
+import pytest
+from apscheduler.schedulers.background import BackgroundScheduler
+
+from currency_checker.domain.adapters import get_enabled_adapters
+from currency_checker.infrastructure.settings import AdapterSettings, Settings
+
+
+@pytest.fixture
+def main(monkeypatch: pytest.MonkeyPatch) -> ModuleType:
+    # settings of jobs are read on import, signal handler of scheduler is not installed into test process
+    monkeypatch.setenv('ENV_PATH', '/dev/null')
+    monkeypatch.setenv('LOG__LEVEL', 'INFO')
+    monkeypatch.setenv('POSTGRES__USER', 'user')
+    monkeypatch.setenv('POSTGRES__PASSWORD', 'password')
+    monkeypatch.setenv('POSTGRES__DATABASE', 'database')
+    monkeypatch.setenv('REDIS__HOST', 'redis')
+    monkeypatch.setenv('REDIS__PORT', '6379')
+    monkeypatch.setenv('REDIS__DATABASE', '0')
+    monkeypatch.setattr(signal, 'signal', lambda *args: None)
+    return importlib.import_module('currency_checker.scheduler.__main__')
+
+
+def scheduled_jobs(main: ModuleType, settings: Settings) -> list[tuple[str, list]]:
+    scheduler = BackgroundScheduler()
+    main.schedule_ingestion(scheduler, get_enabled_adapters(settings))
+    return [(job.func.__name__, job.args) for job in scheduler.get_jobs()]
+
+
+def test_streams_are_run_by_one_job(main: ModuleType, settings: Settings) -> None:
+    settings.adapters = {'coingeko': AdapterSettings(interval=60)}
+
+    assert scheduled_jobs(main, settings) == [('scheduled_poll', ('coingeko',)), ('scheduled_streams', (['binance'],))]
+
+
+def test_adapter_is_polled_in_poll_mode(main: ModuleType, settings: Settings) -> None:
+    settings.adapters = {'binance': AdapterSettings(mode='poll', interval=2)}
+
+    scheduler = BackgroundScheduler()
+    main.schedule_ingestion(scheduler, get_enabled_adapters(settings))
+
+    jobs = scheduler.get_jobs()
+    assert [(job.func.__name__, job.args) for job in jobs] == [
+        ('scheduled_poll', ('binance',)),
+        ('scheduled_poll', ('coingeko',)),
+    ]
+    assert jobs[0].trigger.interval.total_seconds() == 2
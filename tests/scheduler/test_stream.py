@@ -0,0 +1,114 @@
+import asyncio
+import importlib
+from collections.abc import Mapping, Sequence
+from types import ModuleType, SimpleNamespace
+from typing import Any
+
+import pytest
+from redis.exceptions import ConnectionError as RedisConnectionError
+
+from currency_checker.domain.history import Series
+from currency_checker.domain.storages.currency import AbstractCurrencyStorage
+
+
+class BrokenStorage(AbstractCurrencyStorage):
+    """Storage whose Redis is down: every write fails."""
+
+    def __init__(self) -> None:
+        self.writes = 0
+
+    async def get_key(self, key: str) -> float:
+        raise NotImplementedError
+
+    async def get_keys(self, keys: Sequence[str]) -> list[float]:
+        raise NotImplementedError
+
+    async def set_key(self, key: str, value: float) -> None:
+        await self.set_keys({key: value})
+
+    async def set_keys(self, values: Mapping[str, float]) -> None:
+        self.writes += 1
+        raise RedisConnectionError('Connection refused')
+
+    async def touch_keys(self, keys: Sequence[str]) -> None:
+        raise RedisConnectionError('Connection refused')
+
+    async def get_histories(self, keys: Sequence[str], start: int, end: int) -> list[Series]:
+        raise NotImplementedError
+
+    async def get_snapshot(self, fields: Sequence[str]) -> list[bytes | None]:
+        raise NotImplementedError
+
+    async def set_snapshot(self, fields: Mapping[str, bytes], update: bytes | None = None) -> None:
+        raise NotImplementedError
+
+
+class FakeAdapter:
+    """Adapter whose stream writes one rate and then runs `stream`."""
+
+    name = 'fake'
+
+    def __init__(self, stream: Any) -> None:
+        self.storage = BrokenStorage()
+        self.table = object()
+        self._stream = stream
+
+    def symbol_table(self) -> object:
+        return self.table
+
+    def create_storage(self) -> BrokenStorage:
+        return self.storage
+
+    def create_service(self, storage: AbstractCurrencyStorage) -> SimpleNamespace:
+        async def save_snapshot() -> None:
+            pass
+
+        return SimpleNamespace(storage=storage, symbol_table=self.table, save_snapshot=save_snapshot)
+
+    async def stream(self, service: SimpleNamespace) -> None:
+        await service.storage.set_key('BTCRUB', 1.0)
+        await self._stream()
+
+
+@pytest.fixture
+def jobs(monkeypatch: pytest.MonkeyPatch) -> ModuleType:
+    # settings of scheduler are read on import
+    monkeypatch.setenv('ENV_PATH', '/dev/null')
+    monkeypatch.setenv('LOG__LEVEL', 'INFO')
+    monkeypatch.setenv('POSTGRES__USER', 'user')
+    monkeypatch.setenv('POSTGRES__PASSWORD', 'password')
+    monkeypatch.setenv('POSTGRES__DATABASE', 'database')
+    monkeypatch.setenv('REDIS__HOST', 'redis')
+    monkeypatch.setenv('REDIS__PORT', '6379')
+    monkeypatch.setenv('REDIS__DATABASE', '0')
+    module = importlib.import_module('currency_checker.scheduler.jobs')
+    monkeypatch.setattr(module, '_get_change_filter', lambda adapter: None)
+    return module
+
+
+async def test_failed_flush_does_not_replace_error_of_stream(jobs: ModuleType) -> None:
+    async def fail() -> None:
+        raise ValueError('stream failed')
+
+    adapter = FakeAdapter(fail)
+
+    with pytest.raises(ValueError, match='stream failed'):
+        await jobs._stream(adapter)
+    assert adapter.storage.writes == 1
+
+
+async def test_failed_flush_does_not_swallow_cancellation(jobs: ModuleType) -> None:
+    started = asyncio.Event()
+
+    async def hang() -> None:
+        started.set()
+        await asyncio.Event().wait()
+
+    adapter = FakeAdapter(hang)
+    task = asyncio.create_task(jobs._stream(adapter))
+    await started.wait()
+    task.cancel()
+
+    with pytest.raises(asyncio.CancelledError):
+        await task
+    assert adapter.storage.writes == 1
@@ -0,0 +1,103 @@
+"""
+Requests/sec of one API worker for `/v1/courses` and `/ping` in different response modes.
+
+Requests are sent straight to the ASGI application (no sockets and HTTP parsing) and storage
+is replaced with static rates, so numbers show framework and serialization cost only:
+
+    poetry run python3 tests/stress/benchmark_api.py --requests 20000
+"""
+import argparse
+import asyncio
+import time
+from types import SimpleNamespace
+from typing import Any
+
+from fastapi import FastAPI
+
+from currency_checker.api.routes.courses import router as courses_router
+from currency_checker.api.routes.system import router as system_router
+from currency_checker.domain.models import Direction, Exchanger
+from currency_checker.domain.services import BinanceService
+from currency_checker.domain.services.base import Snapshot
+
+
+MODES = ('pydantic', 'fast', 'snapshot')
+PATHS = ('/v1/courses', '/ping')
+
+
+class StaticRatesService(BinanceService):
+    def __init__(self, use_snapshot: bool) -> None:
+        super().__init__(storage=None)  # type: ignore[arg-type]
+        self.rates = {direction: 100.0 + index for index, direction in enumerate(Direction)}
+        self.snapshot = Snapshot('1', self._render_courses([
+            self._dumps({'direction': direction.value, 'value': value}) for direction, value in self.rates.items()
+        ])) if use_snapshot else None
+
+    async def get_course_values(self, directions: list[Direction]) -> dict[Direction, float]:
+        return {direction: self.rates[direction] for direction in directions}
+
+    async def get_snapshot(self, directions: list[Direction] | None = None) -> Snapshot | None:
+        return self.snapshot
+
+    async def get_snapshot_version(self) -> str | None:
+        return self.snapshot.version if self.snapshot else None
+
+
+def create_app(mode: str) -> FastAPI:
+    app = FastAPI(version='0.1.0')
+    app.include_router(system_router)
+    app.include_router(courses_router, prefix='/v1')
+    service = StaticRatesService(use_snapshot=mode == 'snapshot')
+    app.state = SimpleNamespace(  # type: ignore[assignment]
+        settings=SimpleNamespace(api_fast_response=mode != 'pydantic', api_courses_max_age=0),
+        services={Exchanger.BINANCE: service, Exchanger.COINBASE: service},
+    )
+    return app
+
+
+async def run(app: FastAPI, path: str, requests: int) -> float:
+    scope = {
+        'type': 'http',
+        'asgi': {'version': '3.0'},
+        'http_version': '1.1',
+        'method': 'GET',
+        'scheme': 'http',
+        'path': path,
+        'raw_path': path.encode(),
+        'query_string': b'',
+        'root_path': '',
+        'headers': [(b'host', b'localhost')],
+        'client': ('127.0.0.1', 50000),
+        'server': ('127.0.0.1', 8000),
+    }
+
+    async def receive() -> dict[str, Any]:
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+    async def send(message: dict[str, Any]) -> None:
+        if message['type'] == 'http.response.start' and message['status'] != 200:
+            raise RuntimeError(f'{path} responded with {message["status"]}')
+
+    started_at = time.perf_counter()
+    for _ in range(requests):
+        await app(scope, receive, send)
+    return requests / (time.perf_counter() - started_at)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--requests', type=int, default=20000)
+    args = parser.parse_args()
+
+    print(f'{"mode":<10} {"path":<12} {"req/s":>10}')
+    for mode in MODES:
+        app = create_app(mode)
+        for path in PATHS:
+            if mode == 'snapshot' and path == '/ping':
+                continue
+            rps = asyncio.run(run(app, path, args.requests))
+            print(f'{mode:<10} {path:<12} {rps:>10.0f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+"""
+Messages/sec of Binance `avgPrice` stream decoding: `json` + pydantic model (parser replaced by msgspec),
+`json` + rate dataclass and typed msgspec decoder.
+
+    poetry run python3 tests/stress/benchmark_decoding.py --messages 200000
+"""
+import argparse
+import json
+import time
+from collections.abc import Callable
+from typing import Any
+
+from pydantic import BaseModel
+
+from currency_checker.domain.exchange_clients import BinanceWebsocketClient
+from currency_checker.domain.models import CurrencyRateBinance, DirectionBinance
+
+
+class CurrencyRateBinancePydantic(BaseModel):
+    # rate model used before typed decoding
+    symbol: DirectionBinance
+    price: float
+
+
+def parse_with_pydantic(raw_price_response: str) -> CurrencyRateBinancePydantic:
+    # parser used before typed decoding
+    price_response = json.loads(raw_price_response)
+    return CurrencyRateBinancePydantic(
+        symbol=price_response['data']['s'],
+        price=float(price_response['data']['w'])
+    )
+
+
+def parse_with_json(raw_price_response: str) -> CurrencyRateBinance:
+    price_response = json.loads(raw_price_response)
+    return CurrencyRateBinance(
+        symbol=price_response['data']['s'],
+        price=float(price_response['data']['w'])
+    )
+
+
+def make_messages(count: int) -> list[str]:
+    directions = list(DirectionBinance)
+    return [
+        json.dumps({
+            'stream': f'{directions[index % len(directions)].lower()}@avgPrice',
+            'data': {
+                'e': 'avgPrice',
+                'E': 1693907033000 + index,
+                's': directions[index % len(directions)].value,
+                'i': '5m',
+                'w': f'{25776.86 + index:.8f}',
+                'T': 1693907032213 + index,
+            },
+        })
+        for index in range(count)
+    ]
+
+
+def run(parse: Callable[[str], Any], messages: list[str]) -> float:
+    started_at = time.perf_counter()
+    for message in messages:
+        parse(message)
+    return len(messages) / (time.perf_counter() - started_at)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--messages', type=int, default=200000)
+    args = parser.parse_args()
+
+    messages = make_messages(args.messages)
+    print(f'{"parser":<10} {"messages/s":>12}')
+    for name, parse in (
+        ('pydantic', parse_with_pydantic),
+        ('json', parse_with_json),
+        ('msgspec', BinanceWebsocketClient._parse_price),
+    ):
+        print(f'{name:<10} {run(parse, messages):>12.0f}')
+
+
+if __name__ == '__main__':
+    main()